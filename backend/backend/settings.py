@@ -155,3 +155,72 @@ SIMPLE_JWT = {
 
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
+
+# Cache
+# In-process LRU by default; point this at Redis/Memcached to share it between workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'lms-default',
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    }
+}
+
+# Precompiled course outlines (sections/lessons/quizzes), keyed by Course.outline_version
+COURSE_OUTLINE_CACHE = 'default'
+COURSE_OUTLINE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Write-behind buffer for batched lesson heartbeats (per process)
+PROGRESS_WRITE_BUFFER = {
+    'MAX_PENDING': 1000,
+    'MAX_AGE_SECONDS': 10,
+}
+
+# Course search: dotted path to a backend class in lms.utils.search_index,
+# or None to use MySQL FULLTEXT on MySQL and the in-process index elsewhere
+COURSE_SEARCH_BACKEND = None
+COURSE_SEARCH_MAX_RESULTS = 1000
+# innodb_ft_min_token_size of the MySQL server (shorter words are not indexed)
+COURSE_SEARCH_MIN_TOKEN_SIZE = 3
+
+# TTL of cached result counts for cursor-paginated lists (?count=estimate)
+ESTIMATED_COUNT_CACHE_TIMEOUT = 60
+
+# TTL of cached search facet counts (per normalized keyword query)
+COURSE_FACETS_CACHE_TIMEOUT = 60
+
+# Identity cache for JWT principals (teacher/student rows by id claim)
+PRINCIPAL_CACHE = 'default'
+PRINCIPAL_CACHE_TIMEOUT = 300
+
+# Compiled quiz data (answer keys), keyed by Quiz.content_version
+QUIZ_CACHE = 'default'
+QUIZ_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Push delivery of messages/notifications (GET /api/messages/events/ and /stream/).
+# InProcessEventBus needs publishers and subscribers in one process (threaded
+# worker); use 'lms.utils.event_bus.DatabaseEventBus' with several workers.
+# Long-poll and SSE requests hold a worker thread while waiting.
+REALTIME_EVENT_BUS = 'lms.utils.event_bus.InProcessEventBus'
+REALTIME_BUFFER_SIZE = 10000
+REALTIME_POLL_INTERVAL = 1.0
+# DatabaseEventBus only reads events this many seconds old, so inserts that
+# commit out of id order are not skipped (adds this much delivery latency)
+REALTIME_VISIBILITY_LAG = 2.0
+REALTIME_LONG_POLL_TIMEOUT = 25
+REALTIME_HEARTBEAT_INTERVAL = 15
+REALTIME_STREAM_DURATION = 300
+REALTIME_EVENT_RETENTION = 60 * 60
+
+# Course broadcast fan-out (lms.utils.broadcast). Courses with more enrolled
+# students than BROADCAST_INLINE_LIMIT are processed after the response, in a
+# background thread, or only by the process_broadcast_jobs command when
+# BROADCAST_BACKGROUND_THREAD is False (then run it from cron). A threaded job
+# without progress for BROADCAST_STALE_SECONDS (worker recycled or killed) is
+# restarted when its progress is polled or the teacher broadcasts again.
+BROADCAST_INLINE_LIMIT = 500
+BROADCAST_CHUNK_SIZE = 1000
+BROADCAST_BACKGROUND_THREAD = True
+BROADCAST_STALE_SECONDS = 2 * 60
@@ -3,7 +3,9 @@ from .models import (
     Teacher, Student, Category, Course,
     Section, Lesson, Quiz, Question, Option,
     Enrollment, StudentProgress, StudentCourseProgress,
-    Conversation, Message, Notification
+    Conversation, Message, Notification, CourseSearchDocument,
+    CourseSimilarity, CourseDailyStat, ConversationParticipantState, RealtimeEvent,
+    BroadcastJob
 )
 
 admin.site.register(Teacher)
@@ -21,3 +23,9 @@ admin.site.register(StudentCourseProgress)
 admin.site.register(Conversation)
 admin.site.register(Message)
 admin.site.register(Notification)
+admin.site.register(CourseSearchDocument)
+admin.site.register(CourseSimilarity)
+admin.site.register(CourseDailyStat)
+admin.site.register(ConversationParticipantState)
+admin.site.register(RealtimeEvent)
+admin.site.register(BroadcastJob)
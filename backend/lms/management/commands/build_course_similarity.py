@@ -0,0 +1,76 @@
+import numpy as np
+from scipy import sparse
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from lms.models import Enrollment, CourseSimilarity
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the top-K co-enrollment neighbours of every course (cosine similarity)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=20, help='Neighbours kept per course')
+        parser.add_argument(
+            '--min-common', type=int, default=1,
+            help='Minimum number of shared students for a pair to count'
+        )
+
+    def handle(self, *args, **options):
+        top_k = options['top_k']
+        min_common = options['min_common']
+
+        pairs = np.array(
+            list(Enrollment.objects.values_list('student_id', 'course_id').iterator()),
+            dtype=np.int64
+        ).reshape(-1, 2)
+        if not len(pairs):
+            with transaction.atomic():
+                CourseSimilarity.objects.all().delete()
+            self.stdout.write(self.style.WARNING('No enrollments; similarity table cleared'))
+            return
+
+        student_ids, student_index = np.unique(pairs[:, 0], return_inverse=True)
+        course_ids, course_index = np.unique(pairs[:, 1], return_inverse=True)
+
+        # Binary student x course matrix; X^T X counts shared students per course pair
+        enrollments = sparse.csr_matrix(
+            (np.ones(len(pairs), dtype=np.float64), (student_index, course_index)),
+            shape=(len(student_ids), len(course_ids))
+        )
+        co_enrollment = (enrollments.T @ enrollments).tocsr()
+        co_enrollment.setdiag(0)
+        co_enrollment.eliminate_zeros()
+        if min_common > 1:
+            co_enrollment.data[co_enrollment.data < min_common] = 0
+            co_enrollment.eliminate_zeros()
+
+        # Cosine: shared / sqrt(|students of a| * |students of b|)
+        norms = np.sqrt(np.asarray(enrollments.sum(axis=0)).ravel())
+        inverse_norms = sparse.diags(1.0 / norms)
+        similarity = (inverse_norms @ co_enrollment @ inverse_norms).tocsr()
+
+        rows = []
+        for i in range(similarity.shape[0]):
+            start, end = similarity.indptr[i], similarity.indptr[i + 1]
+            if start == end:
+                continue
+            neighbours = similarity.indices[start:end]
+            scores = similarity.data[start:end]
+            # Highest score first; ties go to the lower course id
+            order = np.lexsort((course_ids[neighbours], -scores))[:top_k]
+            for rank, j in enumerate(order, start=1):
+                rows.append(CourseSimilarity(
+                    course_id=int(course_ids[i]),
+                    similar_course_id=int(course_ids[neighbours[j]]),
+                    score=float(scores[j]),
+                    rank=rank,
+                ))
+
+        with transaction.atomic():
+            CourseSimilarity.objects.all().delete()
+            CourseSimilarity.objects.bulk_create(rows, batch_size=1000)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {len(rows)} neighbours for {len(course_ids)} courses '
+            f'from {len(pairs)} enrollments'
+        ))
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from lms.models import BroadcastJob
+from lms.utils.broadcast import requeue_stale_jobs, run_broadcast_job
+
+
+class Command(BaseCommand):
+    help = 'Run pending broadcast fan-out jobs (and requeue stale running ones)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job', type=int, action='append', dest='job_ids',
+                            help='Only this job id (repeatable)')
+        parser.add_argument('--stale-seconds', type=int, default=None,
+                            help='Requeue running jobs without progress for this long '
+                                 '(defaults to BROADCAST_STALE_SECONDS)')
+        parser.add_argument('--retry-failed', action='store_true',
+                            help='Also requeue failed jobs')
+
+    def handle(self, *args, **options):
+        stale_seconds = options['stale_seconds']
+        if stale_seconds is None:
+            stale_seconds = getattr(settings, 'BROADCAST_STALE_SECONDS', 2 * 60)
+        requeued = requeue_stale_jobs(stale_seconds, include_failed=options['retry_failed'])
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} broadcast jobs')
+
+        jobs = BroadcastJob.objects.filter(status='pending')
+        if options['job_ids']:
+            jobs = jobs.filter(id__in=options['job_ids'])
+
+        for job_id in jobs.order_by('id').values_list('id', flat=True):
+            job = run_broadcast_job(job_id)
+            if job is None:
+                continue
+            if job.status == 'failed':
+                self.stderr.write(self.style.ERROR(f'Broadcast job {job_id} failed: {job.error}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Broadcast job {job_id}: {job.processed_recipients} recipients'
+                ))
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from lms.utils.event_bus import DatabaseEventBus
+
+
+class Command(BaseCommand):
+    help = 'Delete delivered realtime events older than REALTIME_EVENT_RETENTION (DatabaseEventBus)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age', type=int, default=None,
+                            help='Age in seconds (defaults to REALTIME_EVENT_RETENTION)')
+
+    def handle(self, *args, **options):
+        max_age = options['max_age']
+        if max_age is None:
+            max_age = getattr(settings, 'REALTIME_EVENT_RETENTION', 60 * 60)
+        deleted = DatabaseEventBus.prune(max_age)
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} realtime events'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from lms.utils.analytics_rollup import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily revenue/enrollment rollups and course revenue totals from orders and enrollments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='courses',
+                            help='Only rebuild this course (repeatable)')
+
+    def handle(self, *args, **options):
+        count = rebuild_daily_stats(course_ids=options['courses'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} daily stat rows'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from lms.models import Course, CourseSearchDocument
+from lms.utils.search_index import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the course full-text search documents from the course table'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        courses = Course.objects.select_related('teacher', 'category')
+        CourseSearchDocument.objects.exclude(course__in=courses).delete()
+        count = 0
+        for course in courses.iterator(chunk_size=500):
+            backend.index_course(course)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} courses'))
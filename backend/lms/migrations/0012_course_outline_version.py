@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0011_student_bio'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='outline_version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Bumped on every curriculum write; keys the cached course outline'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:50
+
+from django.db import migrations, models
+
+
+def backfill_running_totals(apps, schema_editor):
+    """Seed progress_sum/completed_lessons from existing lesson progress"""
+    StudentProgress = apps.get_model('lms', 'StudentProgress')
+    StudentCourseProgress = apps.get_model('lms', 'StudentCourseProgress')
+
+    totals = {}
+    rows = StudentProgress.objects.values_list(
+        'student_id', 'lesson__section__course_id', 'watched_seconds',
+        'completed', 'lesson__duration_seconds'
+    )
+    for student_id, course_id, watched_seconds, completed, duration in rows.iterator():
+        if duration and duration > 0:
+            percent = min(100, (watched_seconds / duration) * 100)
+        else:
+            percent = 100 if completed else 0
+        entry = totals.setdefault((student_id, course_id), [0.0, 0])
+        entry[0] += percent
+        entry[1] += 1 if completed else 0
+
+    to_update = []
+    for course_progress in StudentCourseProgress.objects.all().iterator():
+        entry = totals.get((course_progress.student_id, course_progress.course_id))
+        if entry:
+            course_progress.progress_sum, course_progress.completed_lessons = entry
+            to_update.append(course_progress)
+    StudentCourseProgress.objects.bulk_update(
+        to_update, ['progress_sum', 'completed_lessons'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0012_course_outline_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentcourseprogress',
+            name='completed_lessons',
+            field=models.IntegerField(default=0, help_text='Running count of completed lessons'),
+        ),
+        migrations.AddField(
+            model_name='studentcourseprogress',
+            name='progress_sum',
+            field=models.FloatField(default=0.0, help_text='Running sum of per-lesson progress percentages; overall_progress = progress_sum / total lessons'),
+        ),
+        migrations.RunPython(backfill_running_totals, migrations.RunPython.noop),
+    ]
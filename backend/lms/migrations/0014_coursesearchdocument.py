@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_fulltext_index(apps, schema_editor):
+    """FULLTEXT index used by MySQLFullTextBackend (MySQL only)"""
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(
+        'ALTER TABLE lms_coursesearchdocument ADD FULLTEXT INDEX lms_course_search_ft '
+        '(title, description, teacher_name, category_title)'
+    )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute('ALTER TABLE lms_coursesearchdocument DROP INDEX lms_course_search_ft')
+
+
+def backfill_search_documents(apps, schema_editor):
+    """Index every existing course"""
+    Course = apps.get_model('lms', 'Course')
+    CourseSearchDocument = apps.get_model('lms', 'CourseSearchDocument')
+    documents = [
+        CourseSearchDocument(
+            course_id=course_id,
+            title=title or '',
+            description=description or '',
+            teacher_name=teacher_name or '',
+            category_title=category_title or '',
+        )
+        for course_id, title, description, teacher_name, category_title in Course.objects.values_list(
+            'id', 'title', 'description', 'teacher__full_name', 'category__title'
+        ).iterator()
+    ]
+    CourseSearchDocument.objects.bulk_create(documents, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0013_studentcourseprogress_running_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseSearchDocument',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='lms.course')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True, default='')),
+                ('teacher_name', models.CharField(blank=True, default='', max_length=200)),
+                ('category_title', models.CharField(blank=True, default='', max_length=200)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Course Search Document',
+                'verbose_name_plural': 'Course Search Documents',
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0015_course_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text="Cosine similarity of the two courses' enrollment vectors")),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarities', to='lms.course')),
+                ('similar_course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_to', to='lms.course')),
+            ],
+            options={
+                'verbose_name': 'Course Similarity',
+                'verbose_name_plural': 'Course Similarities',
+                'ordering': ['course_id', 'rank'],
+                'indexes': [models.Index(fields=['course', 'rank'], name='course_similarity_rank_idx')],
+                'unique_together': {('course', 'similar_course')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0017_quiz_content_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizattempt',
+            name='selected_options',
+            field=models.BinaryField(blank=True, default=b'', help_text='Selected option ids, packed as little-endian uint32 (see lms.utils.quiz_analysis)'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_stats(apps, schema_editor):
+    """Roll up existing paid orders and enrollments"""
+    Course = apps.get_model('lms', 'Course')
+    Order = apps.get_model('lms', 'Order')
+    Enrollment = apps.get_model('lms', 'Enrollment')
+    CourseDailyStat = apps.get_model('lms', 'CourseDailyStat')
+
+    teacher_of = dict(Course.objects.values_list('id', 'teacher_id'))
+    paid = Order.objects.filter(payment_status='paid')
+
+    stats = {}
+    for course_id, day, revenue in paid.annotate(day=TruncDate('updated_at')).values_list(
+        'course_id', 'day'
+    ).annotate(revenue=Sum('amount')).order_by():
+        stats[(course_id, day)] = [revenue or 0, 0]
+    for course_id, day, count in Enrollment.objects.annotate(day=TruncDate('enrolled_at')).values_list(
+        'course_id', 'day'
+    ).annotate(count=Count('id')).order_by():
+        stats.setdefault((course_id, day), [0, 0])[1] = count
+
+    CourseDailyStat.objects.bulk_create([
+        CourseDailyStat(
+            teacher_id=teacher_of[course_id],
+            course_id=course_id,
+            date=day,
+            revenue=revenue,
+            enrollments=enrollments
+        )
+        for (course_id, day), (revenue, enrollments) in stats.items()
+    ], batch_size=1000)
+
+    for course_id, total in paid.values_list('course_id').annotate(total=Sum('amount')).order_by():
+        Course.objects.filter(id=course_id).update(total_revenue=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0018_quizattempt_selected_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='total_revenue',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Running sum of paid order amounts', max_digits=12),
+        ),
+        migrations.CreateModel(
+            name='CourseDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('enrollments', models.PositiveIntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='lms.course')),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='lms.teacher')),
+            ],
+            options={
+                'verbose_name': 'Course Daily Stat',
+                'verbose_name_plural': 'Course Daily Stats',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['teacher', 'date'], name='course_daily_teacher_date_idx')],
+                'unique_together': {('course', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
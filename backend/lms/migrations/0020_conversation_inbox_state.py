@@ -0,0 +1,116 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def backfill_inbox_state(apps, schema_editor):
+    """
+    Last message per conversation, and one state row per participant with
+    the unread count the old per-message is_read flags gave
+    """
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Conversation = apps.get_model('lms', 'Conversation')
+    Message = apps.get_model('lms', 'Message')
+    ConversationParticipantState = apps.get_model('lms', 'ConversationParticipantState')
+
+    last_ids = dict(Message.objects.values_list('conversation_id').annotate(last_id=Max('id')).order_by())
+    created_at = dict(Message.objects.filter(id__in=list(last_ids.values())).values_list('id', 'created_at'))
+    conversations = []
+    for conversation in Conversation.objects.only('id', 'created_at', 'updated_at').iterator():
+        last_id = last_ids.get(conversation.id)
+        conversation.last_message_id = last_id
+        conversation.last_message_at = created_at.get(last_id)
+        conversations.append(conversation)
+    Conversation.objects.bulk_update(conversations, ['last_message', 'last_message_at'], batch_size=500)
+
+    unread_total = dict(
+        Message.objects.filter(is_read=False).values_list('conversation_id').annotate(count=Count('id')).order_by()
+    )
+    unread_by_sender = {
+        (conversation_id, content_type_id, object_id): count
+        for conversation_id, content_type_id, object_id, count in Message.objects.filter(is_read=False).values_list(
+            'conversation_id', 'sender_content_type_id', 'sender_object_id'
+        ).annotate(count=Count('id')).order_by()
+    }
+    last_read_id = dict(
+        Message.objects.filter(is_read=True).values_list('conversation_id').annotate(last_id=Max('id')).order_by()
+    )
+    last_sent_id = {
+        (conversation_id, content_type_id, object_id): last_id
+        for conversation_id, content_type_id, object_id, last_id in Message.objects.values_list(
+            'conversation_id', 'sender_content_type_id', 'sender_object_id'
+        ).annotate(last_id=Max('id')).order_by()
+    }
+    activity = {conversation.id: conversation.last_message_at or conversation.created_at for conversation in conversations}
+
+    participants = []
+    for model_name, through in (
+        ('teacher', Conversation.participants_teachers.through),
+        ('student', Conversation.participants_students.through),
+    ):
+        content_type, _ = ContentType.objects.get_or_create(app_label='lms', model=model_name)
+        for conversation_id, object_id in through.objects.values_list('conversation_id', f'{model_name}_id'):
+            participants.append((conversation_id, content_type.id, object_id))
+
+    states = []
+    for key in participants:
+        conversation_id = key[0]
+        unread = unread_total.get(conversation_id, 0) - unread_by_sender.get(key, 0)
+        if unread == 0:
+            last_read = last_ids.get(conversation_id)
+        else:
+            last_read = max(last_read_id.get(conversation_id) or 0, last_sent_id.get(key) or 0) or None
+        states.append(ConversationParticipantState(
+            conversation_id=conversation_id,
+            participant_content_type_id=key[1],
+            participant_object_id=key[2],
+            last_read_message_id=last_read,
+            unread_count=unread,
+            last_message_at=activity[conversation_id]
+        ))
+    ConversationParticipantState.objects.bulk_create(states, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('lms', '0019_coursedailystat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message',
+            field=models.ForeignKey(blank=True, help_text='Newest message, maintained on send', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='lms.message'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ConversationParticipantState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('participant_object_id', models.PositiveIntegerField()),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('last_message_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Last activity of the conversation (copied from Conversation)')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participant_states', to='lms.conversation')),
+                ('last_read_message', models.ForeignKey(blank=True, help_text='Newest message this participant has seen', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='lms.message')),
+                ('participant_content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name': 'Conversation Participant State',
+                'verbose_name_plural': 'Conversation Participant States',
+                'ordering': ['-last_message_at', '-id'],
+                'indexes': [models.Index(fields=['participant_content_type', 'participant_object_id', '-last_message_at'], name='conv_state_inbox_idx')],
+                'unique_together': {('conversation', 'participant_content_type', 'participant_object_id')},
+            },
+        ),
+        migrations.RunPython(backfill_inbox_state, migrations.RunPython.noop),
+    ]
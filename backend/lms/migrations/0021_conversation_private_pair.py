@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_private_pairs(apps, schema_editor):
+    """
+    Key every private chat with exactly one teacher and one student by
+    that pair. If a pair has several chats, the oldest one gets the key;
+    the others stay unkeyed and keep their messages.
+    """
+    Conversation = apps.get_model('lms', 'Conversation')
+    private = Conversation.objects.filter(is_group=False)
+
+    teachers = {}
+    for conversation_id, teacher_id in Conversation.participants_teachers.through.objects.filter(
+        conversation__in=private
+    ).values_list('conversation_id', 'teacher_id'):
+        teachers.setdefault(conversation_id, []).append(teacher_id)
+    students = {}
+    for conversation_id, student_id in Conversation.participants_students.through.objects.filter(
+        conversation__in=private
+    ).values_list('conversation_id', 'student_id'):
+        students.setdefault(conversation_id, []).append(student_id)
+
+    seen = set()
+    to_update = []
+    for conversation in private.order_by('id').only('id'):
+        pair_teachers = teachers.get(conversation.id, [])
+        pair_students = students.get(conversation.id, [])
+        if len(pair_teachers) != 1 or len(pair_students) != 1:
+            continue
+        pair = (pair_teachers[0], pair_students[0])
+        if pair in seen:
+            continue
+        seen.add(pair)
+        conversation.private_teacher_id, conversation.private_student_id = pair
+        to_update.append(conversation)
+    Conversation.objects.bulk_update(to_update, ['private_teacher', 'private_student'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0020_conversation_inbox_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='private_student',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='private_conversations', to='lms.student'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='private_teacher',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='private_conversations', to='lms.teacher'),
+        ),
+        migrations.RunPython(backfill_private_pairs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(fields=('private_teacher', 'private_student'), name='conversation_private_pair_uniq'),
+        ),
+    ]
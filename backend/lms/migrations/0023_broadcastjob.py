@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0022_realtimeevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BroadcastJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('total_recipients', models.PositiveIntegerField(default=0)),
+                ('processed_recipients', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='broadcast_jobs', to='lms.conversation')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='broadcast_jobs', to='lms.course')),
+                ('message', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='lms.message')),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='broadcast_jobs', to='lms.teacher')),
+            ],
+            options={
+                'verbose_name': 'Broadcast Job',
+                'verbose_name_plural': 'Broadcast Jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='broadcast',
+            field=models.ForeignKey(blank=True, help_text='Broadcast that created this notification (null otherwise)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='notifications', to='lms.broadcastjob'),
+        ),
+        migrations.AddIndex(
+            model_name='broadcastjob',
+            index=models.Index(fields=['status', 'updated_at'], name='broadcast_job_status_idx'),
+        ),
+    ]
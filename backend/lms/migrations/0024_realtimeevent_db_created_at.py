@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:30
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0023_broadcastjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='realtimeevent',
+            name='created_at',
+            field=models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), db_index=True),
+        ),
+    ]
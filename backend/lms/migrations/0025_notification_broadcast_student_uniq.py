@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:50
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def delete_duplicate_broadcast_notifications(apps, schema_editor):
+    """
+    Keep the oldest notification of each (broadcast, student) pair;
+    concurrent runners of a broadcast job could create several.
+    """
+    Notification = apps.get_model('lms', 'Notification')
+    duplicates = Notification.objects.filter(broadcast__isnull=False).values(
+        'broadcast_id', 'student_id'
+    ).annotate(first_id=Min('id'), count=Count('id')).filter(count__gt=1).order_by()
+    for row in duplicates.iterator():
+        Notification.objects.filter(
+            broadcast_id=row['broadcast_id'],
+            student_id=row['student_id']
+        ).exclude(id=row['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0024_realtimeevent_db_created_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_broadcast_notifications, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(fields=('broadcast', 'student'), name='notification_broadcast_student_uniq'),
+        ),
+    ]
@@ -17,6 +17,12 @@ from .certificate import Certificate
 from .conversation import Conversation
 from .message import Message
 from .notification import Notification
+from .course_search_document import CourseSearchDocument
+from .course_similarity import CourseSimilarity
+from .course_daily_stat import CourseDailyStat
+from .conversation_participant_state import ConversationParticipantState
+from .realtime_event import RealtimeEvent
+from .broadcast_job import BroadcastJob
 
 __all__ = [
     'Teacher',
@@ -38,6 +44,12 @@ __all__ = [
     'Conversation',
     'Message',
     'Notification',
+    'CourseSearchDocument',
+    'CourseSimilarity',
+    'CourseDailyStat',
+    'ConversationParticipantState',
+    'RealtimeEvent',
+    'BroadcastJob',
 ]
 
 
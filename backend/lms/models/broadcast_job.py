@@ -0,0 +1,52 @@
+from django.db import models
+from .teacher import Teacher
+from .course import Course
+from .conversation import Conversation
+from .message import Message
+
+
+class BroadcastJob(models.Model):
+    """
+    Fan-out of one course broadcast message: adds the enrolled students to
+    the course's group conversation and creates their notifications in
+    chunks (see lms.utils.broadcast). Small courses are processed inside
+    the request; large ones in the background or by the
+    process_broadcast_jobs command, reporting progress here.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE, related_name='broadcast_jobs')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='broadcast_jobs')
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='broadcast_jobs')
+    message = models.ForeignKey(Message, on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    total_recipients = models.PositiveIntegerField(default=0)
+    processed_recipients = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def progress(self):
+        """Share of recipients processed, 0-100"""
+        if self.status == 'completed' or not self.total_recipients:
+            return 100.0 if self.status == 'completed' else 0.0
+        return round(100.0 * self.processed_recipients / self.total_recipients, 2)
+
+    def __str__(self):
+        return f"Broadcast #{self.id} - {self.course_id} - {self.status}"
+
+    class Meta:
+        verbose_name = 'Broadcast Job'
+        verbose_name_plural = 'Broadcast Jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='broadcast_job_status_idx'),
+        ]
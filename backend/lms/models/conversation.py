@@ -31,6 +31,30 @@ class Conversation(models.Model):
         default=False,
         help_text="True for broadcast/group conversations, False for private chats"
     )
+    last_message = models.ForeignKey(
+        'Message',
+        on_delete=models.SET_NULL,
+        related_name='+',
+        null=True,
+        blank=True,
+        help_text="Newest message, maintained on send"
+    )
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    # Pair key of a private chat (unique); null for group conversations
+    private_teacher = models.ForeignKey(
+        Teacher,
+        on_delete=models.SET_NULL,
+        related_name='private_conversations',
+        null=True,
+        blank=True
+    )
+    private_student = models.ForeignKey(
+        Student,
+        on_delete=models.SET_NULL,
+        related_name='private_conversations',
+        null=True,
+        blank=True
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -60,6 +84,9 @@ class Conversation(models.Model):
         verbose_name = 'Conversation'
         verbose_name_plural = 'Conversations'
         ordering = ['-updated_at']
-
-
-
+        constraints = [
+            models.UniqueConstraint(
+                fields=['private_teacher', 'private_student'],
+                name='conversation_private_pair_uniq'
+            ),
+        ]
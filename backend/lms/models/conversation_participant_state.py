@@ -0,0 +1,55 @@
+from django.db import models
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from .conversation import Conversation
+from .message import Message
+
+
+class ConversationParticipantState(models.Model):
+    """
+    Inbox state of one participant (Teacher or Student) in a conversation:
+    read position, unread counter and the conversation's last activity,
+    copied here so a user's inbox is one (participant, last_message_at)
+    index range. Maintained by lms.utils.inbox.
+    """
+    conversation = models.ForeignKey(
+        Conversation,
+        on_delete=models.CASCADE,
+        related_name='participant_states'
+    )
+
+    # Generic foreign key to support both Teacher and Student
+    participant_content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    participant_object_id = models.PositiveIntegerField()
+    participant = GenericForeignKey('participant_content_type', 'participant_object_id')
+
+    last_read_message = models.ForeignKey(
+        Message,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        null=True,
+        blank=True,
+        help_text="Newest message this participant has seen"
+    )
+    unread_count = models.PositiveIntegerField(default=0)
+    last_message_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Last activity of the conversation (copied from Conversation)"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.participant_content_type.model} {self.participant_object_id} in {self.conversation_id}: {self.unread_count} unread"
+
+    class Meta:
+        verbose_name = 'Conversation Participant State'
+        verbose_name_plural = 'Conversation Participant States'
+        unique_together = ['conversation', 'participant_content_type', 'participant_object_id']
+        ordering = ['-last_message_at', '-id']
+        indexes = [
+            models.Index(
+                fields=['participant_content_type', 'participant_object_id', '-last_message_at'],
+                name='conv_state_inbox_idx'
+            ),
+        ]
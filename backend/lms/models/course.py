@@ -1,15 +1,19 @@
 from django.db import models
 from .teacher import Teacher
 from .category import Category
+from .mixins import PreservedFieldsMixin
 
 
-class Course(models.Model):
+class Course(PreservedFieldsMixin, models.Model):
     LEVEL_CHOICES = [
         ('Beginner', 'Beginner'),
         ('Intermediate', 'Intermediate'),
         ('Advanced', 'Advanced'),
     ]
 
+    # Only changed with F() updates (bump_course_outline_version, analytics_rollup)
+    preserved_fields = ('outline_version', 'total_revenue')
+
     teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE, related_name='courses')
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='courses')
     title = models.CharField(max_length=200)
@@ -23,6 +27,18 @@ class Course(models.Model):
     average_rating = models.FloatField(default=0.0)
     total_reviews = models.IntegerField(default=0)
     total_enrollments = models.IntegerField(default=0)
+    total_revenue = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        help_text="Running sum of paid order amounts"
+    )
+    outline_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Bumped on every curriculum write; keys the cached course outline"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -43,6 +59,13 @@ class Course(models.Model):
         verbose_name = 'Course'
         verbose_name_plural = 'Courses'
         ordering = ['-created_at']
+        # Composite indexes matching the catalog sorts (with the id tie-break)
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='course_newest_idx'),
+            models.Index(fields=['average_rating', 'total_reviews', 'id'], name='course_rating_idx'),
+            models.Index(fields=['total_enrollments', 'views', 'id'], name='course_popular_idx'),
+            models.Index(fields=['price', 'id'], name='course_price_idx'),
+        ]
 
 
 
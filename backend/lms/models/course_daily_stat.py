@@ -0,0 +1,29 @@
+from django.db import models
+from .teacher import Teacher
+from .course import Course
+
+
+class CourseDailyStat(models.Model):
+    """
+    Per-course, per-day rollup of paid revenue and new enrollments.
+    Maintained incrementally (see lms.utils.analytics_rollup) and rebuilt
+    by the rebuild_course_daily_stats command. teacher is denormalized
+    from the course so dashboards read one (teacher, date) index range.
+    """
+    teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE, related_name='daily_stats')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    enrollments = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.course_id} {self.date}: {self.revenue} / {self.enrollments}"
+
+    class Meta:
+        verbose_name = 'Course Daily Stat'
+        verbose_name_plural = 'Course Daily Stats'
+        unique_together = ['course', 'date']
+        ordering = ['-date']
+        indexes = [
+            models.Index(fields=['teacher', 'date'], name='course_daily_teacher_date_idx'),
+        ]
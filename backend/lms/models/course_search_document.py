@@ -0,0 +1,69 @@
+from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .course import Course
+from .teacher import Teacher
+from .category import Category
+
+
+class CourseSearchDocument(models.Model):
+    """
+    Denormalized text of a course for the full-text search index.
+    One row per course, refreshed whenever the course (or its teacher
+    name / category title) changes. On MySQL the columns carry a FULLTEXT
+    index; other databases use the in-process inverted index.
+    """
+    course = models.OneToOneField(
+        Course,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='search_document'
+    )
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True, default='')
+    teacher_name = models.CharField(max_length=200, blank=True, default='')
+    category_title = models.CharField(max_length=200, blank=True, default='')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"Search document: {self.title}"
+
+    class Meta:
+        verbose_name = 'Course Search Document'
+        verbose_name_plural = 'Course Search Documents'
+
+
+@receiver(post_save, sender=Course)
+def index_course_on_save(sender, instance, **kwargs):
+    """Keep the search index in sync when a course is created or updated"""
+    update_fields = kwargs.get('update_fields')
+    # Counter updates (ratings, enrollments, outline version) do not change indexed text
+    if update_fields and not {'title', 'description', 'teacher', 'category'} & set(update_fields):
+        return
+    from lms.utils.search_index import get_search_backend
+    get_search_backend().index_course(instance)
+
+
+@receiver(post_delete, sender=Course)
+def remove_course_from_index(sender, instance, **kwargs):
+    from lms.utils.search_index import get_search_backend
+    get_search_backend().remove_course(instance.id)
+
+
+@receiver(post_save, sender=Teacher)
+def reindex_teacher_courses(sender, instance, created, **kwargs):
+    """Teacher names are indexed with their courses"""
+    if not created:
+        CourseSearchDocument.objects.filter(course__teacher=instance).exclude(
+            teacher_name=instance.full_name
+        ).update(teacher_name=instance.full_name, updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_courses(sender, instance, created, **kwargs):
+    """Category titles are indexed with their courses"""
+    if not created:
+        CourseSearchDocument.objects.filter(course__category=instance).exclude(
+            category_title=instance.title
+        ).update(category_title=instance.title, updated_at=timezone.now())
@@ -0,0 +1,26 @@
+from django.db import models
+from .course import Course
+
+
+class CourseSimilarity(models.Model):
+    """
+    Precomputed item-to-item neighbour: courses often taken by the same
+    students. Rebuilt offline by the build_course_similarity command;
+    rank 1 is the most similar course.
+    """
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='similarities')
+    similar_course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='similar_to')
+    score = models.FloatField(help_text="Cosine similarity of the two courses' enrollment vectors")
+    rank = models.PositiveSmallIntegerField()
+
+    def __str__(self):
+        return f"{self.course_id} -> {self.similar_course_id} ({self.score:.3f})"
+
+    class Meta:
+        verbose_name = 'Course Similarity'
+        verbose_name_plural = 'Course Similarities'
+        unique_together = ['course', 'similar_course']
+        ordering = ['course_id', 'rank']
+        indexes = [
+            models.Index(fields=['course', 'rank'], name='course_similarity_rank_idx'),
+        ]
@@ -29,5 +29,5 @@ def update_course_enrollments(sender, instance, created, **kwargs):
         course.total_enrollments = Enrollment.objects.filter(course=course).count()
         course.save(update_fields=['total_enrollments'])
 
-
-
+        from lms.utils.analytics_rollup import record_enrollment
+        record_enrollment(instance)
@@ -0,0 +1,17 @@
+class PreservedFieldsMixin:
+    """
+    Fields listed in preserved_fields are only changed with F() updates
+    (version counters, running totals). save() of a stored instance leaves
+    them out of its UPDATE, so writing back a row loaded earlier cannot
+    undo a concurrent increment.
+    """
+    preserved_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not args and not kwargs.get('force_insert') \
+                and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.preserved_fields
+            ]
+        super().save(*args, **kwargs)
@@ -22,6 +22,14 @@ class Notification(models.Model):
         related_name='notifications',
         help_text="Course related to this notification (null for general notifications)"
     )
+    broadcast = models.ForeignKey(
+        'BroadcastJob',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='notifications',
+        help_text="Broadcast that created this notification (null otherwise)"
+    )
     title = models.CharField(max_length=255)
     message = models.TextField()
     is_read = models.BooleanField(default=False)
@@ -34,6 +42,11 @@ class Notification(models.Model):
         indexes = [
             models.Index(fields=['student', 'is_read', '-created_at']),
         ]
+        constraints = [
+            # One notification per student per broadcast, even if two runners
+            # process the same job; other notifications have no broadcast
+            models.UniqueConstraint(fields=['broadcast', 'student'], name='notification_broadcast_student_uniq'),
+        ]
 
     def __str__(self):
         return f"Notification for {self.student.full_name}: {self.title}"
@@ -1,12 +1,21 @@
 from django.db import models
 from .course import Course
+from .mixins import PreservedFieldsMixin
 
 
-class Quiz(models.Model):
+class Quiz(PreservedFieldsMixin, models.Model):
+    # Only changed with F() updates (bump_quiz_content_version)
+    preserved_fields = ('content_version',)
+
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='quizzes')
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True, null=True)
     pass_mark = models.IntegerField(default=0, help_text='Pass mark percentage (0-100)')
+    content_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Bumped on every question/option write; keys the cached answer key"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -8,6 +8,12 @@ class QuizAttempt(models.Model):
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='attempts')
     score = models.FloatField(default=0.0)
     passed = models.BooleanField(default=False)
+    selected_options = models.BinaryField(
+        blank=True,
+        default=b'',
+        editable=False,
+        help_text="Selected option ids, packed as little-endian uint32 (see lms.utils.quiz_analysis)"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
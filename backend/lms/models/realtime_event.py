@@ -0,0 +1,27 @@
+from django.db import models
+from django.db.models.functions import Now
+
+
+class RealtimeEvent(models.Model):
+    """
+    Outbox row of the database event bus (lms.utils.event_bus.DatabaseEventBus):
+    one row per recipient channel ('teacher:<id>' / 'student:<id>'),
+    read by polling subscribers with id > cursor. created_at comes from
+    the database clock, so every worker compares it against the same clock.
+    Rows are short-lived; prune them with the prune_realtime_events command.
+    """
+    channel = models.CharField(max_length=64)
+    event_type = models.CharField(max_length=32)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(db_default=Now(), db_index=True)
+
+    def __str__(self):
+        return f"{self.channel} {self.event_type} #{self.id}"
+
+    class Meta:
+        verbose_name = 'Realtime Event'
+        verbose_name_plural = 'Realtime Events'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['channel', 'id'], name='realtime_event_channel_idx'),
+        ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.contrib.auth.hashers import make_password
 
 
@@ -25,5 +27,9 @@ class Student(models.Model):
         ordering = ['-created_at']
 
 
-
-
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_cached_student(sender, instance, **kwargs):
+    """Profile/password changes must not be served from the identity cache"""
+    from lms.utils.principal import invalidate_principal
+    invalidate_principal('student', instance.id)
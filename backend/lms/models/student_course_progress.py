@@ -12,6 +12,11 @@ class StudentCourseProgress(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='course_progress')
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='student_progress')
     overall_progress = models.FloatField(default=0.0, help_text="Overall progress percentage (0-100)")
+    progress_sum = models.FloatField(
+        default=0.0,
+        help_text="Running sum of per-lesson progress percentages; overall_progress = progress_sum / total lessons"
+    )
+    completed_lessons = models.IntegerField(default=0, help_text="Running count of completed lessons")
     last_access = models.DateTimeField(auto_now=True, help_text="Last time student accessed this course")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.contrib.auth.hashers import make_password
 
 
@@ -26,5 +28,9 @@ class Teacher(models.Model):
         ordering = ['-created_at']
 
 
-
-
+@receiver(post_save, sender=Teacher)
+@receiver(post_delete, sender=Teacher)
+def invalidate_cached_teacher(sender, instance, **kwargs):
+    """Profile/password changes must not be served from the identity cache"""
+    from lms.utils.principal import invalidate_principal
+    invalidate_principal('teacher', instance.id)
@@ -2,11 +2,14 @@ from .teacher_serializer import TeacherSerializer
 from .student_serializer import StudentSerializer
 from .category_serializer import CategorySerializer
 from .course_serializer import CourseSerializer
+from .course_card_serializer import CourseCardSerializer
 from .section_serializer import SectionSerializer
 from .lesson_serializer import LessonSerializer
 from .quiz_serializer import QuizSerializer
 from .question_serializer import QuestionSerializer
 from .option_serializer import OptionSerializer
+from .quiz_tree_serializer import QuizTreeSerializer
+from .reorder_serializer import SectionReorderSerializer, LessonReorderSerializer
 from .enrollment_serializer import EnrollmentSerializer
 from .quiz_attempt_serializer import QuizAttemptSerializer
 from .student_progress_serializer import StudentProgressSerializer
@@ -23,7 +26,8 @@ from .message_serializer import (
     MessageSerializer,
     CreateMessageSerializer,
     StartPrivateChatSerializer,
-    BroadcastMessageSerializer
+    BroadcastMessageSerializer,
+    BroadcastJobSerializer
 )
 from .notification_serializer import (
     NotificationSerializer,
@@ -35,11 +39,15 @@ __all__ = [
     'StudentSerializer',
     'CategorySerializer',
     'CourseSerializer',
+    'CourseCardSerializer',
     'SectionSerializer',
     'LessonSerializer',
     'QuizSerializer',
     'QuestionSerializer',
     'OptionSerializer',
+    'QuizTreeSerializer',
+    'SectionReorderSerializer',
+    'LessonReorderSerializer',
     'EnrollmentSerializer',
     'QuizAttemptSerializer',
     'StudentProgressSerializer',
@@ -54,6 +62,7 @@ __all__ = [
     'CreateMessageSerializer',
     'StartPrivateChatSerializer',
     'BroadcastMessageSerializer',
+    'BroadcastJobSerializer',
     'NotificationSerializer',
     'MarkNotificationReadSerializer',
 ]
@@ -0,0 +1,40 @@
+from rest_framework import serializers
+from lms.models import Course, Teacher, Category
+
+
+class CourseCardTeacherSerializer(serializers.ModelSerializer):
+    """Minimal teacher info shown on a course card"""
+    class Meta:
+        model = Teacher
+        fields = ['id', 'full_name', 'profile_img']
+        read_only_fields = ['id', 'full_name', 'profile_img']
+
+
+class CourseCardCategorySerializer(serializers.ModelSerializer):
+    """Minimal category info shown on a course card"""
+    class Meta:
+        model = Category
+        fields = ['id', 'title']
+        read_only_fields = ['id', 'title']
+
+
+class CourseCardSerializer(serializers.ModelSerializer):
+    """
+    Lightweight course representation for list, search and recommend responses.
+    Never touches the curriculum tables (sections, lessons, quizzes), so a page
+    of cards costs a single joined query when built from setup_eager_loading().
+    """
+    teacher = CourseCardTeacherSerializer(read_only=True)
+    category = CourseCardCategorySerializer(read_only=True)
+
+    class Meta:
+        model = Course
+        fields = ['id', 'teacher', 'category', 'title', 'description', 'featured_img',
+                  'level', 'price', 'discount_price', 'language', 'views',
+                  'average_rating', 'total_reviews', 'total_enrollments', 'created_at']
+        read_only_fields = fields
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Join teacher and category in the same query as the courses"""
+        return queryset.select_related('teacher', 'category')
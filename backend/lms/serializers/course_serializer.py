@@ -33,3 +33,15 @@ class CourseSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'teacher', 'category', 'views', 'average_rating', 
                            'total_reviews', 'total_enrollments', 'created_at', 'sections', 'quizzes']
 
+
+
+class CourseHeaderSerializer(CourseSerializer):
+    """
+    Course fields without the curriculum tree.
+    The tree comes from the cached outline (lms.utils.course_outline).
+    """
+    class Meta(CourseSerializer.Meta):
+        fields = ['id', 'teacher', 'teacher_id', 'category', 'category_id',
+                  'title', 'description', 'featured_img', 'level', 'price',
+                  'discount_price', 'language', 'views', 'average_rating',
+                  'total_reviews', 'total_enrollments', 'created_at']
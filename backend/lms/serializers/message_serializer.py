@@ -1,6 +1,7 @@
 from rest_framework import serializers
-from lms.models import Conversation, Message, Teacher, Student, Course
-from django.contrib.contenttypes.models import ContentType
+from lms.models import BroadcastJob, Conversation, Message
+from lms.utils.principal import get_principal
+from lms.utils.inbox import participant_states
 
 
 class MessageSerializer(serializers.ModelSerializer):
@@ -44,6 +45,16 @@ class ConversationSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
+    def _current_user(self):
+        """Current (teacher, student) of the request, resolved once per request"""
+        request = self.context.get('request')
+        if not request or not getattr(request, 'auth', None):
+            return None, None
+        principal = get_principal(request)
+        teacher = principal.teacher
+        student = None if teacher else principal.student
+        return teacher, student
+
     def get_conversation_title(self, obj):
         """Get conversation title based on type"""
         request = self.context.get('request')
@@ -51,26 +62,7 @@ class ConversationSerializer(serializers.ModelSerializer):
             return "Conversation"
         
         # Determine current user
-        teacher = None
-        student = None
-        
-        if hasattr(request, 'auth') and request.auth:
-            teacher_id = request.auth.get('teacher_id')
-            student_id = request.auth.get('student_id')
-            
-            if teacher_id:
-                try:
-                    from lms.models import Teacher
-                    teacher = Teacher.objects.get(id=teacher_id)
-                except:
-                    pass
-            
-            if not teacher and student_id:
-                try:
-                    from lms.models import Student
-                    student = Student.objects.get(id=student_id)
-                except:
-                    pass
+        teacher, student = self._current_user()
         
         # If it's a group/broadcast conversation
         if obj.is_group and obj.course:
@@ -115,8 +107,8 @@ class ConversationSerializer(serializers.ModelSerializer):
         return participants
 
     def get_last_message(self, obj):
-        """Get the last message in the conversation"""
-        last_msg = obj.messages.last()
+        """Get the last message in the conversation (maintained on send)"""
+        last_msg = obj.last_message
         if last_msg:
             return {
                 'id': last_msg.id,
@@ -128,44 +120,21 @@ class ConversationSerializer(serializers.ModelSerializer):
         return None
 
     def get_unread_count(self, obj):
-        """Get unread message count for current user"""
-        request = self.context.get('request')
-        if not request or not hasattr(request, 'user'):
-            return 0
-        
-        # Determine current user
-        user = None
-        user_type = None
-        
-        # Try to get from JWT token
-        if hasattr(request, 'auth') and request.auth:
-            teacher_id = request.auth.get('teacher_id')
-            student_id = request.auth.get('student_id')
-            
-            if teacher_id:
-                try:
-                    user = Teacher.objects.get(id=teacher_id)
-                    user_type = 'teacher'
-                except Teacher.DoesNotExist:
-                    pass
-            
-            if not user and student_id:
-                try:
-                    user = Student.objects.get(id=student_id)
-                    user_type = 'student'
-                except Student.DoesNotExist:
-                    pass
-        
+        """
+        Get unread message count for current user, from the participant's
+        inbox state (attached as participant_state by the inbox view)
+        """
+        if hasattr(obj, 'participant_state'):
+            state = obj.participant_state
+            return state.unread_count if state else 0
+
+        teacher, student = self._current_user()
+        user = teacher or student
         if not user:
             return 0
-        
-        # Count unread messages where sender is not the current user
-        unread = obj.messages.filter(is_read=False).exclude(
-            sender_content_type=ContentType.objects.get_for_model(type(user)),
-            sender_object_id=user.id
-        ).count()
-        
-        return unread
+        return participant_states(user).filter(conversation_id=obj.id).values_list(
+            'unread_count', flat=True
+        ).first() or 0
 
 
 class CreateMessageSerializer(serializers.Serializer):
@@ -191,3 +160,16 @@ class BroadcastMessageSerializer(serializers.Serializer):
     course_id = serializers.IntegerField()
     content = serializers.CharField()
 
+
+class BroadcastJobSerializer(serializers.ModelSerializer):
+    """Progress of a broadcast fan-out"""
+    progress = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = BroadcastJob
+        fields = [
+            'id', 'course', 'conversation', 'message', 'status',
+            'total_recipients', 'processed_recipients', 'progress',
+            'error', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,41 @@
+from rest_framework import serializers
+
+
+class QuizTreeOptionSerializer(serializers.Serializer):
+    """An option in a quiz tree write; id refers to an existing option"""
+    id = serializers.IntegerField(required=False, min_value=1)
+    option_text = serializers.CharField(max_length=500)
+    is_correct = serializers.BooleanField(default=False)
+
+
+class QuizTreeQuestionSerializer(serializers.Serializer):
+    """A question in a quiz tree write; id refers to an existing question"""
+    id = serializers.IntegerField(required=False, min_value=1)
+    question_text = serializers.CharField()
+    order = serializers.IntegerField(required=False, min_value=0)
+    options = QuizTreeOptionSerializer(many=True, default=list)
+
+
+class QuizTreeSerializer(serializers.Serializer):
+    """
+    A whole quiz (header, questions and options) written in one request.
+    Question order defaults to the position in the list.
+    """
+    course = serializers.IntegerField(required=False, min_value=1)
+    title = serializers.CharField(max_length=200, required=False)
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    pass_mark = serializers.IntegerField(required=False, min_value=0, max_value=100)
+    questions = QuizTreeQuestionSerializer(many=True, max_length=500)
+
+    def validate(self, attrs):
+        question_ids = [question['id'] for question in attrs['questions'] if 'id' in question]
+        option_ids = [
+            option['id']
+            for question in attrs['questions']
+            for option in question['options'] if 'id' in option
+        ]
+        if len(question_ids) != len(set(question_ids)):
+            raise serializers.ValidationError({'questions': 'Duplicate question id'})
+        if len(option_ids) != len(set(option_ids)):
+            raise serializers.ValidationError({'questions': 'Duplicate option id'})
+        return attrs
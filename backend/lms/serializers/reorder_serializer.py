@@ -0,0 +1,29 @@
+from rest_framework import serializers
+
+
+def _validate_unique_ids(value):
+    if len(value) != len(set(value)):
+        raise serializers.ValidationError('Duplicate ids')
+    return value
+
+
+class SectionReorderSerializer(serializers.Serializer):
+    """All section ids of a course, in their new order"""
+    course = serializers.IntegerField(min_value=1)
+    sections = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000
+    )
+
+    def validate_sections(self, value):
+        return _validate_unique_ids(value)
+
+
+class LessonReorderSerializer(serializers.Serializer):
+    """All lesson ids of a section, in their new order"""
+    section = serializers.IntegerField(min_value=1)
+    lessons = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000
+    )
+
+    def validate_lessons(self, value):
+        return _validate_unique_ids(value)
@@ -9,3 +9,13 @@ class StudentProgressSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'student', 'updated_at']
 
 
+class LessonProgressTickSerializer(serializers.Serializer):
+    """A single heartbeat from the video player"""
+    lesson_id = serializers.IntegerField(min_value=1)
+    watched_seconds = serializers.IntegerField(min_value=0, default=0)
+    completed = serializers.BooleanField(default=False)
+
+
+class LessonProgressBatchSerializer(serializers.Serializer):
+    """Many heartbeats sent in one request"""
+    ticks = LessonProgressTickSerializer(many=True, allow_empty=False, max_length=500)
@@ -58,8 +58,11 @@ class CourseAnalyticsSerializer(serializers.Serializer):
     avg_course_progress = serializers.FloatField()
     active_students_count = serializers.IntegerField(help_text="Active in last 7 days")
     inactive_students_count = serializers.IntegerField(help_text="Inactive for 7+ days")
-    students_by_progress = TeacherStudentProgressSerializer(many=True)
+    students_by_progress = TeacherStudentProgressSerializer(
+        many=True, help_text="Top students by progress (preview)"
+    )
     progress_distribution = serializers.DictField(
-        help_text="Distribution: 0-25%, 25-50%, 50-75%, 75-100%"
+        help_text="Distribution by progress bucket, e.g. 0-25%, 25-50%, 50-75%, 75-100%"
     )
+    bucket_width = serializers.IntegerField(help_text="Width of the distribution buckets, in percent")
 
@@ -0,0 +1,75 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from lms.models import (
+    Teacher, Student, Category, Course, Section, Lesson, Enrollment
+)
+
+
+def make_teacher(name='Teacher'):
+    return Teacher.objects.create(
+        full_name=name,
+        email=f"{name.lower().replace(' ', '.')}@example.com",
+        password='password123'
+    )
+
+
+def make_student(name='Student'):
+    return Student.objects.create(
+        full_name=name,
+        email=f"{name.lower().replace(' ', '.')}@example.com",
+        password='password123'
+    )
+
+
+def make_course(teacher, title='Course', sections=1, lessons=2, duration_seconds=100):
+    """Course with `sections` sections of `lessons` lessons each"""
+    category, _ = Category.objects.get_or_create(title='Category')
+    course = Course.objects.create(
+        teacher=teacher,
+        category=category,
+        title=title,
+        description='Description',
+        price=0,
+        level='Beginner'
+    )
+    for section_order in range(sections):
+        section = Section.objects.create(course=course, title=f'Section {section_order}', order=section_order)
+        for lesson_order in range(lessons):
+            Lesson.objects.create(
+                section=section,
+                title=f'Lesson {lesson_order}',
+                order=lesson_order,
+                duration_seconds=duration_seconds
+            )
+    return course
+
+
+def course_lessons(course):
+    return list(Lesson.objects.filter(section__course=course).order_by('section__order', 'order'))
+
+
+def enroll(student, course):
+    return Enrollment.objects.create(student=student, course=course)
+
+
+def api_client(user=None):
+    """APIClient authenticated with an access token for a Teacher or Student"""
+    client = APIClient()
+    if user is not None:
+        kind = 'teacher' if isinstance(user, Teacher) else 'student'
+        token = RefreshToken().access_token
+        token[f'{kind}_id'] = user.id
+        token['email'] = user.email
+        token['user_type'] = kind
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+class LMSTestCase(TestCase):
+    """TestCase that empties the cache (principals, outlines, quizzes) before each test"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
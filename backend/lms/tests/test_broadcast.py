@@ -0,0 +1,123 @@
+from datetime import timedelta
+from unittest import mock
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from lms.models import BroadcastJob, Conversation, Notification
+from lms.utils import broadcast
+from lms.utils.inbox import count_unread_messages
+from lms.tests.factories import LMSTestCase, make_teacher, make_student, make_course, enroll, api_client
+
+
+class BroadcastTests(LMSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.teacher = make_teacher()
+        self.course = make_course(self.teacher)
+        self.students = [make_student(f'Student {i}') for i in range(5)]
+        for student in self.students[:3]:
+            enroll(student, self.course)
+        # Background jobs run synchronously (the test transaction is not
+        # visible to other threads)
+        patcher = mock.patch.object(broadcast, '_start_in_thread', side_effect=broadcast.run_broadcast_job)
+        self.start_in_thread = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def send(self, content='Hello'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return api_client(self.teacher).post('/api/messages/broadcast/', {
+                'course_id': self.course.id, 'content': content
+            }, format='json')
+
+    def test_inline_broadcast_adds_members_and_notifies(self):
+        response = self.send()
+        self.assertEqual(response.status_code, 201)
+        job = BroadcastJob.objects.get(id=response.data['broadcast_job']['id'])
+        self.assertEqual((job.status, job.processed_recipients), ('completed', 3))
+        self.start_in_thread.assert_not_called()
+
+        conversation = Conversation.objects.get(course=self.course, is_group=True)
+        self.assertEqual(conversation.participants_students.count(), 3)
+        self.assertEqual(Notification.objects.filter(course=self.course).count(), 3)
+        self.assertEqual(count_unread_messages(self.students[0]), 1)
+
+        # Students enrolled later join with the new broadcast unread
+        enroll(self.students[3], self.course)
+        self.send('Second')
+        self.assertEqual(conversation.participants_students.count(), 4)
+        self.assertEqual(count_unread_messages(self.students[0]), 2)
+        self.assertEqual(count_unread_messages(self.students[3]), 1)
+
+    @override_settings(BROADCAST_INLINE_LIMIT=1, BROADCAST_CHUNK_SIZE=2)
+    def test_large_course_runs_in_background_in_chunks(self):
+        response = self.send()
+        self.start_in_thread.assert_called_once_with(response.data['broadcast_job']['id'])
+        job = BroadcastJob.objects.get(id=response.data['broadcast_job']['id'])
+        self.assertEqual((job.status, job.processed_recipients, job.total_recipients), ('completed', 3, 3))
+        self.assertEqual(job.notifications.count(), 3)
+
+    @override_settings(BROADCAST_INLINE_LIMIT=1, BROADCAST_BACKGROUND_THREAD=False)
+    def test_failed_job_resumes_without_duplicate_notifications(self):
+        job_id = self.send().data['broadcast_job']['id']
+        job = BroadcastJob.objects.get(id=job_id)
+        self.assertEqual(job.status, 'pending')
+
+        # First run dies after notifying one student
+        Notification.objects.create(
+            student=self.students[0], course=self.course, broadcast=job, title='t', message='Hello'
+        )
+        BroadcastJob.objects.filter(id=job_id).update(status='failed')
+
+        call_command('process_broadcast_jobs', '--retry-failed', stdout=mock.Mock())
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.processed_recipients, 3)
+        self.assertEqual(
+            sorted(job.notifications.values_list('student_id', flat=True)),
+            sorted(student.id for student in self.students[:3])
+        )
+
+    @override_settings(BROADCAST_INLINE_LIMIT=1)
+    def test_polling_restarts_a_stalled_job(self):
+        with mock.patch.object(broadcast, '_start_in_thread'):
+            job_id = self.send().data['broadcast_job']['id']
+        # The worker died while running the job
+        BroadcastJob.objects.filter(id=job_id).update(
+            status='running', updated_at=timezone.now() - timedelta(hours=1)
+        )
+
+        response = api_client(self.teacher).get(f'/api/messages/broadcast/{job_id}/')
+        self.assertEqual(response.data['status'], 'completed')
+        self.assertEqual(response.data['processed_recipients'], 3)
+
+        # A job making progress is left alone
+        BroadcastJob.objects.filter(id=job_id).update(status='running', updated_at=timezone.now())
+        self.start_in_thread.reset_mock()
+        api_client(self.teacher).get(f'/api/messages/broadcast/{job_id}/')
+        self.start_in_thread.assert_not_called()
+
+    @override_settings(BROADCAST_INLINE_LIMIT=1, BROADCAST_BACKGROUND_THREAD=False)
+    def test_concurrent_runners_notify_each_student_once(self):
+        job_id = self.send().data['broadcast_job']['id']
+        real_notify = broadcast._notify_students
+        calls = []
+
+        def notify(job, student_ids, processed):
+            calls.append(job.id)
+            if len(calls) == 1:
+                # A second runner restarts the slow job after the first one
+                # computed its pending students, and finishes first
+                BroadcastJob.objects.filter(id=job_id).update(status='pending')
+                broadcast.run_broadcast_job(job_id)
+            return real_notify(job, student_ids, processed)
+
+        with mock.patch.object(broadcast, '_notify_students', side_effect=notify), \
+                mock.patch.object(broadcast, 'publish_notifications') as publish:
+            job = broadcast.run_broadcast_job(job_id)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(job.status, 'completed')
+        notified = sorted(job.notifications.values_list('student_id', flat=True))
+        self.assertEqual(notified, sorted(student.id for student in self.students[:3]))
+        published = [row['student'] for args, _ in publish.call_args_list for row in args[0]]
+        self.assertEqual(sorted(published), notified)
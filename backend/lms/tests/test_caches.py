@@ -0,0 +1,103 @@
+from unittest import mock
+from lms.models import Quiz, Question, Option
+from lms.utils import course_outline, quiz_cache
+from lms.tests.factories import (
+    LMSTestCase, make_teacher, make_student, make_course, course_lessons, enroll, api_client
+)
+
+
+class CourseOutlineCacheTests(LMSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.teacher = make_teacher()
+        self.course = make_course(self.teacher)
+        self.lesson = course_lessons(self.course)[0]
+        student = make_student()
+        enroll(student, self.course)
+        self.client = api_client(student)
+
+    def content(self):
+        response = self.client.get(f'/api/student/courses/{self.course.id}/content/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_outline_is_built_once_per_version(self):
+        with mock.patch.object(
+            course_outline, 'build_course_outline', wraps=course_outline.build_course_outline
+        ) as build:
+            self.content()
+            self.content()
+        self.assertEqual(build.call_count, 1)
+
+    def test_curriculum_write_rebuilds_the_outline(self):
+        self.assertEqual(self.content()['sections'][0]['lessons'][0]['title'], 'Lesson 0')
+
+        response = api_client(self.teacher).patch(
+            f'/api/teacher/lessons/{self.lesson.id}/', {'title': 'Renamed'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.content()['sections'][0]['lessons'][0]['title'], 'Renamed')
+
+
+class QuizCacheTests(LMSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.teacher = make_teacher()
+        course = make_course(self.teacher)
+        self.quiz = Quiz.objects.create(course=course, title='Quiz', pass_mark=50)
+        self.question = Question.objects.create(quiz=self.quiz, question_text='2 + 2?', order=0)
+        self.right = Option.objects.create(question=self.question, option_text='4', is_correct=True)
+        self.wrong = Option.objects.create(question=self.question, option_text='5')
+        student = make_student()
+        enroll(student, course)
+        self.client = api_client(student)
+        self.teacher_client = api_client(self.teacher)
+
+    def submit(self, option):
+        response = self.client.post(f'/api/student/quiz/{self.quiz.id}/submit/', {
+            'answers': {str(self.question.id): option.id}
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data
+
+    def test_option_edit_changes_the_answer_key(self):
+        self.assertEqual(self.submit(self.right)['correct_answers'], 1)
+
+        for option, is_correct in ((self.right, False), (self.wrong, True)):
+            response = self.teacher_client.patch(
+                f'/api/teacher/options/{option.id}/', {'is_correct': is_correct}, format='json'
+            )
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.submit(self.right)['correct_answers'], 0)
+        self.assertEqual(self.submit(self.wrong)['correct_answers'], 1)
+
+    def test_answer_key_is_compiled_once_per_version(self):
+        with mock.patch.object(
+            quiz_cache, 'build_quiz_answer_key', wraps=quiz_cache.build_quiz_answer_key
+        ) as build:
+            self.submit(self.right)
+            self.submit(self.wrong)
+        self.assertEqual(build.call_count, 1)
+
+    def test_content_edit_changes_payload_and_etag(self):
+        url = f'/api/student/quiz/{self.quiz.id}/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertNotIn('is_correct', response.data['questions'][0]['options'][0])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        response = self.teacher_client.post('/api/teacher/options/', {
+            'question': self.question.id, 'option_text': '6'
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(
+            [option['option_text'] for option in response.data['questions'][0]['options']],
+            ['4', '5', '6']
+        )
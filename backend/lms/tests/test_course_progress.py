@@ -0,0 +1,191 @@
+from lms.models import Certificate, Enrollment, StudentCourseProgress, StudentProgress
+from lms.utils.course_progress import (
+    apply_lesson_progress_batch, ensure_course_progress_rows, recalculate_course_progress
+)
+from lms.tests.factories import (
+    LMSTestCase, make_teacher, make_student, make_course, course_lessons, enroll, api_client
+)
+
+
+class CourseProgressTestCase(LMSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.teacher = make_teacher()
+        # 2 sections x 2 lessons of 100 seconds
+        self.course = make_course(self.teacher, sections=2, lessons=2, duration_seconds=100)
+        self.lessons = course_lessons(self.course)
+        self.student = make_student('Alice')
+        self.enrollment = enroll(self.student, self.course)
+        self.client = api_client(self.student)
+
+    def tick(self, lesson, watched_seconds, completed=False):
+        response = self.client.post('/api/student/lesson-progress/', {
+            'lesson_id': lesson.id,
+            'watched_seconds': watched_seconds,
+            'completed': completed
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def course_progress(self, student=None):
+        return StudentCourseProgress.objects.get(student=student or self.student, course=self.course)
+
+    def assertMatchesRecalculation(self, student=None):
+        """Running totals equal a from-scratch rebuild"""
+        student = student or self.student
+        incremental = self.course_progress(student)
+        recalculate_course_progress(student, self.course)
+        expected = self.course_progress(student)
+        self.assertAlmostEqual(incremental.progress_sum, expected.progress_sum)
+        self.assertEqual(incremental.completed_lessons, expected.completed_lessons)
+        self.assertAlmostEqual(incremental.overall_progress, expected.overall_progress)
+
+
+class ApplyLessonProgressTests(CourseProgressTestCase):
+    def test_ticks_apply_deltas_to_course_totals(self):
+        self.tick(self.lessons[0], 50)
+        self.assertAlmostEqual(self.course_progress().overall_progress, 12.5)
+
+        # Same lesson again: only its delta counts
+        self.tick(self.lessons[0], 80)
+        self.tick(self.lessons[1], 100)
+        course_progress = self.course_progress()
+        self.assertAlmostEqual(course_progress.progress_sum, 180)
+        self.assertEqual(course_progress.completed_lessons, 1)
+        self.assertAlmostEqual(course_progress.overall_progress, 45)
+        self.assertMatchesRecalculation()
+
+    def test_completion_flips_enrollment_and_issues_certificate_once(self):
+        for lesson in self.lessons[:-1]:
+            self.tick(lesson, 100)
+        self.assertFalse(Enrollment.objects.get(id=self.enrollment.id).completed)
+
+        self.tick(self.lessons[-1], 100)
+        self.assertTrue(Enrollment.objects.get(id=self.enrollment.id).completed)
+        self.assertEqual(Certificate.objects.filter(student=self.student, course=self.course).count(), 1)
+
+        # Unmarking a lesson un-completes the enrollment, re-completing keeps one certificate
+        self.tick(self.lessons[-1], 50, completed=False)
+        self.assertFalse(Enrollment.objects.get(id=self.enrollment.id).completed)
+        self.tick(self.lessons[-1], 100)
+        self.assertTrue(Enrollment.objects.get(id=self.enrollment.id).completed)
+        self.assertEqual(Certificate.objects.filter(student=self.student, course=self.course).count(), 1)
+        self.assertMatchesRecalculation()
+
+
+class ApplyLessonProgressBatchTests(CourseProgressTestCase):
+    def test_batch_matches_recalculation_for_several_students(self):
+        bob = make_student('Bob')
+        enroll(bob, self.course)
+        self.tick(self.lessons[0], 40)
+
+        written = apply_lesson_progress_batch({
+            (self.student.id, self.lessons[0].id): (70, False),
+            (self.student.id, self.lessons[1].id): (100, False),
+            (bob.id, self.lessons[2].id): (30, True),
+        })
+        self.assertEqual(written, 3)
+        self.assertMatchesRecalculation()
+        self.assertMatchesRecalculation(bob)
+        self.assertEqual(self.course_progress(bob).completed_lessons, 1)
+
+    def test_positions_only_move_forward_and_unchanged_rows_are_skipped(self):
+        lesson = self.lessons[0]
+        apply_lesson_progress_batch({(self.student.id, lesson.id): (60, False)})
+        self.assertEqual(apply_lesson_progress_batch({(self.student.id, lesson.id): (30, False)}), 0)
+        self.assertEqual(StudentProgress.objects.get(student=self.student, lesson=lesson).watched_seconds, 60)
+        self.assertAlmostEqual(self.course_progress().progress_sum, 60)
+
+    def test_batch_completing_course_flips_enrollment(self):
+        apply_lesson_progress_batch({
+            (self.student.id, lesson.id): (100, False) for lesson in self.lessons
+        })
+        self.assertTrue(Enrollment.objects.get(id=self.enrollment.id).completed)
+        self.assertTrue(Certificate.objects.filter(student=self.student, course=self.course).exists())
+
+
+class CurriculumChangeTests(CourseProgressTestCase):
+    def setUp(self):
+        super().setUp()
+        self.teacher_client = api_client(self.teacher)
+        self.tick(self.lessons[0], 100)
+        self.tick(self.lessons[1], 50)
+
+    def test_adding_a_lesson_rescales_overall_progress(self):
+        response = self.teacher_client.post('/api/teacher/lessons/', {
+            'section': self.lessons[0].section_id,
+            'title': 'New lesson',
+            'order': 5,
+            'duration_seconds': 100
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        course_progress = self.course_progress()
+        self.assertAlmostEqual(course_progress.progress_sum, 150)
+        self.assertAlmostEqual(course_progress.overall_progress, 30)
+        self.assertMatchesRecalculation()
+
+        # The next tick uses the new lesson total
+        self.tick(self.lessons[2], 100)
+        self.assertAlmostEqual(self.course_progress().overall_progress, 50)
+
+    def test_deleting_a_lesson_resyncs_totals(self):
+        response = self.teacher_client.delete(f'/api/teacher/lessons/{self.lessons[0].id}/')
+        self.assertEqual(response.status_code, 204)
+
+        course_progress = self.course_progress()
+        self.assertAlmostEqual(course_progress.progress_sum, 50)
+        self.assertEqual(course_progress.completed_lessons, 0)
+        self.assertAlmostEqual(course_progress.overall_progress, 50 / 3)
+        self.assertMatchesRecalculation()
+
+    def test_changing_a_duration_resyncs_totals(self):
+        response = self.teacher_client.patch(f'/api/teacher/lessons/{self.lessons[1].id}/', {
+            'duration_seconds': 200
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertAlmostEqual(self.course_progress().progress_sum, 125)
+        self.assertMatchesRecalculation()
+
+
+class RosterTests(CourseProgressTestCase):
+    def test_roster_seeds_missing_rows_from_existing_progress(self):
+        bob = make_student('Bob')
+        enroll(bob, self.course)
+        # Progress written before course totals existed
+        StudentProgress.objects.create(student=bob, lesson=self.lessons[0], watched_seconds=100, completed=True)
+        StudentProgress.objects.create(student=bob, lesson=self.lessons[1], watched_seconds=20)
+
+        response = api_client(self.teacher).get(
+            f'/api/teacher/courses/{self.course.id}/students/', {'sort': 'progress'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['student_id'] for row in response.data], [bob.id, self.student.id])
+        self.assertAlmostEqual(response.data[0]['overall_progress'], 30)
+        self.assertEqual(response.data[1]['overall_progress'], 0)
+        self.assertMatchesRecalculation(bob)
+
+        # Rows exist now: nothing more to seed
+        self.assertEqual(ensure_course_progress_rows(self.course), 0)
+
+
+class CourseContentOverlayTests(CourseProgressTestCase):
+    def test_content_includes_lesson_progress_and_rollups(self):
+        self.tick(self.lessons[0], 100)
+        self.tick(self.lessons[2], 50)
+
+        response = self.client.get(f'/api/student/courses/{self.course.id}/content/')
+        self.assertEqual(response.status_code, 200)
+        first_section, second_section = response.data['sections']
+        self.assertEqual(first_section['lessons'][0]['progress'], {'watched_seconds': 100, 'completed': True})
+        self.assertEqual(first_section['lessons'][1]['progress'], {'watched_seconds': 0, 'completed': False})
+        self.assertEqual(first_section['progress'], {
+            'total_lessons': 2, 'completed_lessons': 1, 'progress_percent': 50.0
+        })
+        self.assertEqual(second_section['progress'], {
+            'total_lessons': 2, 'completed_lessons': 0, 'progress_percent': 25.0
+        })
+        self.assertEqual(response.data['progress'], {
+            'total_lessons': 4, 'completed_lessons': 1, 'progress_percent': 37.5
+        })
+        self.assertFalse(response.data['enrollment_completed'])
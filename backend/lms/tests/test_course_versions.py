@@ -0,0 +1,49 @@
+from decimal import Decimal
+from django.db.models import F
+from django.test import TestCase
+from lms.models import Course, Quiz
+from lms.utils.course_outline import bump_course_outline_version
+from lms.utils.quiz_cache import bump_quiz_content_version
+from lms.tests.factories import LMSTestCase, make_teacher, make_course, api_client
+
+
+class PreservedFieldsTests(TestCase):
+    def setUp(self):
+        self.course = make_course(make_teacher())
+
+    def test_saving_a_stale_course_keeps_concurrent_increments(self):
+        stale = Course.objects.get(id=self.course.id)
+        bump_course_outline_version(self.course.id)
+        Course.objects.filter(id=self.course.id).update(total_revenue=F('total_revenue') + Decimal('10'))
+
+        stale.title = 'Renamed'
+        stale.save()
+
+        course = Course.objects.get(id=self.course.id)
+        self.assertEqual(course.title, 'Renamed')
+        self.assertEqual(course.outline_version, 1)
+        self.assertEqual(course.total_revenue, Decimal('10'))
+
+    def test_saving_a_stale_quiz_keeps_its_content_version(self):
+        quiz = Quiz.objects.create(course=self.course, title='Quiz', pass_mark=50)
+        stale = Quiz.objects.get(id=quiz.id)
+        bump_quiz_content_version(quiz.id)
+
+        stale.pass_mark = 80
+        stale.save()
+
+        quiz.refresh_from_db()
+        self.assertEqual((quiz.pass_mark, quiz.content_version), (80, 1))
+
+
+class TeacherCourseUpdateTests(LMSTestCase):
+    def test_update_bumps_the_stored_outline_version(self):
+        teacher = make_teacher()
+        course = make_course(teacher)
+        Course.objects.filter(id=course.id).update(outline_version=5)
+
+        response = api_client(teacher).patch(f'/api/teacher/courses/{course.id}/', {'title': 'New title'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        course.refresh_from_db()
+        self.assertEqual((course.title, course.outline_version), ('New title', 6))
@@ -0,0 +1,64 @@
+import json
+from lms.models import Section, Lesson
+from lms.utils.curriculum_io import CURRICULUM_CONTENT_TYPE, export_curriculum
+from lms.tests.factories import LMSTestCase, make_teacher, make_course, api_client
+
+
+class CurriculumImportTests(LMSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.teacher = make_teacher()
+        self.course = make_course(self.teacher, sections=1, lessons=2)
+        self.client = api_client(self.teacher)
+        self.url = f'/api/teacher/courses/{self.course.id}/curriculum/import/'
+
+    def post(self, body):
+        return self.client.generic('POST', self.url, body, content_type=CURRICULUM_CONTENT_TYPE)
+
+    def jsonl(self, *records):
+        return ''.join(json.dumps(record) + '\n' for record in records).encode('utf-8')
+
+    def curriculum(self):
+        return list(Section.objects.filter(course=self.course).values_list('id', 'title', 'order')), list(
+            Lesson.objects.filter(section__course=self.course).values_list('id', 'title', 'duration_seconds')
+        )
+
+    def test_exported_curriculum_imports(self):
+        body = ''.join(export_curriculum(self.course)).encode('utf-8')
+        response = self.post(body)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created']['section'], 1)
+        self.assertEqual(response.data['created']['lesson'], 2)
+        self.assertEqual(Section.objects.filter(course=self.course).count(), 2)
+
+    def test_malformed_records_are_rejected_without_changes(self):
+        before = self.curriculum()
+        section = {'type': 'section', 'ref': 1, 'title': 'Section', 'order': 0}
+        lesson = {'type': 'lesson', 'section': 1, 'title': 'Lesson', 'duration_seconds': 60}
+        cases = [
+            ({**section, 'order': 'x'}, 'order'),
+            ({**section, 'order': -1}, 'order'),
+            ({**section, 'title': {'a': 1}}, 'title'),
+            ({**section, 'title': '   '}, 'title'),
+            ({**section, 'title': 'x' * 201}, 'title'),
+            ({**section, 'ref': [1]}, None),
+        ]
+        for record, field in cases:
+            with self.subTest(record=record):
+                response = self.post(self.jsonl(record, lesson))
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data['line'], '1')
+                if field:
+                    self.assertIn(field, response.data['fields'])
+
+        # A bad lesson after valid sections rolls the whole import back
+        response = self.post(self.jsonl(section, {**lesson, 'duration_seconds': 'abc'}))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['line'], '2')
+        self.assertIn('duration_seconds', response.data['fields'])
+
+        response = self.post(self.jsonl(section) + b'{"type": "lesson", "title": "\xff"}\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['line'], '2')
+
+        self.assertEqual(self.curriculum(), before)
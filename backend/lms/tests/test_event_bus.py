@@ -0,0 +1,58 @@
+from datetime import timedelta
+from django.db.models import F
+from django.test import TestCase
+from lms.models import RealtimeEvent
+from lms.utils.event_bus import DatabaseEventBus, InProcessEventBus, RESYNC_EVENT
+
+
+def _age_events(seconds):
+    RealtimeEvent.objects.update(created_at=F('created_at') - timedelta(seconds=seconds))
+
+
+class DatabaseEventBusTests(TestCase):
+    def setUp(self):
+        self.bus = DatabaseEventBus(poll_interval=0.01, visibility_lag=60)
+
+    def test_events_are_read_after_the_visibility_lag(self):
+        self.bus.publish(['student:1', 'student:2'], 'message', {'text': 'hi'})
+        self.assertEqual(self.bus.wait(['student:1'], 0, timeout=0), ([], 0))
+
+        _age_events(120)
+        events, cursor = self.bus.wait(['student:1'], 0, timeout=0)
+        self.assertEqual([(event['type'], event['data']) for event in events], [('message', {'text': 'hi'})])
+        self.assertEqual(cursor, events[0]['id'])
+        self.assertEqual(self.bus.wait(['student:1'], cursor, timeout=0), ([], cursor))
+
+    def test_out_of_order_commit_is_not_skipped(self):
+        # id 11 commits first, id 10 (allocated earlier) commits later
+        RealtimeEvent.objects.create(id=11, channel='student:1', event_type='message', payload={'n': 11})
+        self.assertEqual(self.bus.wait(['student:1'], 9, timeout=0), ([], 9))
+        RealtimeEvent.objects.create(id=10, channel='student:1', event_type='message', payload={'n': 10})
+
+        _age_events(120)
+        events, cursor = self.bus.wait(['student:1'], 9, timeout=0)
+        self.assertEqual([event['id'] for event in events], [10, 11])
+        self.assertEqual(cursor, 11)
+
+    def test_prune_deletes_old_events(self):
+        self.bus.publish(['student:1'], 'message', {})
+        _age_events(120)
+        self.bus.publish(['student:1'], 'message', {})
+        self.assertEqual(DatabaseEventBus.prune(60), 1)
+        self.assertEqual(RealtimeEvent.objects.count(), 1)
+
+
+class InProcessEventBusTests(TestCase):
+    def test_wait_returns_only_subscribed_channels(self):
+        bus = InProcessEventBus(buffer_size=10)
+        bus.publish_many([('student:1', 'message', {'n': 1}), ('student:2', 'message', {'n': 2})])
+        events, cursor = bus.wait(['student:2'], 0, timeout=0)
+        self.assertEqual([event['data'] for event in events], [{'n': 2}])
+        self.assertEqual(cursor, bus.head())
+
+    def test_cursor_behind_the_buffer_gets_resync(self):
+        bus = InProcessEventBus(buffer_size=2)
+        bus.publish(['student:1'] * 3, 'message', {})
+        events, cursor = bus.wait(['student:1'], 0, timeout=0)
+        self.assertEqual([event['type'] for event in events], [RESYNC_EVENT])
+        self.assertEqual(cursor, 3)
@@ -0,0 +1,80 @@
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from lms.models import Conversation, Message
+from lms.utils.inbox import (
+    participant_states, ensure_participant_states, record_message,
+    mark_conversation_read, count_unread_messages
+)
+from lms.tests.factories import LMSTestCase, make_teacher, make_student, make_course, enroll, api_client
+
+
+def send(conversation, sender, content='Hello'):
+    message = Message.objects.create(
+        conversation=conversation,
+        sender_content_type=ContentType.objects.get_for_model(type(sender)),
+        sender_object_id=sender.id,
+        content=content
+    )
+    record_message(conversation, message, sender)
+    return message
+
+
+class InboxStateTests(TestCase):
+    def setUp(self):
+        self.teacher = make_teacher()
+        self.student = make_student()
+        self.conversation = Conversation.objects.create(is_group=False)
+        self.conversation.participants_teachers.add(self.teacher)
+        self.conversation.participants_students.add(self.student)
+        ensure_participant_states(self.conversation, teacher_ids=[self.teacher.id], student_ids=[self.student.id])
+
+    def state(self, user):
+        return participant_states(user).get(conversation=self.conversation)
+
+    def test_messages_count_as_unread_for_the_other_participants_only(self):
+        send(self.conversation, self.teacher)
+        last = send(self.conversation, self.teacher)
+        self.assertEqual(count_unread_messages(self.student), 2)
+        self.assertEqual(count_unread_messages(self.teacher), 0)
+        self.assertEqual(self.state(self.teacher).last_read_message_id, last.id)
+
+        self.assertEqual(mark_conversation_read(self.conversation, self.student), 2)
+        self.assertEqual(count_unread_messages(self.student), 0)
+        self.assertEqual(self.state(self.student).last_read_message_id, last.id)
+        self.assertEqual(mark_conversation_read(self.conversation, self.student), 0)
+
+    def test_mark_read_uses_the_stored_last_message(self):
+        first = send(self.conversation, self.teacher)
+        stale = Conversation.objects.get(id=self.conversation.id)
+        self.assertEqual(stale.last_message_id, first.id)
+
+        # Recorded after the reader loaded the conversation
+        second = send(self.conversation, self.teacher)
+
+        self.assertEqual(mark_conversation_read(stale, self.student), 2)
+        state = self.state(self.student)
+        self.assertEqual((state.unread_count, state.last_read_message_id), (0, second.id))
+
+    def test_new_participants_start_with_nothing_unread(self):
+        send(self.conversation, self.teacher)
+        newcomer = make_student('Newcomer')
+        ensure_participant_states(self.conversation, student_ids=[newcomer.id])
+        self.assertEqual(count_unread_messages(newcomer), 0)
+
+
+class UnreadCountViewTests(LMSTestCase):
+    def test_unread_count_follows_sent_and_read_messages(self):
+        teacher = make_teacher()
+        student = make_student()
+        enroll(student, make_course(teacher))
+        conversation_id = api_client(teacher).post(
+            '/api/messages/start_private/', {'student_id': student.id}, format='json'
+        ).data['id']
+        for content in ('One', 'Two'):
+            api_client(teacher).post('/api/messages/send/', {
+                'conversation_id': conversation_id, 'content': content
+            }, format='json')
+
+        self.assertEqual(api_client(student).get('/api/messages/unread_count/').data['unread_total'], 2)
+        api_client(student).post('/api/messages/mark_read/', {'conversation_id': conversation_id}, format='json')
+        self.assertEqual(api_client(student).get('/api/messages/unread_count/').data['unread_total'], 0)
@@ -0,0 +1,127 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class MigrationTestCase(TransactionTestCase):
+    """Migrate lms back to migrate_from, build data with historical models, then migrate to migrate_to"""
+    migrate_from = None
+    migrate_to = None
+
+    def setUp(self):
+        super().setUp()
+        executor = MigrationExecutor(connection)
+        self.latest = executor.loader.graph.leaf_nodes('lms')
+        executor.migrate([('lms', self.migrate_from)])
+        self.old_apps = executor.loader.project_state([('lms', self.migrate_from)]).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.latest)
+        super().tearDown()
+
+    def migrate(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([('lms', self.migrate_to)])
+        return executor.loader.project_state([('lms', self.migrate_to)]).apps
+
+    def make_people(self, apps, count=1):
+        Teacher = apps.get_model('lms', 'Teacher')
+        Student = apps.get_model('lms', 'Student')
+        teacher = Teacher.objects.create(full_name='Teacher', email='teacher@example.com', password='x')
+        students = [
+            Student.objects.create(full_name=f'Student {index}', email=f'student{index}@example.com', password='x')
+            for index in range(count)
+        ]
+        return teacher, students
+
+
+class BackfillInboxStateTests(MigrationTestCase):
+    migrate_from = '0019_coursedailystat'
+    migrate_to = '0020_conversation_inbox_state'
+
+    def test_backfills_last_message_and_unread_counts(self):
+        ContentType = self.old_apps.get_model('contenttypes', 'ContentType')
+        Conversation = self.old_apps.get_model('lms', 'Conversation')
+        Message = self.old_apps.get_model('lms', 'Message')
+        teacher, (student,) = self.make_people(self.old_apps)
+        teacher_type, _ = ContentType.objects.get_or_create(app_label='lms', model='teacher')
+        student_type, _ = ContentType.objects.get_or_create(app_label='lms', model='student')
+
+        chat = Conversation.objects.create(is_group=False)
+        chat.participants_teachers.add(teacher)
+        chat.participants_students.add(student)
+        empty = Conversation.objects.create(is_group=False)
+        empty.participants_teachers.add(teacher)
+        empty.participants_students.add(student)
+
+        def send(sender_type, sender, is_read):
+            return Message.objects.create(
+                conversation=chat, sender_content_type=sender_type, sender_object_id=sender.id,
+                content='Hello', is_read=is_read
+            )
+
+        send(teacher_type, teacher, True)
+        student_reply = send(student_type, student, True)
+        send(teacher_type, teacher, False)
+        last = send(teacher_type, teacher, False)
+
+        apps = self.migrate()
+        Conversation = apps.get_model('lms', 'Conversation')
+        ConversationParticipantState = apps.get_model('lms', 'ConversationParticipantState')
+
+        chat = Conversation.objects.get(id=chat.id)
+        self.assertEqual(chat.last_message_id, last.id)
+        self.assertEqual(chat.last_message_at, last.created_at)
+
+        states = {
+            (state.conversation_id, state.participant_content_type_id): state
+            for state in ConversationParticipantState.objects.all()
+        }
+        self.assertEqual(len(states), 4)
+        # The student has two unread teacher messages after their reply
+        self.assertEqual(states[(chat.id, student_type.id)].unread_count, 2)
+        self.assertEqual(states[(chat.id, student_type.id)].last_read_message_id, student_reply.id)
+        # The teacher sent every unread message: nothing unread for them
+        self.assertEqual(states[(chat.id, teacher_type.id)].unread_count, 0)
+        self.assertEqual(states[(chat.id, teacher_type.id)].last_read_message_id, last.id)
+
+        empty = Conversation.objects.get(id=empty.id)
+        self.assertIsNone(empty.last_message_id)
+        self.assertEqual(states[(empty.id, student_type.id)].unread_count, 0)
+        self.assertEqual(states[(empty.id, student_type.id)].last_message_at, empty.created_at)
+
+
+class BackfillPrivatePairsTests(MigrationTestCase):
+    migrate_from = '0020_conversation_inbox_state'
+    migrate_to = '0021_conversation_private_pair'
+
+    def test_oldest_private_chat_of_a_pair_gets_the_key(self):
+        Conversation = self.old_apps.get_model('lms', 'Conversation')
+        teacher, (alice, bob) = self.make_people(self.old_apps, count=2)
+
+        def conversation(students, is_group=False):
+            created = Conversation.objects.create(is_group=is_group)
+            created.participants_teachers.add(teacher)
+            created.participants_students.add(*students)
+            return created
+
+        oldest = conversation([alice])
+        duplicate = conversation([alice])
+        group = conversation([bob], is_group=True)
+        several = conversation([alice, bob])
+
+        apps = self.migrate()
+        Conversation = apps.get_model('lms', 'Conversation')
+        pairs = {
+            conversation_id: (teacher_id, student_id)
+            for conversation_id, teacher_id, student_id in Conversation.objects.values_list(
+                'id', 'private_teacher_id', 'private_student_id'
+            )
+        }
+        self.assertEqual(pairs[oldest.id], (teacher.id, alice.id))
+        self.assertEqual(pairs[duplicate.id], (None, None))
+        self.assertEqual(pairs[group.id], (None, None))
+        self.assertEqual(pairs[several.id], (None, None))
@@ -0,0 +1,54 @@
+from unittest import mock
+from lms.models import Conversation, ConversationParticipantState
+from lms.views import message_views
+from lms.tests.factories import LMSTestCase, make_teacher, make_student, make_course, enroll, api_client
+
+
+class StartPrivateChatTests(LMSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.teacher = make_teacher()
+        self.student = make_student()
+        enroll(self.student, make_course(self.teacher))
+
+    def start(self, user, **data):
+        return api_client(user).post('/api/messages/start_private/', data, format='json')
+
+    def test_both_sides_get_the_same_chat(self):
+        first = self.start(self.teacher, student_id=self.student.id)
+        second = self.start(self.student, teacher_id=self.teacher.id)
+        self.assertTrue(first.data['created'])
+        self.assertFalse(second.data['created'])
+        self.assertEqual(first.data['id'], second.data['id'])
+        self.assertEqual(ConversationParticipantState.objects.filter(conversation_id=first.data['id']).count(), 2)
+
+        response = api_client(self.student).post('/api/messages/send/', {
+            'conversation_id': first.data['id'], 'content': 'Hello'
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_failed_setup_leaves_no_keyed_chat(self):
+        with mock.patch.object(message_views, 'ensure_participant_states', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                self.start(self.teacher, student_id=self.student.id)
+        self.assertFalse(Conversation.objects.filter(private_student=self.student).exists())
+
+        response = self.start(self.teacher, student_id=self.student.id)
+        self.assertTrue(response.data['created'])
+        conversation = Conversation.objects.get(id=response.data['id'])
+        self.assertEqual(list(conversation.participants_students.all()), [self.student])
+
+    def test_losing_a_concurrent_create_returns_the_winner(self):
+        winner = self.start(self.teacher, student_id=self.student.id).data['id']
+
+        # The lookup misses (the winner had not committed yet), so the
+        # create runs into the unique pair key
+        missing = mock.Mock()
+        missing.first.return_value = None
+        with mock.patch.object(Conversation.objects, 'filter', return_value=missing):
+            response = self.start(self.student, teacher_id=self.teacher.id)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['created'])
+        self.assertEqual(response.data['id'], winner)
+        self.assertEqual(Conversation.objects.filter(private_student=self.student).count(), 1)
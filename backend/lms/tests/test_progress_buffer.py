@@ -0,0 +1,105 @@
+from unittest import mock
+from django.db import IntegrityError, OperationalError
+from django.test import TestCase
+from lms.models import StudentProgress
+from lms.utils import progress_buffer as progress_buffer_module
+from lms.utils.progress_buffer import ProgressWriteBuffer
+from lms.tests.factories import (
+    LMSTestCase, make_teacher, make_student, make_course, course_lessons, enroll, api_client
+)
+
+
+class ProgressWriteBufferTests(TestCase):
+    def setUp(self):
+        self.course = make_course(make_teacher())
+        self.lesson = course_lessons(self.course)[0]
+        self.alice = make_student('Alice')
+        self.bob = make_student('Bob')
+        enroll(self.alice, self.course)
+        enroll(self.bob, self.course)
+        # max_age_seconds=0: no background flusher thread
+        self.buffer = ProgressWriteBuffer(max_pending=1000, max_age_seconds=0)
+
+    def test_coalesces_ticks_keeping_highest_position(self):
+        self.buffer.add(self.alice.id, self.lesson.id, 30, False)
+        self.buffer.add(self.alice.id, self.lesson.id, 20, False)
+        self.assertEqual(self.buffer.flush(), 1)
+        progress = StudentProgress.objects.get(student=self.alice, lesson=self.lesson)
+        self.assertEqual(progress.watched_seconds, 30)
+
+    def test_deleted_student_does_not_block_other_entries(self):
+        self.buffer.add(self.alice.id, self.lesson.id, 30, False)
+        self.alice.delete()
+        self.buffer.add(self.bob.id, self.lesson.id, 40, False)
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self.buffer._pending, {})
+        self.assertEqual(StudentProgress.objects.get(student=self.bob, lesson=self.lesson).watched_seconds, 40)
+
+    def test_rejected_entry_is_dropped_and_others_written(self):
+        real_apply = progress_buffer_module.apply_lesson_progress_batch
+        bad_key = (self.alice.id, self.lesson.id)
+
+        def apply(entries):
+            if bad_key in entries:
+                raise IntegrityError('FOREIGN KEY constraint failed')
+            return real_apply(entries)
+
+        self.buffer.add(self.alice.id, self.lesson.id, 30, False)
+        self.buffer.add(self.bob.id, self.lesson.id, 40, False)
+        with mock.patch.object(progress_buffer_module, 'apply_lesson_progress_batch', side_effect=apply), \
+                self.assertLogs('lms.utils.progress_buffer', 'ERROR') as logs:
+            self.assertEqual(self.buffer.flush(), 1)
+        self.assertIn('Dropping buffered lesson ticks', logs.output[-1])
+
+        self.assertEqual(self.buffer._pending, {})
+        self.assertTrue(StudentProgress.objects.filter(student=self.bob, lesson=self.lesson).exists())
+        self.assertFalse(StudentProgress.objects.filter(student=self.alice, lesson=self.lesson).exists())
+
+    def test_transient_failure_keeps_entries_for_next_flush(self):
+        self.buffer.add(self.alice.id, self.lesson.id, 30, False)
+        with mock.patch.object(
+            progress_buffer_module, 'apply_lesson_progress_batch', side_effect=OperationalError('gone away')
+        ), self.assertLogs('lms.utils.progress_buffer', 'ERROR'):
+            self.assertEqual(self.buffer.flush(), 0)
+        self.assertIn((self.alice.id, self.lesson.id), self.buffer._pending)
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self.buffer._pending, {})
+
+
+class LessonProgressBatchViewTests(LMSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.course = make_course(make_teacher())
+        self.lesson = course_lessons(self.course)[0]
+        self.alice = make_student('Alice')
+        self.bob = make_student('Bob')
+        enroll(self.alice, self.course)
+        enroll(self.bob, self.course)
+        buffer = progress_buffer_module.progress_buffer
+        # Every flush_if_due() is due, and no background flusher thread
+        patcher = mock.patch.object(buffer, 'max_age_seconds', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(buffer._pending.clear)
+
+    def test_failing_buffered_entry_does_not_fail_other_requests(self):
+        progress_buffer_module.progress_buffer.add(self.alice.id, self.lesson.id, 30, False)
+        real_apply = progress_buffer_module.apply_lesson_progress_batch
+        bad_key = (self.alice.id, self.lesson.id)
+
+        def apply(entries):
+            if bad_key in entries:
+                raise IntegrityError('FOREIGN KEY constraint failed')
+            return real_apply(entries)
+
+        with mock.patch.object(progress_buffer_module, 'apply_lesson_progress_batch', side_effect=apply), \
+                self.assertLogs('lms.utils.progress_buffer', 'ERROR'):
+            response = api_client(self.bob).post('/api/student/lesson-progress/batch/', {
+                'ticks': [{'lesson_id': self.lesson.id, 'watched_seconds': 50, 'completed': False}]
+            }, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(StudentProgress.objects.get(student=self.bob, lesson=self.lesson).watched_seconds, 50)
+        self.assertEqual(progress_buffer_module.progress_buffer._pending, {})
@@ -0,0 +1,41 @@
+from unittest import mock
+from lms.utils import search_index
+from lms.utils.search_index import InvertedIndexBackend, MySQLFullTextBackend
+from lms.tests.factories import LMSTestCase, make_teacher, make_course, api_client
+
+
+class CourseSearchTests(LMSTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(search_index, '_backend', InvertedIndexBackend())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        teacher = make_teacher()
+        self.python = make_course(teacher, title='Python programming')
+        self.django = make_course(teacher, title='Django web')
+        self.django.description = 'Build web apps with python'
+        self.django.save()
+        self.go = make_course(teacher, title='Go AI basics')
+
+    def test_relevance_ranks_title_matches_first(self):
+        response = api_client().get('/api/search/', {'q': 'python'})
+        self.assertEqual([course['id'] for course in response.data['results']], [self.python.id, self.django.id])
+        self.assertEqual(response.data['count'], 2)
+
+    def test_relevance_cursor_pagination_walks_every_hit_once(self):
+        seen = []
+        response = api_client().get('/api/search/', {'q': 'python', 'pagination': 'cursor', 'page_size': 1})
+        while True:
+            seen += [course['id'] for course in response.data['results']]
+            if not response.data['next']:
+                break
+            response = api_client().get(response.data['next'])
+        self.assertEqual(seen, [self.python.id, self.django.id])
+
+    def test_mysql_backend_falls_back_to_substring_for_short_terms(self):
+        backend = MySQLFullTextBackend()
+        with mock.patch.object(backend, '_substring_search', wraps=backend._substring_search) as substring:
+            results = backend.search('AI')
+        substring.assert_called_once()
+        self.assertEqual([course_id for course_id, _ in results], [self.go.id])
+        self.assertEqual([course_id for course_id, _ in backend.search('go ai')], [self.go.id])
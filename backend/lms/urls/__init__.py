@@ -9,7 +9,8 @@ from lms.views import (
     message_views,
     teacher_message_views,
     student_message_views,
-    notification_views
+    notification_views,
+    realtime_views
 )
 from lms.views.auth_views import CustomTokenRefreshView
 from lms.views.search_views import RecommendCoursesView
@@ -33,6 +34,9 @@ router.register(r'teacher/options', teacher_views.OptionViewSet, basename='teach
 
 # URL patterns
 urlpatterns = [
+    # Must come before the router, otherwise courses/<pk>/ swallows it
+    path('courses/recommend/', RecommendCoursesView.as_view(), name='recommend-courses'),
+
     # Router URLs (ViewSets)
     path('', include(router.urls)),
     
@@ -60,12 +64,16 @@ urlpatterns = [
     path('teacher/courses/<int:course_id>/analytics/', 
          teacher_progress_views.CourseAnalyticsView.as_view(), 
          name='teacher-course-analytics'),
+    path('teacher/courses/<int:course_id>/analytics/students/', 
+         teacher_progress_views.CourseProgressRankingView.as_view(), 
+         name='teacher-course-analytics-students'),
     
     # Student endpoints
     path('student/enroll/', student_views.EnrollmentView.as_view(), name='student-enroll'),
     path('student/courses/', student_views.EnrollmentView.as_view(), name='student-courses'),
     path('student/courses/<int:course_id>/content/', student_views.StudentCourseContentView.as_view(), name='student-course-content'),
     path('student/lesson-progress/', student_views.StudentLessonProgressView.as_view(), name='student-lesson-progress'),
+    path('student/lesson-progress/batch/', student_views.StudentLessonProgressBatchView.as_view(), name='student-lesson-progress-batch'),
     path('student/quiz/<int:quiz_id>/', student_views.StudentQuizDetailView.as_view(), name='student-quiz-detail'),
     path('student/quiz/<int:quiz_id>/submit/', student_views.StudentQuizSubmitView.as_view(), name='student-quiz-submit'),
     path('student/quiz/attempts/', student_views.StudentQuizAttemptsListView.as_view(), name='student-quiz-attempts'),
@@ -90,7 +98,6 @@ urlpatterns = [
     
     # Search endpoints
     path('search/', include('lms.urls.search_urls')),
-    path('courses/recommend/', RecommendCoursesView.as_view(), name='recommend-courses'),
     
     # Message endpoints (for both teacher and student)
     path('messages/conversations/', message_views.ConversationsListView.as_view(), name='conversations-list'),
@@ -98,8 +105,11 @@ urlpatterns = [
     path('messages/send/', message_views.SendMessageView.as_view(), name='send-message'),
     path('messages/start_private/', message_views.StartPrivateChatView.as_view(), name='start-private-chat'),
     path('messages/broadcast/', message_views.BroadcastMessageView.as_view(), name='broadcast-message'),
+    path('messages/broadcast/<int:job_id>/', message_views.BroadcastJobStatusView.as_view(), name='broadcast-job-status'),
     path('messages/mark_read/', message_views.MarkMessagesReadView.as_view(), name='mark-read'),
     path('messages/unread_count/', message_views.UnreadCountView.as_view(), name='unread-count'),
+    path('messages/events/', realtime_views.MessageEventsPollView.as_view(), name='message-events'),
+    path('messages/stream/', realtime_views.MessageEventStreamView.as_view(), name='message-stream'),
     
     # Teacher message endpoints
     path('teacher/messages/unread_count/', teacher_message_views.TeacherUnreadCountView.as_view(), name='teacher-unread-count'),
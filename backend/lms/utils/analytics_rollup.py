@@ -0,0 +1,102 @@
+from decimal import Decimal
+from django.db import transaction, IntegrityError
+from django.db.models import F, Sum, Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from lms.models import Course, Enrollment, Order, CourseDailyStat
+
+
+def _add_to_day(course, day, revenue=Decimal('0'), enrollments=0):
+    """
+    Atomically add to the (course, day) rollup row, creating it if needed.
+    UPDATE first (the common case once the day's row exists); on a miss,
+    INSERT, and if a concurrent request inserted it first, UPDATE again.
+    """
+    increments = {}
+    if revenue:
+        increments['revenue'] = F('revenue') + revenue
+    if enrollments:
+        increments['enrollments'] = F('enrollments') + enrollments
+    if not increments:
+        return
+
+    rows = CourseDailyStat.objects.filter(course_id=course.id, date=day)
+    if rows.update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            CourseDailyStat.objects.create(
+                teacher_id=course.teacher_id,
+                course_id=course.id,
+                date=day,
+                revenue=revenue,
+                enrollments=enrollments
+            )
+    except IntegrityError:
+        rows.update(**increments)
+
+
+def record_paid_order(order):
+    """
+    Roll a newly paid order into the daily stats and the course's running
+    revenue total. Call exactly once, on the pending -> paid transition.
+    """
+    course = order.course
+    day = timezone.localdate(order.updated_at or timezone.now())
+    _add_to_day(course, day, revenue=order.amount)
+    Course.objects.filter(id=course.id).update(total_revenue=F('total_revenue') + order.amount)
+
+
+def record_enrollment(enrollment):
+    """Roll a newly created enrollment into the daily stats"""
+    day = timezone.localdate(enrollment.enrolled_at or timezone.now())
+    _add_to_day(enrollment.course, day, enrollments=1)
+
+
+@transaction.atomic
+def rebuild_daily_stats(course_ids=None):
+    """
+    Recompute CourseDailyStat rows and Course.total_revenue from Order and
+    Enrollment (all courses, or only course_ids). Returns the row count.
+    """
+    courses = Course.objects.all()
+    if course_ids is not None:
+        courses = courses.filter(id__in=course_ids)
+    teacher_of = dict(courses.values_list('id', 'teacher_id'))
+
+    CourseDailyStat.objects.filter(course_id__in=list(teacher_of)).delete()
+
+    stats = {}
+    paid = Order.objects.filter(course_id__in=list(teacher_of), payment_status='paid').annotate(
+        day=TruncDate('updated_at')
+    ).values_list('course_id', 'day').annotate(revenue=Sum('amount')).order_by()
+    for course_id, day, revenue in paid:
+        stats[(course_id, day)] = [revenue or Decimal('0'), 0]
+
+    enrolled = Enrollment.objects.filter(course_id__in=list(teacher_of)).annotate(
+        day=TruncDate('enrolled_at')
+    ).values_list('course_id', 'day').annotate(count=Count('id')).order_by()
+    for course_id, day, count in enrolled:
+        stats.setdefault((course_id, day), [Decimal('0'), 0])[1] = count
+
+    CourseDailyStat.objects.bulk_create([
+        CourseDailyStat(
+            teacher_id=teacher_of[course_id],
+            course_id=course_id,
+            date=day,
+            revenue=revenue,
+            enrollments=enrollments
+        )
+        for (course_id, day), (revenue, enrollments) in stats.items()
+    ], batch_size=1000)
+
+    totals = dict(
+        Order.objects.filter(course_id__in=list(teacher_of), payment_status='paid')
+        .values_list('course_id').annotate(total=Sum('amount')).order_by()
+    )
+    to_update = []
+    for course in courses.only('id', 'total_revenue'):
+        course.total_revenue = totals.get(course.id) or Decimal('0')
+        to_update.append(course)
+    Course.objects.bulk_update(to_update, ['total_revenue'], batch_size=1000)
+    return len(stats)
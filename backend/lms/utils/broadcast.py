@@ -0,0 +1,190 @@
+import logging
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from lms.models import BroadcastJob, Conversation, Enrollment, Notification
+from lms.serializers.notification_serializer import NotificationSerializer
+from lms.utils.inbox import ensure_participant_states
+from lms.utils.realtime import publish_notifications
+
+logger = logging.getLogger(__name__)
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def add_group_participants(conversation, student_ids, unread_since=None):
+    """
+    Add the students missing from a group conversation: one read of the
+    current members, then bulk inserts of the difference into the M2M
+    through table (and their inbox states). Returns the ids added.
+    """
+    through = Conversation.participants_students.through
+    existing = set(
+        through.objects.filter(conversation_id=conversation.id).values_list('student_id', flat=True)
+    )
+    new_ids = [student_id for student_id in student_ids if student_id not in existing]
+    if new_ids:
+        through.objects.bulk_create([
+            through(conversation_id=conversation.id, student_id=student_id)
+            for student_id in new_ids
+        ], batch_size=1000, ignore_conflicts=True)
+        ensure_participant_states(conversation, student_ids=new_ids, unread_since=unread_since)
+    return new_ids
+
+
+def _notify_students(job, student_ids, processed):
+    """
+    Notifications of the broadcast for student_ids, one bulk insert,
+    publish and progress update per BROADCAST_CHUNK_SIZE students.
+    Another runner of the same job may notify the same students meanwhile:
+    the (broadcast, student) unique constraint keeps one row each, and
+    only the rows this runner inserted are published.
+    """
+    chunk_size = getattr(settings, 'BROADCAST_CHUNK_SIZE', 1000)
+    title = f"Thông báo từ khóa học {job.course.title}"
+    for chunk in _chunks(student_ids, chunk_size):
+        with transaction.atomic():
+            chunk_notifications = Notification.objects.filter(broadcast=job, student_id__in=chunk)
+            existing_ids = list(chunk_notifications.values_list('id', flat=True))
+            Notification.objects.bulk_create([
+                Notification(
+                    student_id=student_id,
+                    course=job.course,
+                    broadcast=job,
+                    title=title,
+                    message=job.message.content,
+                    is_read=False
+                )
+                for student_id in chunk
+            ], batch_size=chunk_size, ignore_conflicts=True)
+            notifications = list(chunk_notifications.exclude(id__in=existing_ids).select_related('course'))
+            publish_notifications(NotificationSerializer(notifications, many=True).data)
+            processed += len(chunk)
+            BroadcastJob.objects.filter(id=job.id).update(
+                processed_recipients=processed,
+                updated_at=timezone.now()
+            )
+
+
+def _fan_out(job):
+    student_ids = list(
+        Enrollment.objects.filter(course_id=job.course_id).order_by('student_id').values_list('student_id', flat=True)
+    )
+    add_group_participants(job.conversation, student_ids, unread_since=job.message)
+
+    # Resuming a failed or interrupted job skips the students already notified
+    notified = set(Notification.objects.filter(broadcast=job).values_list('student_id', flat=True))
+    pending = [student_id for student_id in student_ids if student_id not in notified]
+    processed = len(student_ids) - len(pending)
+    BroadcastJob.objects.filter(id=job.id).update(
+        total_recipients=len(student_ids),
+        processed_recipients=processed,
+        updated_at=timezone.now()
+    )
+    _notify_students(job, pending, processed)
+
+
+def run_broadcast_job(job_id):
+    """
+    Process a pending broadcast job. The job is claimed with a conditional
+    UPDATE, so concurrent runners never process it twice. Failures are
+    recorded on the job (status 'failed') instead of raised.
+    Returns the job, or None if it was not pending.
+    """
+    now = timezone.now()
+    claimed = BroadcastJob.objects.filter(id=job_id, status='pending').update(
+        status='running',
+        started_at=now,
+        updated_at=now,
+        error=''
+    )
+    if not claimed:
+        return None
+
+    job = BroadcastJob.objects.select_related('course', 'conversation', 'message').get(id=job_id)
+    try:
+        _fan_out(job)
+    except Exception as exc:
+        logger.exception("Broadcast job %s failed", job_id)
+        now = timezone.now()
+        BroadcastJob.objects.filter(id=job_id).update(
+            status='failed',
+            error=str(exc),
+            updated_at=now,
+            finished_at=now
+        )
+    else:
+        now = timezone.now()
+        BroadcastJob.objects.filter(id=job_id).update(status='completed', updated_at=now, finished_at=now)
+    job.refresh_from_db()
+    return job
+
+
+def _run_in_thread(job_id):
+    try:
+        run_broadcast_job(job_id)
+    finally:
+        connections.close_all()
+
+
+def _start_in_thread(job_id):
+    threading.Thread(target=_run_in_thread, args=(job_id,), daemon=True).start()
+
+
+def start_broadcast_job(job):
+    """
+    Process the job after the current transaction commits: inline for
+    courses of at most BROADCAST_INLINE_LIMIT students, otherwise in a
+    background thread (BROADCAST_BACKGROUND_THREAD, see resume_stale_jobs)
+    or left pending for the process_broadcast_jobs command.
+    """
+    if job.total_recipients <= getattr(settings, 'BROADCAST_INLINE_LIMIT', 500):
+        transaction.on_commit(lambda: run_broadcast_job(job.id))
+    elif getattr(settings, 'BROADCAST_BACKGROUND_THREAD', True):
+        transaction.on_commit(lambda: _start_in_thread(job.id))
+
+
+def resume_stale_jobs(jobs):
+    """
+    Restart, in a background thread, the jobs of `jobs` (a BroadcastJob
+    queryset) that made no progress for BROADCAST_STALE_SECONDS: their
+    worker was recycled or killed, or never started. Called on paths that
+    run anyway (progress polling, the next broadcast), so an interrupted
+    fan-out resumes without the process_broadcast_jobs command. Each job
+    is requeued with a conditional UPDATE, so only one caller restarts it.
+    Returns the ids restarted.
+    """
+    if not getattr(settings, 'BROADCAST_BACKGROUND_THREAD', True):
+        return []
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=getattr(settings, 'BROADCAST_STALE_SECONDS', 2 * 60))
+    stale = BroadcastJob.objects.filter(status__in=['pending', 'running'], updated_at__lt=cutoff)
+    restarted = []
+    for job_id in jobs.filter(status__in=['pending', 'running'], updated_at__lt=cutoff).values_list('id', flat=True):
+        if stale.filter(id=job_id).update(status='pending', updated_at=now):
+            logger.warning("Restarting stalled broadcast job %s", job_id)
+            _start_in_thread(job_id)
+            restarted.append(job_id)
+    return restarted
+
+
+def requeue_stale_jobs(max_age_seconds, include_failed=False):
+    """
+    Put back to 'pending' the running jobs without progress for
+    max_age_seconds (their worker died), and optionally the failed ones.
+    Returns the number of jobs requeued.
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=max_age_seconds)
+    requeued = BroadcastJob.objects.filter(status='running', updated_at__lt=cutoff).update(
+        status='pending',
+        updated_at=now
+    )
+    if include_failed:
+        requeued += BroadcastJob.objects.filter(status='failed').update(status='pending', updated_at=now)
+    return requeued
@@ -0,0 +1,44 @@
+from django.db import connection
+
+
+def bulk_create_with_pks(model, objs, scope, existing_pks, batch_size=None):
+    """
+    bulk_create objs and make sure every instance has its primary key.
+    Backends that return ids from a bulk insert (PostgreSQL, SQLite,
+    MariaDB) set them directly. MySQL does not, so the new rows are read
+    back from `scope` (a queryset containing them), excluding the pks the
+    caller already knew about, in id order. Auto-increment ids follow
+    insertion order, so they zip back onto objs.
+    Only safe while the caller holds a lock on the parent row, so no other
+    writer adds rows to `scope` concurrently.
+    """
+    if not objs:
+        return objs
+    model.objects.bulk_create(objs, batch_size=batch_size)
+    if connection.features.can_return_rows_from_bulk_insert:
+        return objs
+    new_pks = list(
+        scope.exclude(pk__in=existing_pks).order_by('pk').values_list('pk', flat=True)
+    )
+    if len(new_pks) != len(objs):
+        raise RuntimeError(f'Expected {len(objs)} new {model.__name__} rows, found {len(new_pks)}')
+    for obj, pk in zip(objs, new_pks):
+        obj.pk = pk
+    return objs
+
+
+def bulk_reorder(model, rows, ordered_ids, field='order'):
+    """
+    Give rows (instances keyed by id) positions 0..n-1 following
+    ordered_ids, writing only the rows whose position changed with a
+    single bulk_update. Returns the number of rows updated.
+    """
+    changed = []
+    for position, row_id in enumerate(ordered_ids):
+        row = rows[row_id]
+        if getattr(row, field) != position:
+            setattr(row, field, position)
+            changed.append(row)
+    if changed:
+        model.objects.bulk_update(changed, [field], batch_size=1000)
+    return len(changed)
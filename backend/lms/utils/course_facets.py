@@ -0,0 +1,76 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, When, Value, BooleanField, Count
+
+FACET_LEVELS = ['Beginner', 'Intermediate', 'Advanced']
+
+
+def _facet_rows(queryset, cache_key):
+    """
+    (category_id, category_title, level, is_free, count) for every
+    combination present in the queryset: one GROUP BY, cached briefly.
+    """
+    rows = cache.get(cache_key)
+    if rows is None:
+        rows = list(
+            queryset.order_by().annotate(
+                is_free=Case(
+                    When(price=0, then=Value(True)),
+                    default=Value(False),
+                    output_field=BooleanField()
+                )
+            ).values_list(
+                'category_id', 'category__title', 'level', 'is_free'
+            ).annotate(count=Count('id'))
+        )
+        cache.set(cache_key, rows, getattr(settings, 'COURSE_FACETS_CACHE_TIMEOUT', 60))
+    return rows
+
+
+def facet_cache_key(q):
+    """Facets depend only on the keyword query (filters are applied in Python)"""
+    normalized = ' '.join(q.lower().split())
+    return f"lms:course_facets:{hashlib.sha1(normalized.encode()).hexdigest()}"
+
+
+def compute_course_facets(queryset, q='', category_id=None, level=None, price=None):
+    """
+    Facet counts for a keyword query.
+    queryset: courses matching the keyword query only (no facet filters).
+    Each facet is counted with the other facets' filters applied but not
+    its own, so the UI can show how many results each alternative gives.
+
+    Returns:
+    {
+        'category': [{'id', 'title', 'count'}, ...],
+        'level': [{'value', 'count'}, ...],
+        'price': [{'value': 'free'|'paid', 'count'}, ...],
+    }
+    """
+    rows = _facet_rows(queryset, facet_cache_key(q))
+    price_is_free = {'free': True, 'paid': False}.get(price)
+
+    categories = {}
+    levels = {value: 0 for value in FACET_LEVELS}
+    prices = {'free': 0, 'paid': 0}
+    for row_category_id, category_title, row_level, is_free, count in rows:
+        category_ok = category_id is None or row_category_id == category_id
+        level_ok = level is None or row_level == level
+        price_ok = price_is_free is None or bool(is_free) == price_is_free
+
+        if level_ok and price_ok:
+            entry = categories.setdefault(
+                row_category_id, {'id': row_category_id, 'title': category_title, 'count': 0}
+            )
+            entry['count'] += count
+        if category_ok and price_ok:
+            levels[row_level] = levels.get(row_level, 0) + count
+        if category_ok and level_ok:
+            prices['free' if is_free else 'paid'] += count
+
+    return {
+        'category': sorted(categories.values(), key=lambda entry: (-entry['count'], entry['title'])),
+        'level': [{'value': value, 'count': count} for value, count in levels.items()],
+        'price': [{'value': value, 'count': count} for value, count in prices.items()],
+    }
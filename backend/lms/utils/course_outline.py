@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from lms.models import Course
+
+
+def _get_cache():
+    return caches[getattr(settings, 'COURSE_OUTLINE_CACHE', 'default')]
+
+
+def _cache_key(course_id, version):
+    return f"lms:course_outline:{course_id}:v{version}"
+
+
+def build_course_outline(course_id):
+    """
+    Build the Course -> Section -> Lesson and Quiz -> Question -> Option tree
+    with a constant number of queries (one per level).
+    Output matches the 'sections' and 'quizzes' fields of CourseSerializer.
+    """
+    from lms.serializers import SectionSerializer, QuizSerializer
+
+    course = Course.objects.prefetch_related(
+        'sections__lessons',
+        'quizzes__questions__options',
+    ).get(id=course_id)
+
+    return {
+        'sections': SectionSerializer(course.sections.all(), many=True).data,
+        'quizzes': QuizSerializer(course.quizzes.all(), many=True).data,
+    }
+
+
+def get_course_outline(course):
+    """
+    Return the precompiled outline for a course.
+    One cache lookup when warm; rebuilt and stored under the current
+    outline_version on a miss. Old versions are never read again and
+    age out of the cache.
+    """
+    cache = _get_cache()
+    key = _cache_key(course.id, course.outline_version)
+    outline = cache.get(key)
+    if outline is None:
+        outline = build_course_outline(course.id)
+        cache.set(key, outline, getattr(settings, 'COURSE_OUTLINE_CACHE_TIMEOUT', None))
+    return outline
+
+
+def bump_course_outline_version(course_id):
+    """
+    Invalidate the cached outline of a course.
+    Call after any write that changes its sections, lessons, quizzes,
+    questions or options.
+    """
+    Course.objects.filter(id=course_id).update(outline_version=F('outline_version') + 1)
+
+
+def serialize_course_with_outline(course, request=None):
+    """
+    Full course payload (same shape as CourseSerializer) built from the
+    course row plus the cached outline.
+    """
+    from lms.serializers.course_serializer import CourseHeaderSerializer
+
+    data = CourseHeaderSerializer(course, context={'request': request}).data
+    outline = get_course_outline(course)
+
+    # Outlines are cached without a request, so uploaded files have relative URLs
+    if request is not None:
+        for section in outline['sections']:
+            for lesson in section['lessons']:
+                if lesson.get('video_file') and not lesson['video_file'].startswith('http'):
+                    lesson['video_file'] = request.build_absolute_uri(lesson['video_file'])
+
+    data['sections'] = outline['sections']
+    data['quizzes'] = outline['quizzes']
+    return data
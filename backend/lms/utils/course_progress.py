@@ -0,0 +1,437 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Least
+from django.utils import timezone
+from lms.models import Student, Lesson, StudentProgress, StudentCourseProgress, Enrollment
+
+
+def lesson_progress_percent(duration_seconds, watched_seconds, completed):
+    """
+    Progress of a single lesson as a percentage (0-100).
+    Video lessons use watched time; lessons without a duration count
+    as 0 or 100 depending on the completed flag.
+    """
+    if duration_seconds and duration_seconds > 0:
+        return min(100, (watched_seconds / duration_seconds) * 100)
+    return 100 if completed else 0
+
+
+def _rollup(total_lessons, completed_lessons, percent_sum):
+    return {
+        'total_lessons': total_lessons,
+        'completed_lessons': completed_lessons,
+        'progress_percent': round(percent_sum / total_lessons, 2) if total_lessons else 0,
+    }
+
+
+def overlay_student_progress(course_data, student):
+    """
+    Merge a student's lesson progress into a serialized course tree.
+    Fetches all progress rows of the course in one query, then adds
+    'progress' to every lesson plus section-level and course-level rollups.
+    """
+    progress_by_lesson = {
+        row['lesson_id']: row
+        for row in StudentProgress.objects.filter(
+            student=student,
+            lesson__section__course_id=course_data['id']
+        ).values('lesson_id', 'watched_seconds', 'completed')
+    }
+
+    course_total = course_completed = 0
+    course_percent_sum = 0
+    for section_data in course_data.get('sections', []):
+        section_completed = 0
+        section_percent_sum = 0
+        lessons = section_data.get('lessons', [])
+        for lesson_data in lessons:
+            progress = progress_by_lesson.get(lesson_data['id'])
+            watched_seconds = progress['watched_seconds'] if progress else 0
+            completed = progress['completed'] if progress else False
+
+            lesson_data['progress'] = {
+                'watched_seconds': watched_seconds,
+                'completed': completed
+            }
+            section_completed += 1 if completed else 0
+            section_percent_sum += lesson_progress_percent(
+                lesson_data.get('duration_seconds'), watched_seconds, completed
+            )
+
+        section_data['progress'] = _rollup(len(lessons), section_completed, section_percent_sum)
+        course_total += len(lessons)
+        course_completed += section_completed
+        course_percent_sum += section_percent_sum
+
+    course_data['progress'] = _rollup(course_total, course_completed, course_percent_sum)
+    return course_data
+
+
+# ---------------------------------------------------------------------------
+# Incremental course-progress engine
+#
+# StudentCourseProgress keeps running totals per (student, course):
+#   progress_sum      = sum of lesson_progress_percent() over the student's lessons
+#   completed_lessons = number of lessons marked completed
+# so overall_progress = progress_sum / total lessons. A progress tick applies
+# only the delta of the lesson that changed instead of reloading the course.
+# ---------------------------------------------------------------------------
+
+def _get_cache():
+    return caches[getattr(settings, 'COURSE_OUTLINE_CACHE', 'default')]
+
+
+def get_course_lesson_total(course):
+    """
+    Number of lessons in a course (every lesson has the same weight).
+    Cached under the course outline_version, so curriculum writes that
+    bump the version invalidate it.
+    """
+    cache = _get_cache()
+    key = f"lms:course_lesson_total:{course.id}:v{course.outline_version}"
+    total = cache.get(key)
+    if total is None:
+        total = Lesson.objects.filter(section__course_id=course.id).count()
+        cache.set(key, total, getattr(settings, 'COURSE_OUTLINE_CACHE_TIMEOUT', None))
+    return total
+
+
+def _overall(progress_sum, total_lessons):
+    if not total_lessons:
+        return 0
+    return max(0, min(100, progress_sum / total_lessons))
+
+
+def recalculate_course_progress(student, course, course_progress=None, total_lessons=None):
+    """
+    Rebuild the running totals for one student in one course from scratch.
+    One query over the student's lesson progress; used to seed a missing
+    StudentCourseProgress row and to repair drifted ones.
+    """
+    if total_lessons is None:
+        total_lessons = Lesson.objects.filter(section__course_id=course.id).count()
+
+    progress_sum = 0
+    completed_lessons = 0
+    rows = StudentProgress.objects.filter(
+        student=student,
+        lesson__section__course_id=course.id
+    ).values_list('watched_seconds', 'completed', 'lesson__duration_seconds')
+    for watched_seconds, completed, duration_seconds in rows:
+        progress_sum += lesson_progress_percent(duration_seconds, watched_seconds, completed)
+        completed_lessons += 1 if completed else 0
+
+    if course_progress is None:
+        course_progress, _ = StudentCourseProgress.objects.get_or_create(
+            student=student,
+            course=course
+        )
+    course_progress.progress_sum = progress_sum
+    course_progress.completed_lessons = completed_lessons
+    course_progress.overall_progress = _overall(progress_sum, total_lessons)
+    course_progress.save()
+    return course_progress
+
+
+def apply_lesson_progress(student, lesson, course, enrollment, watched_seconds, completed):
+    """
+    Upsert a student's progress for one lesson and apply the change to the
+    course totals. Costs a constant number of queries whatever the course size.
+    Enrollment is only written (and the certificate only issued) when the
+    course completion state actually flips.
+    """
+    total_lessons = get_course_lesson_total(course)
+
+    with transaction.atomic():
+        progress = StudentProgress.objects.select_for_update().filter(
+            student=student,
+            lesson=lesson
+        ).first()
+
+        if progress is None:
+            old_percent = 0
+            old_completed = False
+            progress = StudentProgress.objects.create(
+                student=student,
+                lesson=lesson,
+                watched_seconds=watched_seconds,
+                completed=completed
+            )
+        else:
+            old_percent = lesson_progress_percent(
+                lesson.duration_seconds, progress.watched_seconds, progress.completed
+            )
+            old_completed = progress.completed
+            progress.watched_seconds = watched_seconds
+            progress.completed = completed
+            progress.save(update_fields=['watched_seconds', 'completed', 'updated_at'])
+
+        if total_lessons == 0:
+            return progress
+
+        course_progress = StudentCourseProgress.objects.select_for_update().filter(
+            student=student,
+            course=course
+        ).first()
+
+        if course_progress is None:
+            # First tick for this course: seed the totals (includes this lesson)
+            course_progress = recalculate_course_progress(
+                student, course, total_lessons=total_lessons
+            )
+        else:
+            new_percent = lesson_progress_percent(lesson.duration_seconds, watched_seconds, completed)
+            completed_delta = int(bool(completed)) - int(bool(old_completed))
+            course_progress.progress_sum = max(0, course_progress.progress_sum + new_percent - old_percent)
+            course_progress.completed_lessons = max(0, course_progress.completed_lessons + completed_delta)
+            course_progress.overall_progress = _overall(course_progress.progress_sum, total_lessons)
+            course_progress.last_access = timezone.now()
+            course_progress.save(update_fields=[
+                'progress_sum', 'completed_lessons', 'overall_progress', 'last_access', 'updated_at'
+            ])
+
+        _sync_enrollment_completion(
+            student, course, enrollment,
+            course_progress.completed_lessons >= total_lessons
+        )
+
+    return progress
+
+
+def _sync_enrollment_completion(student, course, enrollment, is_completed):
+    """Write Enrollment.completed only when it changes; certificate on first completion"""
+    if enrollment.completed == is_completed:
+        return
+    was_completed = enrollment.completed
+    enrollment.completed = is_completed
+    Enrollment.objects.filter(id=enrollment.id).update(completed=is_completed)
+    if is_completed and not was_completed:
+        from lms.utils.certificate_utils import issue_certificate
+        issue_certificate(student, course)
+
+
+def rescale_course_progress(course_id):
+    """
+    Recompute overall_progress for every student of a course after the
+    lesson count changed but no lesson progress did (e.g. a lesson was added).
+    One count plus a single UPDATE statement.
+    """
+    total_lessons = Lesson.objects.filter(section__course_id=course_id).count()
+    queryset = StudentCourseProgress.objects.filter(course_id=course_id)
+    if total_lessons == 0:
+        queryset.update(overall_progress=0)
+        return
+    queryset.update(overall_progress=Least(F('progress_sum') / Value(float(total_lessons)), Value(100.0)))
+
+
+def resync_course_progress(course_id):
+    """
+    Rebuild the running totals of every student in a course. Used after
+    curriculum changes that invalidate existing totals (a lesson removed
+    or its duration changed). One pass over the course's lesson progress
+    plus one bulk_update.
+    """
+    total_lessons = Lesson.objects.filter(section__course_id=course_id).count()
+
+    totals = {}
+    rows = StudentProgress.objects.filter(
+        lesson__section__course_id=course_id
+    ).values_list('student_id', 'watched_seconds', 'completed', 'lesson__duration_seconds')
+    for student_id, watched_seconds, completed, duration_seconds in rows.iterator():
+        entry = totals.setdefault(student_id, [0, 0])
+        entry[0] += lesson_progress_percent(duration_seconds, watched_seconds, completed)
+        entry[1] += 1 if completed else 0
+
+    to_update = []
+    for course_progress in StudentCourseProgress.objects.filter(course_id=course_id).iterator():
+        progress_sum, completed_lessons = totals.get(course_progress.student_id, (0, 0))
+        course_progress.progress_sum = progress_sum
+        course_progress.completed_lessons = completed_lessons
+        course_progress.overall_progress = _overall(progress_sum, total_lessons)
+        to_update.append(course_progress)
+    StudentCourseProgress.objects.bulk_update(
+        to_update, ['progress_sum', 'completed_lessons', 'overall_progress'], batch_size=500
+    )
+
+
+
+def ensure_course_progress_rows(course):
+    """
+    Create the missing StudentCourseProgress rows of a course's enrolled
+    students, seeded from any lesson progress they already have.
+    One query for the missing students, one over their lesson progress,
+    and one bulk_create. Returns the number of rows created.
+    """
+    missing_ids = list(
+        Enrollment.objects.filter(course_id=course.id).exclude(
+            student_id__in=StudentCourseProgress.objects.filter(course_id=course.id).values('student_id')
+        ).values_list('student_id', flat=True)
+    )
+    if not missing_ids:
+        return 0
+
+    total_lessons = get_course_lesson_total(course)
+    totals = {}
+    rows = StudentProgress.objects.filter(
+        student_id__in=missing_ids,
+        lesson__section__course_id=course.id
+    ).values_list('student_id', 'watched_seconds', 'completed', 'lesson__duration_seconds')
+    for student_id, watched_seconds, completed, duration_seconds in rows.iterator():
+        entry = totals.setdefault(student_id, [0, 0])
+        entry[0] += lesson_progress_percent(duration_seconds, watched_seconds, completed)
+        entry[1] += 1 if completed else 0
+
+    new_rows = []
+    for student_id in missing_ids:
+        progress_sum, completed_lessons = totals.get(student_id, (0, 0))
+        new_rows.append(StudentCourseProgress(
+            student_id=student_id,
+            course_id=course.id,
+            progress_sum=progress_sum,
+            completed_lessons=completed_lessons,
+            overall_progress=_overall(progress_sum, total_lessons)
+        ))
+    # A concurrent first tick may create the same row: keep that one
+    StudentCourseProgress.objects.bulk_create(new_rows, batch_size=500, ignore_conflicts=True)
+    return len(new_rows)
+
+def apply_lesson_progress_batch(entries):
+    """
+    Write many coalesced lesson ticks at once.
+    entries: {(student_id, lesson_id): (watched_seconds, completed)}
+
+    Watched positions only move forward (the highest position wins) and a
+    completed lesson stays completed. Unchanged rows are skipped, changed rows
+    are written with one bulk upsert, course totals with one bulk_update, and
+    enrollment/certificate side effects only fire for courses whose
+    completion state flips. Entries of students or lessons that no longer
+    exist are skipped. Returns the number of lesson rows written.
+    """
+    if not entries:
+        return 0
+
+    student_ids = set(
+        Student.objects.filter(id__in={student_id for student_id, _ in entries}).values_list('id', flat=True)
+    )
+    lesson_ids = {lesson_id for _, lesson_id in entries}
+    lessons = {
+        lesson.id: lesson
+        for lesson in Lesson.objects.filter(id__in=lesson_ids).select_related('section__course')
+    }
+
+    with transaction.atomic():
+        existing = {
+            (row.student_id, row.lesson_id): row
+            for row in StudentProgress.objects.select_for_update().filter(
+                student_id__in=student_ids,
+                lesson_id__in=lesson_ids
+            )
+        }
+
+        upserts = []
+        course_deltas = {}  # (student_id, course_id) -> [percent_delta, completed_delta]
+        for (student_id, lesson_id), (watched_seconds, completed) in entries.items():
+            lesson = lessons.get(lesson_id)
+            if lesson is None or student_id not in student_ids:
+                continue
+            duration = lesson.duration_seconds
+            row = existing.get((student_id, lesson_id))
+            old_watched = row.watched_seconds if row else 0
+            old_completed = row.completed if row else False
+
+            new_watched = max(old_watched, watched_seconds)
+            new_completed = bool(
+                old_completed or completed or (duration and new_watched >= duration)
+            )
+            if row is not None and new_watched == old_watched and new_completed == old_completed:
+                continue
+
+            upserts.append(StudentProgress(
+                student_id=student_id,
+                lesson_id=lesson_id,
+                watched_seconds=new_watched,
+                completed=new_completed
+            ))
+            delta = course_deltas.setdefault((student_id, lesson.section.course_id), [0, 0])
+            delta[0] += (
+                lesson_progress_percent(duration, new_watched, new_completed)
+                - lesson_progress_percent(duration, old_watched, old_completed)
+            )
+            delta[1] += int(new_completed) - int(old_completed)
+
+        if not upserts:
+            return 0
+
+        upsert_kwargs = {
+            'update_conflicts': True,
+            'update_fields': ['watched_seconds', 'completed', 'updated_at'],
+        }
+        if transaction.get_connection().features.supports_update_conflicts_with_target:
+            upsert_kwargs['unique_fields'] = ['student', 'lesson']
+        StudentProgress.objects.bulk_create(upserts, batch_size=500, **upsert_kwargs)
+
+        _apply_course_deltas(course_deltas, lessons)
+
+    return len(upserts)
+
+
+def _apply_course_deltas(course_deltas, lessons):
+    """Fold per-(student, course) deltas into StudentCourseProgress rows"""
+    courses = {lesson.section.course_id: lesson.section.course for lesson in lessons.values()}
+    totals = {course_id: get_course_lesson_total(course) for course_id, course in courses.items()}
+    student_ids = {student_id for student_id, _ in course_deltas}
+    course_ids = {course_id for _, course_id in course_deltas}
+
+    course_progresses = {
+        (row.student_id, row.course_id): row
+        for row in StudentCourseProgress.objects.select_for_update().filter(
+            student_id__in=student_ids,
+            course_id__in=course_ids
+        )
+    }
+
+    now = timezone.now()
+    to_update = []
+    flipped = {}  # (student_id, course_id) -> is_completed
+    for (student_id, course_id), (percent_delta, completed_delta) in course_deltas.items():
+        total_lessons = totals[course_id]
+        if total_lessons == 0:
+            continue
+        course_progress = course_progresses.get((student_id, course_id))
+        if course_progress is None:
+            # First progress for this course: seed from the rows just written
+            course_progress = recalculate_course_progress(
+                Student(id=student_id), courses[course_id], total_lessons=total_lessons
+            )
+            was_completed = None
+        else:
+            was_completed = course_progress.completed_lessons >= total_lessons
+            course_progress.progress_sum = max(0, course_progress.progress_sum + percent_delta)
+            course_progress.completed_lessons = max(0, course_progress.completed_lessons + completed_delta)
+            course_progress.overall_progress = _overall(course_progress.progress_sum, total_lessons)
+            course_progress.last_access = now
+            course_progress.updated_at = now
+            to_update.append(course_progress)
+
+        is_completed = course_progress.completed_lessons >= total_lessons
+        if is_completed != was_completed:
+            flipped[(student_id, course_id)] = is_completed
+
+    StudentCourseProgress.objects.bulk_update(
+        to_update,
+        ['progress_sum', 'completed_lessons', 'overall_progress', 'last_access', 'updated_at'],
+        batch_size=500
+    )
+
+    if not flipped:
+        return
+    enrollments = Enrollment.objects.filter(
+        student_id__in={student_id for student_id, _ in flipped},
+        course_id__in={course_id for _, course_id in flipped}
+    ).select_related('student', 'course')
+    for enrollment in enrollments:
+        is_completed = flipped.get((enrollment.student_id, enrollment.course_id))
+        if is_completed is not None:
+            _sync_enrollment_completion(enrollment.student, enrollment.course, enrollment, is_completed)
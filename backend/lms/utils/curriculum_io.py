@@ -0,0 +1,256 @@
+import json
+from django.db import models, transaction
+from django.db.models import Max
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from lms.models import Course, Section, Lesson, Quiz, Question, Option
+from lms.utils.bulk_utils import bulk_create_with_pks
+from lms.utils.course_outline import bump_course_outline_version
+from lms.utils.course_progress import resync_course_progress
+from lms.utils.quiz_cache import bump_quiz_content_version
+
+CURRICULUM_FORMAT_VERSION = 1
+CURRICULUM_CONTENT_TYPE = 'application/x-ndjson'
+
+LESSON_FIELDS = ('title', 'description', 'video_url', 'video_file', 'duration_seconds', 'order')
+
+# Record type -> (model, parent record type, parent reference key, fields)
+RECORD_TYPES = {
+    'section': (Section, None, None, ('title', 'order')),
+    'lesson': (Lesson, 'section', 'section', LESSON_FIELDS),
+    'quiz': (Quiz, None, None, ('title', 'description', 'pass_mark')),
+    'question': (Question, 'quiz', 'quiz', ('question_text', 'order')),
+    'option': (Option, 'question', 'question', ('option_text', 'is_correct')),
+}
+
+
+# Bounds the model fields do not enforce themselves
+RECORD_FIELD_BOUNDS = {
+    'order': {'min_value': 0},
+    'duration_seconds': {'min_value': 0},
+    'pass_mark': {'min_value': 0, 'max_value': 100},
+}
+
+
+def _record_serializer_class(model, fields):
+    """
+    ModelSerializer checking the fields of one record type: types, required
+    and non-blank titles, max_length and the bounds above. File fields hold
+    the stored file name in exports, so they are read as plain strings.
+    """
+    declared = {}
+    for name in fields:
+        model_field = model._meta.get_field(name)
+        if isinstance(model_field, models.FileField):
+            declared[name] = serializers.CharField(
+                max_length=model_field.max_length, required=False, allow_blank=True, allow_null=True
+            )
+    meta = type('Meta', (), {
+        'model': model,
+        'fields': list(fields),
+        'extra_kwargs': {name: RECORD_FIELD_BOUNDS[name] for name in fields if name in RECORD_FIELD_BOUNDS},
+    })
+    return type(f'{model.__name__}RecordSerializer', (serializers.ModelSerializer,), {'Meta': meta, **declared})
+
+
+RECORD_SERIALIZERS = {
+    record_type: _record_serializer_class(model, fields)
+    for record_type, (model, _, _, fields) in RECORD_TYPES.items()
+}
+
+
+def _line(record):
+    return json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def export_curriculum(course, chunk_size=1000):
+    """
+    Generate the curriculum of a course as JSON Lines, one record per line:
+    a 'course' header, then sections, lessons, quizzes, questions and
+    options. Every parent comes before its children and children point to
+    it through 'ref' values, so the stream can be imported in one pass.
+    Rows are read with server-side iterators, so memory stays flat.
+    """
+    yield _line({
+        'type': 'course',
+        'format': CURRICULUM_FORMAT_VERSION,
+        'id': course.id,
+        'title': course.title,
+    })
+
+    sections = Section.objects.filter(course=course).order_by('order', 'id')
+    for section in sections.values('id', 'title', 'order').iterator(chunk_size=chunk_size):
+        yield _line({'type': 'section', 'ref': section.pop('id'), **section})
+
+    lessons = Lesson.objects.filter(section__course=course).order_by('section__order', 'section_id', 'order', 'id')
+    for lesson in lessons.values('section_id', *LESSON_FIELDS).iterator(chunk_size=chunk_size):
+        yield _line({'type': 'lesson', 'section': lesson.pop('section_id'), **lesson})
+
+    quizzes = Quiz.objects.filter(course=course).order_by('created_at', 'id')
+    for quiz in quizzes.values('id', 'title', 'description', 'pass_mark').iterator(chunk_size=chunk_size):
+        yield _line({'type': 'quiz', 'ref': quiz.pop('id'), **quiz})
+
+    questions = Question.objects.filter(quiz__course=course).order_by('quiz_id', 'order', 'id')
+    for question in questions.values('id', 'quiz_id', 'question_text', 'order').iterator(chunk_size=chunk_size):
+        yield _line({
+            'type': 'question',
+            'ref': question.pop('id'),
+            'quiz': question.pop('quiz_id'),
+            **question
+        })
+
+    options = Option.objects.filter(question__quiz__course=course).order_by('question_id', 'id')
+    for option in options.values('question_id', 'option_text', 'is_correct').iterator(chunk_size=chunk_size):
+        yield _line({'type': 'option', 'question': option.pop('question_id'), **option})
+
+
+class CurriculumImporter:
+    """
+    Incremental JSON Lines importer (format of export_curriculum).
+    Records are buffered per type and written with bulk_create in batches.
+    A buffer is flushed when it is full or when a record of another type
+    arrives, so parents always have ids before their children are built.
+    Only ref -> id maps are kept in memory, never the rows themselves.
+    """
+
+    def __init__(self, course, batch_size=500):
+        self.course = course
+        self.batch_size = batch_size
+        self.refs = {'section': {}, 'quiz': {}, 'question': {}}
+        self.known_pks = {}
+        self.counts = {record_type: 0 for record_type in RECORD_TYPES}
+        self.buffer_type = None
+        self.buffer = []
+        self.section_order_offset = 0
+        # One serializer per record type, reused for every record
+        self.validators = {
+            record_type: serializer_class() for record_type, serializer_class in RECORD_SERIALIZERS.items()
+        }
+
+    def start(self, replace=False):
+        if replace:
+            Section.objects.filter(course=self.course).delete()
+            Quiz.objects.filter(course=self.course).delete()
+            self.known_pks = {'section': [], 'quiz': [], 'question': []}
+        else:
+            # Appended sections go after the existing ones
+            max_order = Section.objects.filter(course=self.course).aggregate(max_order=Max('order'))['max_order']
+            self.section_order_offset = 0 if max_order is None else max_order + 1
+            self.known_pks = {
+                'section': list(Section.objects.filter(course=self.course).values_list('id', flat=True)),
+                'quiz': list(Quiz.objects.filter(course=self.course).values_list('id', flat=True)),
+                'question': list(Question.objects.filter(quiz__course=self.course).values_list('id', flat=True)),
+            }
+
+    def feed(self, line, line_number):
+        line = line.strip()
+        if not line:
+            return
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise ValidationError({'line': line_number, 'error': 'Invalid JSON'})
+        if not isinstance(record, dict):
+            raise ValidationError({'line': line_number, 'error': 'Each line must be a JSON object'})
+
+        record_type = record.get('type')
+        if record_type == 'course':
+            if record.get('format', CURRICULUM_FORMAT_VERSION) != CURRICULUM_FORMAT_VERSION:
+                raise ValidationError({'line': line_number, 'error': 'Unsupported curriculum format'})
+            return
+        if record_type not in RECORD_TYPES:
+            raise ValidationError({'line': line_number, 'error': f'Unknown record type: {record_type}'})
+
+        if record_type != self.buffer_type or len(self.buffer) >= self.batch_size:
+            self.flush()
+            self.buffer_type = record_type
+        self.buffer.append(self._build(record_type, record, line_number))
+
+    def _build(self, record_type, record, line_number):
+        model, parent_type, parent_key, fields = RECORD_TYPES[record_type]
+        try:
+            values = self.validators[record_type].run_validation(
+                {field: record[field] for field in fields if field in record}
+            )
+        except ValidationError as exc:
+            raise ValidationError({'line': line_number, 'error': f'Invalid {record_type}', 'fields': exc.detail})
+        ref = self._reference(record, 'ref', line_number)
+        if parent_type:
+            parent_id = self.refs[parent_type].get(self._reference(record, parent_key, line_number))
+            if parent_id is None:
+                raise ValidationError({
+                    'line': line_number,
+                    'error': f'Unknown {parent_type} reference: {record.get(parent_key)}'
+                })
+            values[f'{parent_key}_id'] = parent_id
+        else:
+            values['course_id'] = self.course.id
+        if record_type == 'section':
+            values['order'] = values.get('order', 0) + self.section_order_offset
+        return ref, model(**values)
+
+    @staticmethod
+    def _reference(record, key, line_number):
+        value = record.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, str))):
+            raise ValidationError({'line': line_number, 'error': f'{key} must be an integer or a string'})
+        return value
+
+    def flush(self):
+        if not self.buffer:
+            return
+        record_type = self.buffer_type
+        model = RECORD_TYPES[record_type][0]
+        objs = [obj for _, obj in self.buffer]
+        if record_type in self.refs:
+            # Children will reference these rows: their ids are needed
+            scope = {
+                'section': Section.objects.filter(course=self.course),
+                'quiz': Quiz.objects.filter(course=self.course),
+                'question': Question.objects.filter(quiz__course=self.course),
+            }[record_type]
+            bulk_create_with_pks(model, objs, scope, self.known_pks[record_type], batch_size=self.batch_size)
+            for (ref, _), obj in zip(self.buffer, objs):
+                if ref is not None:
+                    self.refs[record_type][ref] = obj.pk
+                self.known_pks[record_type].append(obj.pk)
+        else:
+            model.objects.bulk_create(objs, batch_size=self.batch_size)
+        self.counts[record_type] += len(objs)
+        self.buffer = []
+
+    def finish(self):
+        self.flush()
+        bump_course_outline_version(self.course.id)
+        if self.refs['quiz']:
+            bump_quiz_content_version(*self.refs['quiz'].values())
+        # Lesson totals changed: rebuild stored course progress
+        resync_course_progress(self.course.id)
+        return self.counts
+
+
+def import_curriculum(course, lines, replace=False, batch_size=500):
+    """
+    Import a JSON Lines curriculum (iterable of str/bytes lines) into a
+    course in one transaction. replace=True drops the existing sections
+    and quizzes first; otherwise the content is appended.
+    Returns the number of rows created per record type.
+    """
+    with transaction.atomic():
+        # Serialize imports into the same course
+        course = Course.objects.select_for_update().get(id=course.id)
+        importer = CurriculumImporter(course, batch_size=batch_size)
+        importer.start(replace=replace)
+        for line_number, line in enumerate(lines, start=1):
+            if isinstance(line, bytes):
+                try:
+                    line = line.decode('utf-8')
+                except UnicodeDecodeError:
+                    raise ValidationError({'line': line_number, 'error': 'Invalid UTF-8'})
+            importer.feed(line, line_number)
+        return importer.finish()
+
+
+def clone_curriculum(source_course, target_course, replace=False):
+    """Copy the curriculum of one course into another via the JSONL stream"""
+    return import_curriculum(target_course, export_curriculum(source_course), replace=replace)
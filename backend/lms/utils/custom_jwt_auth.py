@@ -3,12 +3,15 @@ from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.tokens import UntypedToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from django.utils.translation import gettext_lazy as _
+from lms.utils.principal import Principal
 
 
 class CustomJWTAuthentication(BaseAuthentication):
     """
     Custom JWT Authentication that works without Django User model.
     Decodes token and sets request.auth to the token payload (dict).
+    Also attaches request.principal, which resolves the teacher/student
+    behind the token once per request (see lms.utils.principal).
     """
     
     def authenticate(self, request):
@@ -29,6 +32,7 @@ class CustomJWTAuthentication(BaseAuthentication):
         # Get payload from validated token
         # UntypedToken already decodes the token, we just need to get the payload
         token_payload = validated_token.payload
+        request.principal = Principal(token_payload)
 
         # Return (None, payload) - this sets request.user = None and request.auth = payload
         return (None, token_payload)
@@ -68,3 +72,20 @@ class CustomJWTAuthentication(BaseAuthentication):
             )
 
         return parts[1]
+
+
+class QueryParamJWTAuthentication(CustomJWTAuthentication):
+    """
+    CustomJWTAuthentication that also accepts the access token as a
+    ?token= query parameter, for clients that cannot set headers
+    (browser EventSource). Only enable it on streaming endpoints:
+    tokens in URLs end up in access logs.
+    """
+
+    def get_header(self, request):
+        header = super().get_header(request)
+        if header is None:
+            token = request.query_params.get('token') if hasattr(request, 'query_params') else None
+            if token:
+                header = f"Bearer {token}".encode("utf-8")
+        return header
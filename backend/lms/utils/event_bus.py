@@ -0,0 +1,169 @@
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import DateTimeField, ExpressionWrapper, Max
+from django.db.models.functions import Now
+from django.utils.module_loading import import_string
+from lms.models import RealtimeEvent
+
+# Event type telling a subscriber it missed events and should refetch
+RESYNC_EVENT = 'resync'
+
+
+def _db_now_minus(seconds):
+    """Database clock minus a number of seconds (RealtimeEvent.created_at uses it)"""
+    return ExpressionWrapper(Now() - timedelta(seconds=seconds), output_field=DateTimeField())
+
+
+def _event(event_id, event_type, data):
+    return {'id': event_id, 'type': event_type, 'data': data}
+
+
+class BaseEventBus:
+    """
+    Publish/subscribe of small JSON events on named channels
+    ('teacher:<id>', 'student:<id>'). Subscribers keep an integer cursor:
+    wait() returns the events after it and the cursor to resume from.
+    """
+
+    def publish(self, channels, event_type, data):
+        """Send one event to every channel (same payload)"""
+        self.publish_many([(channel, event_type, data) for channel in channels])
+
+    def publish_many(self, entries):
+        """Send a batch of (channel, event_type, data) events"""
+        raise NotImplementedError
+
+    def head(self):
+        """Cursor positioned after every event published so far"""
+        raise NotImplementedError
+
+    def wait(self, channels, cursor, timeout):
+        """
+        Events for the channels after cursor, waiting up to timeout seconds
+        for the first one. Returns (events, cursor).
+        """
+        raise NotImplementedError
+
+
+class InProcessEventBus(BaseEventBus):
+    """
+    Events kept in a bounded in-memory ring and delivered with a condition
+    variable: no polling and no database writes, but publishers and
+    subscribers must share one process (e.g. a single threaded worker).
+    A subscriber whose cursor fell out of the ring gets a resync event.
+    """
+
+    def __init__(self, buffer_size=None):
+        if buffer_size is None:
+            buffer_size = getattr(settings, 'REALTIME_BUFFER_SIZE', 10000)
+        self._condition = threading.Condition()
+        self._events = deque(maxlen=buffer_size)
+        self._sequence = 0
+
+    def publish_many(self, entries):
+        with self._condition:
+            for channel, event_type, data in entries:
+                self._sequence += 1
+                self._events.append((self._sequence, channel, event_type, data))
+            self._condition.notify_all()
+
+    def head(self):
+        return self._sequence
+
+    def _read(self, channels, cursor):
+        if cursor > self._sequence:
+            # Cursor from before a restart: start over from now
+            return [_event(self._sequence, RESYNC_EVENT, {})], self._sequence
+        if self._events and cursor < self._events[0][0] - 1:
+            return [_event(self._sequence, RESYNC_EVENT, {})], self._sequence
+        events = [
+            _event(sequence, event_type, data)
+            for sequence, channel, event_type, data in self._events
+            if sequence > cursor and channel in channels
+        ]
+        return events, self._sequence
+
+    def wait(self, channels, cursor, timeout):
+        channels = set(channels)
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                events, new_cursor = self._read(channels, cursor)
+                remaining = deadline - time.monotonic()
+                if events or remaining <= 0:
+                    return events, new_cursor
+                self._condition.wait(remaining)
+
+
+class DatabaseEventBus(BaseEventBus):
+    """
+    Events written to the RealtimeEvent table and read by polling the
+    (channel, id) index every REALTIME_POLL_INTERVAL seconds. Works across
+    processes and hosts; use it when running several workers.
+
+    Inserts from concurrent workers can commit out of id order, and a
+    subscriber whose cursor passed an id that commits later would never
+    see it. Rows are therefore only read once they are
+    REALTIME_VISIBILITY_LAG seconds old (database clock), longer than a
+    publishing insert stays uncommitted, so ids below the cursor are final.
+    """
+
+    def __init__(self, poll_interval=None, batch_size=500, visibility_lag=None):
+        if poll_interval is None:
+            poll_interval = getattr(settings, 'REALTIME_POLL_INTERVAL', 1.0)
+        if visibility_lag is None:
+            visibility_lag = getattr(settings, 'REALTIME_VISIBILITY_LAG', 2.0)
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.visibility_lag = visibility_lag
+
+    def publish_many(self, entries):
+        RealtimeEvent.objects.bulk_create([
+            RealtimeEvent(channel=channel, event_type=event_type, payload=data)
+            for channel, event_type, data in entries
+        ], batch_size=1000)
+
+    def head(self):
+        return RealtimeEvent.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+
+    def wait(self, channels, cursor, timeout):
+        channels = list(channels)
+        deadline = time.monotonic() + timeout
+        while True:
+            rows = list(
+                RealtimeEvent.objects.filter(
+                    channel__in=channels,
+                    id__gt=cursor,
+                    created_at__lte=_db_now_minus(self.visibility_lag)
+                ).order_by('id').values_list('id', 'event_type', 'payload')[:self.batch_size]
+            )
+            if rows:
+                return [_event(*row) for row in rows], rows[-1][0]
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return [], cursor
+            time.sleep(min(self.poll_interval, remaining))
+
+    @staticmethod
+    def prune(max_age_seconds):
+        """Delete events older than max_age_seconds; returns the count"""
+        deleted, _ = RealtimeEvent.objects.filter(created_at__lt=_db_now_minus(max_age_seconds)).delete()
+        return deleted
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_event_bus():
+    """Configured event bus (REALTIME_EVENT_BUS dotted path), in-process by default"""
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                bus_path = getattr(settings, 'REALTIME_EVENT_BUS', None)
+                _bus = import_string(bus_path)() if bus_path else InProcessEventBus()
+    return _bus
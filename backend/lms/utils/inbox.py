@@ -0,0 +1,122 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from lms.models import Conversation, ConversationParticipantState, Message, Teacher, Student
+
+
+def participant_key(user):
+    """(content_type_id, object_id) identifying a Teacher or Student"""
+    return ContentType.objects.get_for_model(type(user)).id, user.id
+
+
+def participant_states(user):
+    """Inbox states of a Teacher or Student"""
+    content_type_id, object_id = participant_key(user)
+    return ConversationParticipantState.objects.filter(
+        participant_content_type_id=content_type_id,
+        participant_object_id=object_id
+    )
+
+
+def ensure_participant_states(conversation, teacher_ids=(), student_ids=(), unread_since=None):
+    """
+    Create the missing state rows of the given participants in one
+    bulk_create. New participants start with nothing unread or, with
+    unread_since (a Message), with that message and the newer ones unread.
+    """
+    teacher_type = ContentType.objects.get_for_model(Teacher)
+    student_type = ContentType.objects.get_for_model(Student)
+    last_message_at = conversation.last_message_at or conversation.created_at or timezone.now()
+    last_read_message_id = conversation.last_message_id
+    unread_count = 0
+    if unread_since is not None:
+        last_read_message_id = None
+        unread_count = Message.objects.filter(
+            conversation_id=conversation.id,
+            id__gte=unread_since.id
+        ).count()
+    states = [
+        ConversationParticipantState(
+            conversation_id=conversation.id,
+            participant_content_type_id=content_type.id,
+            participant_object_id=participant_id,
+            last_read_message_id=last_read_message_id,
+            unread_count=unread_count,
+            last_message_at=last_message_at
+        )
+        for content_type, ids in ((teacher_type, teacher_ids), (student_type, student_ids))
+        for participant_id in ids
+    ]
+    ConversationParticipantState.objects.bulk_create(states, batch_size=1000, ignore_conflicts=True)
+
+
+@transaction.atomic
+def record_message(conversation, message, sender):
+    """
+    Apply a new message to the inbox state: the conversation's last
+    message, +1 unread for every other participant, and the sender's
+    read position. Constant number of UPDATE statements.
+    """
+    now = timezone.now()
+    Conversation.objects.filter(id=conversation.id).update(
+        last_message=message,
+        last_message_at=message.created_at,
+        updated_at=now
+    )
+    conversation.last_message = message
+    conversation.last_message_at = message.created_at
+    conversation.updated_at = now
+
+    content_type_id, sender_id = participant_key(sender)
+    states = ConversationParticipantState.objects.filter(conversation_id=conversation.id)
+    states.exclude(
+        participant_content_type_id=content_type_id,
+        participant_object_id=sender_id
+    ).update(unread_count=F('unread_count') + 1, last_message_at=message.created_at)
+    updated = states.filter(
+        participant_content_type_id=content_type_id,
+        participant_object_id=sender_id
+    ).update(unread_count=0, last_read_message=message, last_message_at=message.created_at)
+    if not updated:
+        ConversationParticipantState.objects.get_or_create(
+            conversation_id=conversation.id,
+            participant_content_type_id=content_type_id,
+            participant_object_id=sender_id,
+            defaults={'last_read_message': message, 'last_message_at': message.created_at}
+        )
+
+
+@transaction.atomic
+def mark_conversation_read(conversation, user):
+    """
+    Move the user's read position to the conversation's last message.
+    Returns the number of messages that were unread.
+    The last message is read from the locked conversation row (locked
+    before the state row, in the order record_message writes them), not
+    from the in-memory conversation, so a message recorded meanwhile is
+    not cleared without being read.
+    """
+    conversation.last_message_id = Conversation.objects.select_for_update().filter(
+        id=conversation.id
+    ).values_list('last_message_id', flat=True).first()
+    state = participant_states(user).select_for_update().filter(conversation_id=conversation.id).first()
+    if state is None:
+        ensure_participant_states(
+            conversation,
+            teacher_ids=[user.id] if isinstance(user, Teacher) else (),
+            student_ids=[user.id] if isinstance(user, Student) else ()
+        )
+        return 0
+    cleared = state.unread_count
+    if cleared or state.last_read_message_id != conversation.last_message_id:
+        ConversationParticipantState.objects.filter(id=state.id).update(
+            unread_count=0,
+            last_read_message_id=conversation.last_message_id
+        )
+    return cleared
+
+
+def count_unread_messages(user):
+    """Unread messages over all of the user's conversations"""
+    return participant_states(user).aggregate(total=Sum('unread_count'))['total'] or 0
@@ -0,0 +1,194 @@
+import base64
+import hashlib
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def wants_cursor_pagination(request):
+    """Cursor pagination is opt-in: ?pagination=cursor (or a cursor param)"""
+    return (
+        request.query_params.get('pagination') == 'cursor'
+        or 'cursor' in request.query_params
+    )
+
+
+def estimated_count(queryset, timeout=None):
+    """
+    Total rows of a queryset, cached per distinct SQL for a short time.
+    Good enough for "about N results" without a COUNT(*) on every page.
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'ESTIMATED_COUNT_CACHE_TIMEOUT', 60)
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.sha1(f'{sql}|{params!r}'.encode()).hexdigest()
+    key = f'lms:estimated_count:{digest}'
+    count = cache.get(key)
+    if count is None:
+        count = queryset.order_by().count()
+        cache.set(key, count, timeout)
+    return count
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination on the queryset's own ORDER BY.
+    The ordering must end with a unique column ('id' / '-id'), which makes
+    the position of the last row on a page an exact, stable cursor:
+    the next page is WHERE (sort columns) past that row ... LIMIT n,
+    with no OFFSET and no COUNT(*).
+
+    Query params:
+    - cursor: opaque position returned as 'next'
+    - page_size: rows per page
+    - count: 'estimate' (cached count) or 'exact'; omitted by default
+    """
+    page_size = 12
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self._get_ordering(queryset)
+        self.page_size = self._get_page_size(request)
+
+        self.count = None
+        count_mode = request.query_params.get(self.count_query_param)
+        if count_mode == 'exact':
+            self.count = queryset.order_by().count()
+        elif count_mode == 'estimate':
+            self.count = estimated_count(queryset)
+
+        position = self._decode_cursor(request.query_params.get(self.cursor_query_param), queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self._after(position))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def paginate_sorted_list(self, rows, ordering, model, request, view=None):
+        """
+        Same cursors over rows already sorted in memory (e.g. ranked search
+        hits, at most a few thousand). ordering is [(attribute, descending), ...]
+        ending on id, with numeric values for descending attributes; model
+        converts cursor values of model fields.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = list(ordering)
+        self.page_size = self._get_page_size(request)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ('exact', 'estimate'):
+            self.count = len(rows)
+
+        position = self._decode_cursor(request.query_params.get(self.cursor_query_param), model)
+        if position is not None:
+            start = self._sort_key(position)
+            rows = [
+                row for row in rows
+                if self._sort_key([getattr(row, name) for name, _ in self.ordering]) > start
+            ]
+
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def _sort_key(self, values):
+        """Ascending sort key of ordering values (descending numbers negated)"""
+        return tuple(-value if descending else value for (_, descending), value in zip(self.ordering, values))
+
+    def get_paginated_response(self, data):
+        payload = {'next': self.get_next_link()}
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['results'] = data
+        return Response(payload)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        last = self.page[-1]
+        values = [self._encode_value(getattr(last, name)) for name, _ in self.ordering]
+        cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def _get_ordering(self, queryset):
+        ordering = list(queryset.query.order_by) or ['-id']
+        fields = []
+        for term in ordering:
+            if not isinstance(term, str):
+                raise TypeError('KeysetPagination requires field-name ordering')
+            fields.append((term.lstrip('-'), term.startswith('-')))
+        if fields[-1][0] not in ('id', 'pk'):
+            fields.append(('id', fields[-1][1]))
+        return fields
+
+    def _get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def _after(self, position):
+        """
+        Rows strictly after the cursor in ORDER BY order:
+        (a > x) OR (a = x AND b > y) OR ..., plus a leading range bound on
+        the first column so the index can be range-scanned.
+        """
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.ordering, position):
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        first_name, first_descending = self.ordering[0]
+        bound = Q(**{f"{first_name}__{'lte' if first_descending else 'gte'}": position[0]})
+        return bound & condition
+
+    def _decode_cursor(self, cursor, model):
+        if not cursor:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                self._decode_value(model, name, value)
+                for (name, _), value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound('Invalid cursor')
+
+    @staticmethod
+    def _encode_value(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    @staticmethod
+    def _decode_value(model, name, value):
+        if value is None:
+            raise ValueError
+        try:
+            field = model._meta.get_field('id' if name == 'pk' else name)
+        except FieldDoesNotExist:
+            # Annotation (e.g. relevance): JSON value is already usable
+            return value
+        return field.to_python(value)
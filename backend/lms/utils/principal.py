@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.core.cache import caches
+from lms.models import Teacher, Student
+
+PRINCIPAL_MODELS = {
+    'teacher': Teacher,
+    'student': Student,
+}
+
+
+def _get_cache():
+    return caches[getattr(settings, 'PRINCIPAL_CACHE', 'default')]
+
+
+def _cache_key(kind, principal_id):
+    return f"lms:principal:{kind}:{principal_id}"
+
+
+def _load(kind, **lookup):
+    # The password hash is never cached; reading it (login, change password)
+    # loads it from the database
+    try:
+        return PRINCIPAL_MODELS[kind].objects.defer('password').get(**lookup)
+    except PRINCIPAL_MODELS[kind].DoesNotExist:
+        return None
+
+
+class Principal:
+    """
+    Identity behind a JWT payload.
+    Teacher/student rows are resolved lazily, at most once per request,
+    through a short-lived identity cache keyed by id claim:
+    - a token carrying '<kind>_id' resolves by that id only
+    - a token carrying the other kind's id never resolves as this kind
+    - legacy tokens without id claims fall back to the email claim
+      (not cached, since the email can change)
+    """
+
+    def __init__(self, claims):
+        self.claims = claims or {}
+        self._resolved = {}
+
+    @property
+    def teacher(self):
+        return self.get('teacher')
+
+    @property
+    def student(self):
+        return self.get('student')
+
+    def get(self, kind, fresh=False):
+        if fresh or kind not in self._resolved:
+            self._resolved[kind] = self._resolve(kind, fresh)
+        return self._resolved[kind]
+
+    def _resolve(self, kind, fresh):
+        principal_id = self.claims.get(f'{kind}_id')
+        if principal_id:
+            key = _cache_key(kind, principal_id)
+            cache = _get_cache()
+            instance = None if fresh else cache.get(key)
+            if instance is None:
+                instance = _load(kind, id=principal_id)
+                if instance is not None:
+                    cache.set(key, instance, getattr(settings, 'PRINCIPAL_CACHE_TIMEOUT', 300))
+            return instance
+
+        if any(self.claims.get(f'{other}_id') for other in PRINCIPAL_MODELS):
+            return None
+
+        email = self.claims.get('email')
+        if email:
+            return _load(kind, email=email)
+        return None
+
+
+def get_principal(request):
+    """Principal of the request (attached by CustomJWTAuthentication)"""
+    principal = getattr(request, 'principal', None)
+    if principal is None:
+        principal = Principal(getattr(request, 'auth', None))
+        request.principal = principal
+    return principal
+
+
+def get_current_teacher(request, fresh=False):
+    """
+    Current teacher for the request, or None.
+    fresh=True bypasses the identity cache; use it before writing the row.
+    """
+    return get_principal(request).get('teacher', fresh=fresh)
+
+
+def get_current_student(request, fresh=False):
+    """
+    Current student for the request, or None.
+    fresh=True bypasses the identity cache; use it before writing the row.
+    """
+    return get_principal(request).get('student', fresh=fresh)
+
+
+def invalidate_principal(kind, principal_id):
+    """Drop a cached identity (profile or password changed, account deleted)"""
+    _get_cache().delete(_cache_key(kind, principal_id))
@@ -0,0 +1,133 @@
+import atexit
+import logging
+import threading
+import time
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections
+from lms.utils.course_progress import apply_lesson_progress_batch
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressWriteBuffer:
+    """
+    Write-behind buffer for lesson heartbeats.
+
+    Ticks are coalesced per (student, lesson), keeping the highest watched
+    position, and written in bulk when the buffer is full, when its oldest
+    entry is older than max_age_seconds, or when a caller forces a flush
+    (e.g. for ticks that may complete a lesson).
+
+    The buffer is per process. Positions that have not been flushed yet are
+    lost if the process dies; completion ticks are always flushed inline.
+    """
+
+    def __init__(self, max_pending=1000, max_age_seconds=10):
+        self.max_pending = max_pending
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._oldest = None
+        self._flusher = None
+
+    def add(self, student_id, lesson_id, watched_seconds, completed):
+        with self._lock:
+            key = (student_id, lesson_id)
+            if key in self._pending:
+                old_watched, old_completed = self._pending[key]
+                self._pending[key] = (max(old_watched, watched_seconds), old_completed or completed)
+            else:
+                self._pending[key] = (watched_seconds, completed)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+        self._ensure_flusher()
+
+    def should_flush(self):
+        with self._lock:
+            if not self._pending:
+                return False
+            return (
+                len(self._pending) >= self.max_pending
+                or time.monotonic() - self._oldest >= self.max_age_seconds
+            )
+
+    def flush(self, keys=None):
+        """
+        Write pending ticks (all of them, or only `keys`). Returns rows written.
+
+        Never raises: a failing batch is retried one entry at a time, entries
+        rejected by the database (IntegrityError) are logged and dropped, and
+        entries that fail for other reasons (e.g. a lost connection) are put
+        back for the next flush. One bad row cannot block the buffer or fail
+        the request that happened to trigger the flush.
+        """
+        with self._lock:
+            if keys is None:
+                entries, self._pending = self._pending, {}
+            else:
+                entries = {key: self._pending.pop(key) for key in keys if key in self._pending}
+            if not self._pending:
+                self._oldest = None
+        try:
+            return apply_lesson_progress_batch(entries)
+        except Exception as exc:
+            if len(entries) == 1:
+                self._handle_failure(entries, exc)
+                return 0
+            logger.exception("Failed to write %d buffered lesson ticks, retrying one by one", len(entries))
+
+        written = 0
+        for key, value in entries.items():
+            try:
+                written += apply_lesson_progress_batch({key: value})
+            except Exception as exc:
+                self._handle_failure({key: value}, exc)
+        return written
+
+    def _handle_failure(self, entries, exc):
+        """Drop entries the database rejects; keep the rest for the next flush"""
+        if isinstance(exc, IntegrityError):
+            logger.exception("Dropping buffered lesson ticks %s", sorted(entries))
+            return
+        logger.exception("Failed to write buffered lesson ticks %s, keeping them", sorted(entries))
+        for (student_id, lesson_id), (watched_seconds, completed) in entries.items():
+            self.add(student_id, lesson_id, watched_seconds, completed)
+
+    def flush_if_due(self):
+        if self.should_flush():
+            return self.flush()
+        return 0
+
+    def _ensure_flusher(self):
+        """Background thread that flushes aged entries when no request does"""
+        if self._flusher is not None or self.max_age_seconds <= 0:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run_flusher, daemon=True)
+                self._flusher.start()
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(self.max_age_seconds)
+            try:
+                self.flush_if_due()
+            except Exception:
+                logger.exception("Failed to flush buffered lesson progress")
+            finally:
+                close_old_connections()
+
+
+_buffer_settings = getattr(settings, 'PROGRESS_WRITE_BUFFER', {})
+progress_buffer = ProgressWriteBuffer(
+    max_pending=_buffer_settings.get('MAX_PENDING', 1000),
+    max_age_seconds=_buffer_settings.get('MAX_AGE_SECONDS', 10),
+)
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        progress_buffer.flush()
+    except Exception:
+        logger.exception("Failed to flush buffered lesson progress on exit")
@@ -0,0 +1,142 @@
+import struct
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max
+from lms.models import QuizAttempt
+from lms.utils.quiz_cache import get_quiz_answer_key, get_student_quiz_payload
+
+# Share of attempts in each of the upper/lower groups for the discrimination index
+DISCRIMINATION_GROUP_RATIO = 0.27
+
+
+def pack_option_ids(option_ids):
+    """Pack selected option ids as little-endian uint32 (4 bytes per answer)"""
+    return struct.pack(f'<{len(option_ids)}I', *option_ids)
+
+
+def unpack_option_ids(data):
+    """Inverse of pack_option_ids"""
+    data = bytes(data or b'')
+    return list(struct.unpack(f'<{len(data) // 4}I', data))
+
+
+def _get_cache():
+    return caches[getattr(settings, 'QUIZ_CACHE', 'default')]
+
+
+def _item_analysis_cache_key(quiz, attempt_count, last_attempt_id):
+    return (
+        f"lms:quiz_item_analysis:{quiz.id}:v{quiz.content_version}"
+        f":n{attempt_count}:a{last_attempt_id}"
+    )
+
+
+def build_item_analysis(quiz):
+    """
+    Classical item analysis over every attempt with stored answers:
+    - difficulty: share of attempts answering the question correctly
+    - discrimination: difficulty in the top 27% of attempts (by score)
+      minus difficulty in the bottom 27%
+    - options: how often each option was picked (distractor analysis)
+    Computed on the quiz's current questions; answers to options that no
+    longer exist are ignored.
+    """
+    answer_key = get_quiz_answer_key(quiz)
+    questions = get_student_quiz_payload(quiz)['questions']
+
+    option_ids = [option['id'] for question in questions for option in question['options']]
+    option_column = {option_id: column for column, option_id in enumerate(option_ids)}
+    question_row = {question['id']: row for row, question in enumerate(questions)}
+    option_question_row = np.array(
+        [question_row[answer_key['option_question'][option_id]] for option_id in option_ids],
+        dtype=np.intp
+    )
+    option_is_correct = np.array(
+        [option_id in answer_key['correct'][answer_key['option_question'][option_id]] for option_id in option_ids],
+        dtype=bool
+    )
+
+    scores = []
+    attempt_rows = []
+    option_cols = []
+    attempts = QuizAttempt.objects.filter(quiz=quiz).exclude(selected_options=b'').values_list(
+        'score', 'selected_options'
+    )
+    for score, packed in attempts.iterator():
+        attempt_row = len(scores)
+        scores.append(score)
+        for option_id in unpack_option_ids(packed):
+            column = option_column.get(option_id)
+            if column is not None:
+                attempt_rows.append(attempt_row)
+                option_cols.append(column)
+
+    n_attempts, n_questions, n_options = len(scores), len(questions), len(option_ids)
+
+    # attempts x options selection matrix, and attempts x questions correctness
+    selected = np.zeros((n_attempts, n_options), dtype=bool)
+    selected[np.array(attempt_rows, dtype=np.intp), np.array(option_cols, dtype=np.intp)] = True
+    correct = np.zeros((n_attempts, n_questions), dtype=np.float64)
+    answered = np.zeros((n_attempts, n_questions), dtype=np.float64)
+    np.add.at(answered.T, option_question_row, selected.T)
+    np.add.at(correct.T, option_question_row, (selected & option_is_correct).T)
+
+    option_counts = selected.sum(axis=0)
+    if n_attempts:
+        difficulty = correct.mean(axis=0)
+        group_size = max(1, int(round(n_attempts * DISCRIMINATION_GROUP_RATIO)))
+        order = np.argsort(np.array(scores), kind='stable')
+        lower, upper = order[:group_size], order[-group_size:]
+        discrimination = correct[upper].mean(axis=0) - correct[lower].mean(axis=0)
+        answered_counts = answered.sum(axis=0)
+    else:
+        group_size = 0
+        difficulty = discrimination = answered_counts = np.zeros(n_questions)
+
+    results = []
+    column = 0
+    for row, question in enumerate(questions):
+        options = []
+        for option in question['options']:
+            count = int(option_counts[column]) if n_attempts else 0
+            options.append({
+                'option_id': option['id'],
+                'option_text': option['option_text'],
+                'is_correct': bool(option_is_correct[column]),
+                'count': count,
+                'frequency': round(count / n_attempts, 4) if n_attempts else 0.0,
+            })
+            column += 1
+        results.append({
+            'question_id': question['id'],
+            'question_text': question['question_text'],
+            'order': question['order'],
+            'answered': int(answered_counts[row]),
+            'difficulty': round(float(difficulty[row]), 4),
+            'discrimination': round(float(discrimination[row]), 4),
+            'options': options,
+        })
+
+    return {
+        'quiz_id': quiz.id,
+        'total_attempts': n_attempts,
+        'group_size': group_size,
+        'questions': results,
+    }
+
+
+def get_item_analysis(quiz):
+    """
+    Item analysis for a quiz, cached until the quiz content changes or
+    attempts are added/removed (the key includes the attempt count and
+    the newest attempt id, read with one aggregate query).
+    """
+    stats = QuizAttempt.objects.filter(quiz=quiz).aggregate(count=Count('id'), last_id=Max('id'))
+    cache = _get_cache()
+    key = _item_analysis_cache_key(quiz, stats['count'], stats['last_id'] or 0)
+    analysis = cache.get(key)
+    if analysis is None:
+        analysis = build_item_analysis(quiz)
+        cache.set(key, analysis, getattr(settings, 'QUIZ_CACHE_TIMEOUT', 60 * 60 * 24))
+    return analysis
@@ -0,0 +1,145 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from lms.models import Quiz, Question
+
+
+def _get_cache():
+    return caches[getattr(settings, 'QUIZ_CACHE', 'default')]
+
+
+def _answer_key_cache_key(quiz_id, version):
+    return f"lms:quiz_answer_key:{quiz_id}:v{version}"
+
+
+def _student_questions_cache_key(quiz_id, version):
+    return f"lms:quiz_student_questions:{quiz_id}:v{version}"
+
+
+def build_quiz_answer_key(quiz_id):
+    """
+    Compile the answer key of a quiz in one query:
+    {
+        'question_ids': [question ids in quiz order],
+        'correct': {question_id: {correct option ids}},
+        'option_question': {option_id: question_id},
+    }
+    """
+    rows = Question.objects.filter(quiz_id=quiz_id).order_by('order', 'id', 'options__id').values_list(
+        'id', 'options__id', 'options__is_correct'
+    )
+    question_ids = []
+    correct = {}
+    option_question = {}
+    for question_id, option_id, is_correct in rows:
+        if question_id not in correct:
+            question_ids.append(question_id)
+            correct[question_id] = set()
+        if option_id is None:
+            continue
+        option_question[option_id] = question_id
+        if is_correct:
+            correct[question_id].add(option_id)
+    return {
+        'question_ids': question_ids,
+        'correct': correct,
+        'option_question': option_question,
+    }
+
+
+def get_quiz_answer_key(quiz):
+    """
+    Return the compiled answer key for a quiz.
+    Cached under the quiz's content_version; a write to its questions or
+    options bumps the version, so stale keys are never read.
+    """
+    cache = _get_cache()
+    key = _answer_key_cache_key(quiz.id, quiz.content_version)
+    answer_key = cache.get(key)
+    if answer_key is None:
+        answer_key = build_quiz_answer_key(quiz.id)
+        cache.set(key, answer_key, getattr(settings, 'QUIZ_CACHE_TIMEOUT', 60 * 60 * 24))
+    return answer_key
+
+
+def build_student_quiz_questions(quiz_id):
+    """
+    Questions of a quiz with their options, without is_correct, in one
+    joined query. Shape matches StudentQuizDetailView's 'questions'.
+    """
+    rows = Question.objects.filter(quiz_id=quiz_id).order_by('order', 'id', 'options__id').values_list(
+        'id', 'question_text', 'order', 'options__id', 'options__option_text'
+    )
+    questions = []
+    for question_id, question_text, order, option_id, option_text in rows:
+        if not questions or questions[-1]['id'] != question_id:
+            questions.append({
+                'id': question_id,
+                'question_text': question_text,
+                'order': order,
+                'options': []
+            })
+        if option_id is not None:
+            # is_correct is intentionally excluded
+            questions[-1]['options'].append({'id': option_id, 'option_text': option_text})
+    return questions
+
+
+def get_student_quiz_payload(quiz):
+    """
+    Student-safe quiz payload. The question tree is cached under the
+    quiz's content_version; the header fields come from the quiz row.
+    """
+    cache = _get_cache()
+    key = _student_questions_cache_key(quiz.id, quiz.content_version)
+    questions = cache.get(key)
+    if questions is None:
+        questions = build_student_quiz_questions(quiz.id)
+        cache.set(key, questions, getattr(settings, 'QUIZ_CACHE_TIMEOUT', 60 * 60 * 24))
+    return {
+        'id': quiz.id,
+        'title': quiz.title,
+        'description': quiz.description,
+        'pass_mark': quiz.pass_mark,
+        'created_at': quiz.created_at,
+        'questions': questions
+    }
+
+
+def quiz_etag(quiz):
+    """Strong validator for the student quiz payload"""
+    return f'"quiz-{quiz.id}-v{quiz.content_version}"'
+
+
+def bump_quiz_content_version(*quiz_ids):
+    """
+    Invalidate cached quiz data (answer key, student payload, ETag).
+    Call after any write to a quiz or its questions or options.
+    """
+    Quiz.objects.filter(id__in=quiz_ids).update(content_version=F('content_version') + 1)
+
+
+def grade_quiz_answers(answer_key, answers):
+    """
+    Grade submitted answers ({"<question_id>": <option_id>}) in memory.
+    An answer is correct when the option belongs to that question and is
+    marked correct; unknown questions and malformed ids count as wrong.
+    Returns (correct_count, selected option ids that belong to their
+    question, in quiz order).
+    """
+    correct_count = 0
+    selected_option_ids = []
+    for question_id, correct_options in answer_key['correct'].items():
+        selected_option_id = answers.get(str(question_id))
+        if selected_option_id is None:
+            continue
+        try:
+            selected_option_id = int(selected_option_id)
+        except (TypeError, ValueError):
+            continue
+        if answer_key['option_question'].get(selected_option_id) != question_id:
+            continue
+        selected_option_ids.append(selected_option_id)
+        if selected_option_id in correct_options:
+            correct_count += 1
+    return correct_count, selected_option_ids
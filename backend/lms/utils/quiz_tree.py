@@ -0,0 +1,108 @@
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from lms.models import Quiz, Question, Option
+from lms.utils.bulk_utils import bulk_create_with_pks
+from lms.utils.course_outline import bump_course_outline_version
+from lms.utils.quiz_cache import bump_quiz_content_version
+
+QUIZ_HEADER_FIELDS = ('title', 'description', 'pass_mark')
+
+
+@transaction.atomic
+def write_quiz_tree(quiz, data, replace=False):
+    """
+    Write a whole quiz tree (validated QuizTreeSerializer data) in one
+    transaction with a constant number of statements.
+
+    replace=False (diff): questions/options with an id are updated, those
+    without are created, and existing ones missing from the payload are
+    deleted. Options may move between questions of the same quiz.
+    replace=True: every existing question is deleted and the payload is
+    created from scratch (ids are ignored).
+
+    Raises ValidationError for ids that do not belong to this quiz.
+    """
+    # Serialize concurrent tree writes on the same quiz
+    quiz = Quiz.objects.select_for_update().get(id=quiz.id)
+
+    existing_questions = {}
+    existing_options = {}
+    if replace:
+        Question.objects.filter(quiz=quiz).delete()
+    else:
+        existing_questions = {question.id: question for question in Question.objects.filter(quiz=quiz)}
+        existing_options = {option.id: option for option in Option.objects.filter(question__quiz=quiz)}
+        for question_data in data['questions']:
+            if 'id' in question_data and question_data['id'] not in existing_questions:
+                raise ValidationError({'questions': f"Question {question_data['id']} does not belong to this quiz"})
+            for option_data in question_data['options']:
+                if 'id' in option_data and option_data['id'] not in existing_options:
+                    raise ValidationError({'questions': f"Option {option_data['id']} does not belong to this quiz"})
+
+    header = {field: data[field] for field in QUIZ_HEADER_FIELDS if field in data}
+    if header:
+        Quiz.objects.filter(id=quiz.id).update(**header)
+
+    # Questions: update in place or create
+    questions = []
+    questions_to_update = []
+    questions_to_create = []
+    for position, question_data in enumerate(data['questions']):
+        order = question_data.get('order', position)
+        if not replace and 'id' in question_data:
+            question = existing_questions[question_data['id']]
+            if question.question_text != question_data['question_text'] or question.order != order:
+                question.question_text = question_data['question_text']
+                question.order = order
+                questions_to_update.append(question)
+        else:
+            question = Question(quiz=quiz, question_text=question_data['question_text'], order=order)
+            questions_to_create.append(question)
+        questions.append(question)
+
+    if questions_to_update:
+        Question.objects.bulk_update(questions_to_update, ['question_text', 'order'], batch_size=500)
+    bulk_create_with_pks(
+        Question, questions_to_create, Question.objects.filter(quiz=quiz),
+        existing_pks=list(existing_questions), batch_size=500
+    )
+
+    # Options: update in place (possibly under another question) or create
+    options_to_update = []
+    options_to_create = []
+    kept_option_ids = set()
+    for question, question_data in zip(questions, data['questions']):
+        for option_data in question_data['options']:
+            if not replace and 'id' in option_data:
+                option = existing_options[option_data['id']]
+                kept_option_ids.add(option.id)
+                if (option.question_id, option.option_text, option.is_correct) != (
+                    question.id, option_data['option_text'], option_data['is_correct']
+                ):
+                    option.question_id = question.id
+                    option.option_text = option_data['option_text']
+                    option.is_correct = option_data['is_correct']
+                    options_to_update.append(option)
+            else:
+                options_to_create.append(Option(
+                    question_id=question.id,
+                    option_text=option_data['option_text'],
+                    is_correct=option_data['is_correct']
+                ))
+
+    if options_to_update:
+        Option.objects.bulk_update(options_to_update, ['question', 'option_text', 'is_correct'], batch_size=500)
+    if options_to_create:
+        Option.objects.bulk_create(options_to_create, batch_size=500)
+
+    # Drop what the payload no longer contains (moved options are already re-parented)
+    removed_option_ids = set(existing_options) - kept_option_ids
+    if removed_option_ids:
+        Option.objects.filter(id__in=removed_option_ids).delete()
+    removed_question_ids = set(existing_questions) - {question.id for question in questions}
+    if removed_question_ids:
+        Question.objects.filter(id__in=removed_question_ids).delete()
+
+    bump_course_outline_version(quiz.course_id)
+    bump_quiz_content_version(quiz.id)
+    return quiz
@@ -0,0 +1,71 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from lms.models import ConversationParticipantState, Teacher, Student
+from lms.utils.event_bus import get_event_bus
+
+PARTICIPANT_MODELS = {
+    'teacher': Teacher,
+    'student': Student,
+}
+
+
+def user_channel(user):
+    """Channel of a Teacher or Student: '<kind>:<id>'"""
+    return f"{type(user).__name__.lower()}:{user.id}"
+
+
+def _publish_on_commit(entries):
+    # Subscribers only hear about rows they can read (and nothing on rollback)
+    entries = list(entries)
+    if entries:
+        transaction.on_commit(lambda: get_event_bus().publish_many(entries))
+
+
+def _conversation_channels(conversation, exclude=None):
+    """Channels of every participant of a conversation, minus exclude (a user)"""
+    kinds = {
+        ContentType.objects.get_for_model(model).id: kind
+        for kind, model in PARTICIPANT_MODELS.items()
+    }
+    channels = [
+        f"{kinds[content_type_id]}:{object_id}"
+        for content_type_id, object_id in ConversationParticipantState.objects.filter(
+            conversation_id=conversation.id
+        ).values_list('participant_content_type_id', 'participant_object_id')
+        if content_type_id in kinds
+    ]
+    if exclude is not None:
+        excluded = user_channel(exclude)
+        channels = [channel for channel in channels if channel != excluded]
+    return channels
+
+
+def publish_message(conversation, message_data, sender):
+    """'message' event to the other participants of the conversation"""
+    data = {'conversation_id': conversation.id, 'message': message_data}
+    _publish_on_commit(
+        (channel, 'message', data)
+        for channel in _conversation_channels(conversation, exclude=sender)
+    )
+
+
+def publish_read(conversation, reader):
+    """'read' receipt to the other participants of the conversation"""
+    data = {
+        'conversation_id': conversation.id,
+        'reader_type': type(reader).__name__.lower(),
+        'reader_id': reader.id,
+        'last_read_message_id': conversation.last_message_id,
+    }
+    _publish_on_commit(
+        (channel, 'read', data)
+        for channel in _conversation_channels(conversation, exclude=reader)
+    )
+
+
+def publish_notifications(notifications_data):
+    """'notification' event to each notified student (serialized notifications)"""
+    _publish_on_commit(
+        (f"student:{notification['student']}", 'notification', {'notification': notification})
+        for notification in notifications_data
+    )
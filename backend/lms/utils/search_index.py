@@ -0,0 +1,239 @@
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, Count, ExpressionWrapper, IntegerField, Max, Q, Value, When
+from django.utils.module_loading import import_string
+from lms.models import CourseSearchDocument
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Relative weight of each indexed field in the relevance score
+FIELD_WEIGHTS = {
+    'title': 3,
+    'teacher_name': 2,
+    'category_title': 2,
+    'description': 1,
+}
+
+
+def tokenize(text):
+    """Lowercased word tokens (unicode aware, so Vietnamese text works)"""
+    return _TOKEN_RE.findall((text or '').lower())
+
+
+class BaseSearchBackend:
+    """
+    Full-text index over course title, description, teacher name and
+    category title. Subclasses implement search(); the document table
+    (CourseSearchDocument) is shared by all backends.
+    """
+
+    def index_course(self, course):
+        """Create or refresh the search document of a course"""
+        CourseSearchDocument.objects.update_or_create(
+            course_id=course.id,
+            defaults={
+                'title': course.title or '',
+                'description': course.description or '',
+                'teacher_name': course.teacher.full_name if course.teacher_id else '',
+                'category_title': course.category.title if course.category_id else '',
+            }
+        )
+
+    def remove_course(self, course_id):
+        """Documents cascade with the course; nothing else to do by default"""
+
+    def search(self, query, limit=1000):
+        """Return [(course_id, score), ...] sorted by descending relevance"""
+        raise NotImplementedError
+
+
+# InnoDB's default FULLTEXT stopwords (ignored by MATCH ... AGAINST)
+MYSQL_FULLTEXT_STOPWORDS = frozenset([
+    'a', 'about', 'an', 'are', 'as', 'at', 'be', 'by', 'com', 'de', 'en',
+    'for', 'from', 'how', 'i', 'in', 'is', 'it', 'la', 'of', 'on', 'or',
+    'that', 'the', 'this', 'to', 'was', 'what', 'when', 'where', 'who',
+    'will', 'with', 'und', 'www',
+])
+
+
+class MySQLFullTextBackend(BaseSearchBackend):
+    """
+    MATCH ... AGAINST over the FULLTEXT index created by migration 0014.
+    Every query term is matched as a prefix so partial words still hit.
+    FULLTEXT ignores stopwords and words shorter than
+    innodb_ft_min_token_size (COURSE_SEARCH_MIN_TOKEN_SIZE), so queries
+    made only of those ("AI", "Go", short Vietnamese syllables) fall back
+    to a substring match.
+    """
+
+    def search(self, query, limit=1000):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        min_token_size = getattr(settings, 'COURSE_SEARCH_MIN_TOKEN_SIZE', 3)
+        if not any(len(term) >= min_token_size and term not in MYSQL_FULLTEXT_STOPWORDS for term in terms):
+            return self._substring_search(sorted(set(terms)), limit)
+        against = ' '.join(f'{term}*' for term in terms)
+        table = connection.ops.quote_name(CourseSearchDocument._meta.db_table)
+        match = 'MATCH(title, description, teacher_name, category_title) AGAINST (%s IN BOOLEAN MODE)'
+        sql = (
+            f'SELECT course_id, {match} AS score FROM {table} '
+            f'WHERE {match} ORDER BY score DESC, course_id DESC LIMIT %s'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [against, against, limit])
+            return [(course_id, float(score)) for course_id, score in cursor.fetchall()]
+
+    @staticmethod
+    def _substring_search(terms, limit):
+        """
+        icontains match of every term in any indexed field, scored by the
+        FIELD_WEIGHTS of the fields each term matches
+        """
+        matches = Q()
+        score = Value(0)
+        for term in terms:
+            term_matches = Q()
+            for field, weight in FIELD_WEIGHTS.items():
+                lookup = Q(**{f'{field}__icontains': term})
+                term_matches |= lookup
+                score = score + Case(When(lookup, then=Value(weight)), default=Value(0))
+            matches &= term_matches
+        rows = CourseSearchDocument.objects.filter(matches).annotate(
+            score=ExpressionWrapper(score, output_field=IntegerField())
+        ).order_by('-score', '-course_id').values_list('course_id', 'score')[:limit]
+        return [(course_id, float(score)) for course_id, score in rows]
+
+
+class InvertedIndexBackend(BaseSearchBackend):
+    """
+    Pure-Python inverted index with BM25 ranking, for SQLite, tests and
+    local runs. Built lazily from CourseSearchDocument and kept current
+    incrementally: local writes are applied directly, and each search
+    pulls documents changed by other processes since the last sync.
+    Query terms also match as prefixes of indexed terms.
+    """
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = defaultdict(dict)  # term -> {course_id: weighted term frequency}
+        self._doc_terms = {}                # course_id -> {term: weighted term frequency}
+        self._doc_len = {}                  # course_id -> weighted document length
+        self._total_len = 0
+        self._vocabulary = []
+        self._vocabulary_dirty = False
+        self._synced_at = None
+
+    def index_course(self, course):
+        super().index_course(course)
+        document = CourseSearchDocument.objects.filter(course_id=course.id).first()
+        if document is not None:
+            with self._lock:
+                self._add_document(document)
+
+    def remove_course(self, course_id):
+        with self._lock:
+            self._remove_document(course_id)
+
+    def search(self, query, limit=1000):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self._lock:
+            self._sync()
+            if not self._doc_len:
+                return []
+            scores = defaultdict(float)
+            n_docs = len(self._doc_len)
+            avg_len = self._total_len / n_docs
+            for term in set(terms):
+                for index_term in self._expand(term):
+                    postings = self._postings[index_term]
+                    idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for course_id, tf in postings.items():
+                        norm = self.k1 * (1 - self.b + self.b * self._doc_len[course_id] / avg_len)
+                        scores[course_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+        return ranked[:limit]
+
+    def _expand(self, term):
+        """Indexed terms equal to or starting with the query term"""
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(term for term, postings in self._postings.items() if postings)
+            self._vocabulary_dirty = False
+        matches = []
+        i = bisect_left(self._vocabulary, term)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(term):
+            matches.append(self._vocabulary[i])
+            i += 1
+        return matches
+
+    def _sync(self):
+        """Apply documents changed since the last sync (one aggregate query when idle)"""
+        stats = CourseSearchDocument.objects.aggregate(count=Count('pk'), latest=Max('updated_at'))
+        if stats['count'] == len(self._doc_len) and (
+            stats['latest'] is None or (self._synced_at is not None and stats['latest'] <= self._synced_at)
+        ):
+            return
+
+        changed = CourseSearchDocument.objects.all()
+        if self._synced_at is not None:
+            changed = changed.filter(updated_at__gte=self._synced_at)
+        for document in changed.iterator():
+            self._add_document(document)
+
+        if stats['count'] != len(self._doc_len):
+            # Deleted elsewhere: drop documents that no longer exist
+            live_ids = set(CourseSearchDocument.objects.values_list('course_id', flat=True))
+            for course_id in set(self._doc_len) - live_ids:
+                self._remove_document(course_id)
+        self._synced_at = stats['latest']
+
+    def _add_document(self, document):
+        self._remove_document(document.course_id)
+        term_freqs = defaultdict(int)
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(getattr(document, field)):
+                term_freqs[token] += weight
+        for term, tf in term_freqs.items():
+            self._postings[term][document.course_id] = tf
+        self._doc_terms[document.course_id] = term_freqs
+        self._doc_len[document.course_id] = sum(term_freqs.values())
+        self._total_len += self._doc_len[document.course_id]
+        self._vocabulary_dirty = True
+
+    def _remove_document(self, course_id):
+        term_freqs = self._doc_terms.pop(course_id, None)
+        if term_freqs is None:
+            return
+        for term in term_freqs:
+            self._postings[term].pop(course_id, None)
+        self._total_len -= self._doc_len.pop(course_id)
+        self._vocabulary_dirty = True
+
+
+_backend = None
+
+
+def get_search_backend():
+    """
+    Configured search backend (COURSE_SEARCH_BACKEND dotted path), or the
+    MySQL FULLTEXT backend on MySQL and the in-process index elsewhere.
+    """
+    global _backend
+    if _backend is None:
+        backend_path = getattr(settings, 'COURSE_SEARCH_BACKEND', None)
+        if backend_path:
+            _backend = import_string(backend_path)()
+        elif connection.vendor == 'mysql':
+            _backend = MySQLFullTextBackend()
+        else:
+            _backend = InvertedIndexBackend()
+    return _backend
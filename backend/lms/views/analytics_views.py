@@ -1,35 +1,51 @@
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.exceptions import NotFound
-from django.db.models import Sum, Count, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from django.db.models import (
+    Sum, Count, Q, Avg, F, Value, OuterRef, Subquery, FloatField, DecimalField
+)
+from django.db.models.functions import Coalesce, Cast, NullIf
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from datetime import timedelta
-from lms.models import Teacher, Course, Enrollment
-from lms.models.order import Order
+from decimal import Decimal
+from lms.models import Course, Enrollment, CourseDailyStat, StudentCourseProgress
 from lms.permissions import IsTeacher
+from lms.utils.principal import get_current_teacher
 
 
-def get_current_teacher(request):
+MAX_ANALYTICS_DAYS = 366
+
+
+def _parse_days(request, default=30):
+    """?days=N clamped to [1, MAX_ANALYTICS_DAYS]"""
+    try:
+        days = int(request.query_params.get('days', default))
+    except (TypeError, ValueError):
+        raise ValidationError({'days': 'Must be an integer'})
+    return min(max(days, 1), MAX_ANALYTICS_DAYS)
+
+
+def _daily_series(teacher, days, field):
     """
-    Helper function to get the current teacher from the request.
+    Per-day totals of a CourseDailyStat field over the last N days,
+    with missing days filled with 0 (reads at most one row per day)
     """
-    if hasattr(request, 'auth') and request.auth:
-        teacher_id = request.auth.get('teacher_id')
-        if teacher_id:
-            try:
-                return Teacher.objects.get(id=teacher_id)
-            except Teacher.DoesNotExist:
-                pass
-        
-        email = request.auth.get('email')
-        if email:
-            try:
-                return Teacher.objects.get(email=email)
-            except Teacher.DoesNotExist:
-                pass
-    
-    return None
+    end_date = timezone.localdate()
+    start_date = end_date - timedelta(days=days - 1)
+    totals = dict(
+        CourseDailyStat.objects.filter(
+            teacher=teacher,
+            date__gte=start_date,
+            date__lte=end_date
+        ).values_list('date').annotate(total=Sum(field)).order_by()
+    )
+    return [
+        (day, totals.get(day) or 0)
+        for day in (start_date + timedelta(days=offset) for offset in range(days))
+    ]
 
 
 class AnalyticsSummaryView(APIView):
@@ -47,35 +63,27 @@ class AnalyticsSummaryView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Get teacher's courses
-        courses = Course.objects.filter(teacher=teacher)
-        
-        # Total Revenue (from paid orders)
-        total_revenue = Order.objects.filter(
-            course__teacher=teacher,
-            payment_status='paid'
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        # Total Revenue and Total Courses from the per-course running sums
+        totals = Course.objects.filter(teacher=teacher).aggregate(
+            total_revenue=Sum('total_revenue'),
+            total_courses=Count('id')
+        )
 
         # Total Students (unique students enrolled in teacher's courses)
         total_students = Enrollment.objects.filter(
             course__teacher=teacher
         ).values('student').distinct().count()
 
-        # Total Courses
-        total_courses = courses.count()
-
         # Today Revenue
-        today = timezone.now().date()
-        today_revenue = Order.objects.filter(
-            course__teacher=teacher,
-            payment_status='paid',
-            updated_at__date=today
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        today_revenue = CourseDailyStat.objects.filter(
+            teacher=teacher,
+            date=timezone.localdate()
+        ).aggregate(total=Sum('revenue'))['total'] or 0
 
         return Response({
-            'total_revenue': float(total_revenue),
+            'total_revenue': float(totals['total_revenue'] or 0),
             'total_students': total_students,
-            'total_courses': total_courses,
+            'total_courses': totals['total_courses'],
             'today_revenue': float(today_revenue)
         }, status=status.HTTP_200_OK)
 
@@ -95,36 +103,11 @@ class RevenueDailyView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        days = int(request.query_params.get('days', 30))
-        end_date = timezone.now().date()
-        start_date = end_date - timedelta(days=days - 1)
-
-        # Get daily revenue
-        orders = Order.objects.filter(
-            course__teacher=teacher,
-            payment_status='paid',
-            updated_at__date__gte=start_date,
-            updated_at__date__lte=end_date
-        ).extra(
-            select={'day': 'DATE(updated_at)'}
-        ).values('day').annotate(
-            revenue=Sum('amount')
-        ).order_by('day')
-
-        # Create a complete date range
-        daily_data = []
-        current_date = start_date
-        while current_date <= end_date:
-            day_str = current_date.strftime('%Y-%m-%d')
-            day_revenue = next(
-                (item['revenue'] for item in orders if item['day'].strftime('%Y-%m-%d') == day_str),
-                0
-            )
-            daily_data.append({
-                'date': day_str,
-                'revenue': float(day_revenue)
-            })
-            current_date += timedelta(days=1)
+        days = _parse_days(request)
+        daily_data = [
+            {'date': day.strftime('%Y-%m-%d'), 'revenue': float(revenue)}
+            for day, revenue in _daily_series(teacher, days, 'revenue')
+        ]
 
         return Response({
             'results': daily_data,
@@ -147,35 +130,11 @@ class EnrollmentsDailyView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        days = int(request.query_params.get('days', 30))
-        end_date = timezone.now().date()
-        start_date = end_date - timedelta(days=days - 1)
-
-        # Get daily enrollments
-        enrollments = Enrollment.objects.filter(
-            course__teacher=teacher,
-            enrolled_at__date__gte=start_date,
-            enrolled_at__date__lte=end_date
-        ).extra(
-            select={'day': 'DATE(enrolled_at)'}
-        ).values('day').annotate(
-            count=Count('id')
-        ).order_by('day')
-
-        # Create a complete date range
-        daily_data = []
-        current_date = start_date
-        while current_date <= end_date:
-            day_str = current_date.strftime('%Y-%m-%d')
-            day_count = next(
-                (item['count'] for item in enrollments if item['day'].strftime('%Y-%m-%d') == day_str),
-                0
-            )
-            daily_data.append({
-                'date': day_str,
-                'count': day_count
-            })
-            current_date += timedelta(days=1)
+        days = _parse_days(request)
+        daily_data = [
+            {'date': day.strftime('%Y-%m-%d'), 'count': count}
+            for day, count in _daily_series(teacher, days, 'enrollments')
+        ]
 
         return Response({
             'results': daily_data,
@@ -183,12 +142,60 @@ class EnrollmentsDailyView(APIView):
         }, status=status.HTTP_200_OK)
 
 
+class CoursePerformancePagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+# Report sort options; each ends on id so pages are stable
+COURSE_PERFORMANCE_ORDERINGS = {
+    'revenue': ('-revenue', '-id'),
+    'enrollments': ('-enrollment_count', '-id'),
+    'rating': ('-average_rating', '-total_reviews', '-id'),
+    'completion': ('-completion_rate', '-id'),
+    'progress': ('-average_progress', '-id'),
+    'title': ('title', 'id'),
+}
+
+
+def _parse_date_param(request, name):
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: 'Expected YYYY-MM-DD'})
+    return parsed
+
+
+def _course_subquery(queryset, aggregate):
+    """Correlated single-value aggregate over rows pointing at the outer course"""
+    return Subquery(
+        queryset.filter(course=OuterRef('pk')).order_by().values('course').annotate(
+            value=aggregate
+        ).values('value')[:1]
+    )
+
+
 class CoursePerformanceView(APIView):
     """
     Get performance data for each course.
     GET /api/teacher/analytics/course-performance/
+    Query params:
+    - start_date, end_date: YYYY-MM-DD (inclusive); limit revenue and
+      enrollments to that range. Completion rate and average progress
+      always cover every enrolled student.
+    - sort: 'revenue' (default), 'enrollments', 'rating', 'completion',
+      'progress', 'title'
+    - page, page_size
+    The whole report page is one SQL statement (plus the page count).
     """
     permission_classes = [IsTeacher]
+    pagination_class = CoursePerformancePagination
 
     def get(self, request):
         teacher = get_current_teacher(request)
@@ -198,32 +205,68 @@ class CoursePerformanceView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+        start_date = _parse_date_param(request, 'start_date')
+        end_date = _parse_date_param(request, 'end_date')
+        if start_date and end_date and start_date > end_date:
+            raise ValidationError({'end_date': 'Must not be before start_date'})
+
         courses = Course.objects.filter(teacher=teacher)
-        
-        performance_data = []
-        for course in courses:
-            # Course revenue
-            revenue = Order.objects.filter(
-                course=course,
-                payment_status='paid'
-            ).aggregate(total=Sum('amount'))['total'] or 0
-
-            # Total enrollments
-            enrollments = Enrollment.objects.filter(course=course).count()
-
-            performance_data.append({
-                'course_id': course.id,
-                'course_title': course.title,
-                'revenue': float(revenue),
-                'total_enrollments': enrollments,
-                'average_rating': course.average_rating,
-                'total_reviews': course.total_reviews
-            })
-
-        # Sort by revenue descending
-        performance_data.sort(key=lambda x: x['revenue'], reverse=True)
 
-        return Response({
-            'results': performance_data
-        }, status=status.HTTP_200_OK)
+        if start_date or end_date:
+            stats = CourseDailyStat.objects.all()
+            if start_date:
+                stats = stats.filter(date__gte=start_date)
+            if end_date:
+                stats = stats.filter(date__lte=end_date)
+            courses = courses.annotate(
+                revenue=Coalesce(
+                    _course_subquery(stats, Sum('revenue')), Value(Decimal('0')),
+                    output_field=DecimalField(max_digits=12, decimal_places=2)
+                ),
+                enrollment_count=Coalesce(_course_subquery(stats, Sum('enrollments')), Value(0)),
+            )
+        else:
+            # Lifetime figures are kept as running totals on the course
+            courses = courses.annotate(
+                revenue=F('total_revenue'),
+                enrollment_count=F('total_enrollments'),
+            )
 
+        completed = Coalesce(
+            _course_subquery(Enrollment.objects.filter(completed=True), Count('id')), Value(0)
+        )
+        courses = courses.annotate(
+            completion_rate=Coalesce(
+                Cast(completed, FloatField()) * Value(100.0) / NullIf(F('total_enrollments'), Value(0)),
+                Value(0.0)
+            ),
+            average_progress=Coalesce(
+                _course_subquery(StudentCourseProgress.objects.all(), Avg('overall_progress')),
+                Value(0.0)
+            ),
+        )
+
+        sort = request.query_params.get('sort', 'revenue')
+        courses = courses.order_by(
+            *COURSE_PERFORMANCE_ORDERINGS.get(sort, COURSE_PERFORMANCE_ORDERINGS['revenue'])
+        ).values(
+            'id', 'title', 'revenue', 'enrollment_count', 'average_rating', 'total_reviews',
+            'completion_rate', 'average_progress'
+        )
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(courses, request, view=self)
+        performance_data = [
+            {
+                'course_id': course['id'],
+                'course_title': course['title'],
+                'revenue': float(course['revenue']),
+                'total_enrollments': course['enrollment_count'],
+                'average_rating': course['average_rating'],
+                'total_reviews': course['total_reviews'],
+                'completion_rate': round(course['completion_rate'], 2),
+                'average_progress': round(course['average_progress'], 2),
+            }
+            for course in page
+        ]
+        return paginator.get_paginated_response(performance_data)
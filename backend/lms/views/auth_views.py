@@ -11,6 +11,7 @@ from lms.serializers.student_profile_serializer import (
     StudentProfileSerializer, StudentChangePasswordSerializer
 )
 from lms.permissions import IsStudent
+from lms.utils.principal import get_current_student
 
 
 @api_view(['POST'])
@@ -159,28 +160,6 @@ class CustomTokenRefreshView(TokenRefreshView):
     pass
 
 
-def get_current_student_from_request(request):
-    """
-    Helper function to get the current student from the request.
-    """
-    if hasattr(request, 'auth') and request.auth:
-        student_id = request.auth.get('student_id')
-        if student_id:
-            try:
-                return Student.objects.get(id=student_id)
-            except Student.DoesNotExist:
-                pass
-        
-        email = request.auth.get('email')
-        if email:
-            try:
-                return Student.objects.get(email=email)
-            except Student.DoesNotExist:
-                pass
-    
-    return None
-
-
 @api_view(['GET', 'PUT', 'PATCH'])
 @permission_classes([IsStudent])
 def StudentProfileView(request):
@@ -189,7 +168,8 @@ def StudentProfileView(request):
     GET /api/auth/profile/
     PUT/PATCH /api/auth/profile/
     """
-    student = get_current_student_from_request(request)
+    # Writes start from the database row, not the identity cache
+    student = get_current_student(request, fresh=request.method != 'GET')
     if not student:
         return Response(
             {'error': 'Student not found'},
@@ -219,7 +199,8 @@ def StudentChangePasswordView(request):
         "new_password": "..."
     }
     """
-    student = get_current_student_from_request(request)
+    # Password checks always use the database row
+    student = get_current_student(request, fresh=True)
     if not student:
         return Response(
             {'error': 'Student not found'},
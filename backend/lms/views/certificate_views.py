@@ -3,34 +3,13 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.generics import ListAPIView, RetrieveAPIView
-from lms.models import Certificate, Student
+from lms.models import Certificate
 from lms.serializers.certificate_serializer import (
     CertificateSerializer,
     CertificateDetailSerializer
 )
 from lms.permissions import IsStudent
-
-
-def get_current_student(request):
-    """
-    Helper function to get the current student from the request.
-    """
-    if hasattr(request, 'auth') and request.auth:
-        student_id = request.auth.get('student_id')
-        if student_id:
-            try:
-                return Student.objects.get(id=student_id)
-            except Student.DoesNotExist:
-                pass
-        
-        email = request.auth.get('email')
-        if email:
-            try:
-                return Student.objects.get(email=email)
-            except Student.DoesNotExist:
-                pass
-    
-    return None
+from lms.utils.principal import get_current_student
 
 
 class StudentCertificateListView(APIView):
@@ -3,56 +3,10 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.exceptions import NotFound, ValidationError, PermissionDenied
 from django.db import transaction
-from lms.models import Review, Course, Enrollment, Student
+from lms.models import Review, Course, Enrollment
 from lms.serializers.review_serializer import ReviewSerializer, ReviewCreateSerializer
 from lms.permissions import IsStudent
-
-
-def get_current_student(request):
-    """
-    Helper function to get the current student from the request.
-    Assumes JWT token contains student_id or email.
-    """
-    # Debug logging
-    print(f"DEBUG get_current_student: request.auth = {getattr(request, 'auth', None)}")
-    
-    if hasattr(request, 'auth') and request.auth:
-        # Try to get student_id from token
-        student_id = request.auth.get('student_id')
-        print(f"DEBUG: student_id from token = {student_id}")
-        if student_id:
-            try:
-                student = Student.objects.get(id=student_id)
-                print(f"DEBUG: Found student by ID: {student.id} - {student.email}")
-                return student
-            except Student.DoesNotExist:
-                print(f"DEBUG: Student with ID {student_id} not found")
-                pass
-        
-        # Try to get email from token
-        email = request.auth.get('email')
-        print(f"DEBUG: email from token = {email}")
-        if email:
-            try:
-                student = Student.objects.get(email=email)
-                print(f"DEBUG: Found student by email: {student.id} - {student.email}")
-                return student
-            except Student.DoesNotExist:
-                print(f"DEBUG: Student with email {email} not found")
-                pass
-    
-    # Fallback: try to get from user if available
-    if hasattr(request, 'user') and request.user and request.user.is_authenticated:
-        if hasattr(request.user, 'email'):
-            try:
-                student = Student.objects.get(email=request.user.email)
-                print(f"DEBUG: Found student from request.user: {student.id} - {student.email}")
-                return student
-            except Student.DoesNotExist:
-                pass
-    
-    print("DEBUG: No student found")
-    return None
+from lms.utils.principal import get_current_student
 
 
 class CourseReviewCreateView(APIView):
@@ -3,28 +3,62 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied, NotFound, ValidationError
 from rest_framework import status
+from django.db import IntegrityError, transaction
 from django.db.models import Q
 from django.contrib.contenttypes.models import ContentType
 from lms.models import (
-    Conversation, Message, Teacher, Student, Course, Enrollment, Notification
+    Conversation, Message, Teacher, Student, Course, Enrollment, BroadcastJob
 )
 from lms.permissions import IsTeacher, IsStudent
-from lms.views.teacher_views import get_current_teacher
-from lms.views.student_views import get_current_student
+from lms.utils.principal import get_current_teacher, get_current_student
+from lms.utils.inbox import (
+    participant_states, ensure_participant_states, record_message,
+    mark_conversation_read, count_unread_messages
+)
+from lms.utils.pagination import KeysetPagination, wants_cursor_pagination
+from lms.utils.realtime import publish_message, publish_read
+from lms.utils.broadcast import start_broadcast_job, resume_stale_jobs
 from lms.serializers.message_serializer import (
     ConversationSerializer,
     MessageSerializer,
     CreateMessageSerializer,
     StartPrivateChatSerializer,
-    BroadcastMessageSerializer
+    BroadcastMessageSerializer,
+    BroadcastJobSerializer
 )
 
 
+# Message history page size cap, and cap of one delta sync (?since=)
+MAX_MESSAGE_PAGE_SIZE = 100
+MAX_MESSAGE_DELTA = 500
+
+
+def _int_query_param(request, name, default, minimum, maximum):
+    value = request.query_params.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError({name: 'Must be an integer'})
+    if value < minimum:
+        raise ValidationError({name: f'Must be at least {minimum}'})
+    return value if maximum is None else min(value, maximum)
+
+
+class InboxPagination(KeysetPagination):
+    page_size = 20
+    max_page_size = 100
+
+
 class ConversationsListView(APIView):
     """
     GET /api/messages/conversations/
-    Returns list of conversations for the current user.
+    Returns list of conversations for the current user, most recent first.
     Works for both teacher and student.
+    Served from the user's inbox state rows (one indexed query, no message
+    prefetch). ?pagination=cursor enables keyset pagination ('cursor',
+    'page_size'); otherwise the full list is returned.
     """
     permission_classes = []  # Will check in view
 
@@ -39,25 +73,30 @@ class ConversationsListView(APIView):
                 status=status.HTTP_401_UNAUTHORIZED
             )
 
-        # Get conversations where user is a participant
-        if teacher:
-            conversations = Conversation.objects.filter(
-                participants_teachers=teacher
-            ).distinct()
-        elif student:
-            conversations = Conversation.objects.filter(
-                participants_students=student
-            ).distinct()
-        else:
-            conversations = Conversation.objects.none()
-
-        conversations = conversations.prefetch_related(
-            'participants_teachers',
-            'participants_students',
-            'messages'
-        ).order_by('-updated_at')
+        # One state row per conversation the user participates in
+        states = participant_states(teacher or student).select_related(
+            'conversation__course',
+            'conversation__last_message__sender_content_type'
+        ).prefetch_related(
+            'conversation__participants_teachers',
+            'conversation__participants_students',
+            'conversation__last_message__sender'
+        ).order_by('-last_message_at', '-id')
+
+        paginator = None
+        if wants_cursor_pagination(request):
+            paginator = InboxPagination()
+            states = paginator.paginate_queryset(states, request, view=self)
+
+        conversations = []
+        for state in states:
+            conversation = state.conversation
+            conversation.participant_state = state
+            conversations.append(conversation)
 
         serializer = ConversationSerializer(conversations, many=True, context={'request': request})
+        if paginator is not None:
+            return paginator.get_paginated_response(serializer.data)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -78,28 +117,8 @@ class UnreadCountView(APIView):
                 status=status.HTTP_401_UNAUTHORIZED
             )
 
-        # Get all conversations where user is a participant
-        if teacher:
-            conversations = Conversation.objects.filter(
-                participants_teachers=teacher
-            ).distinct()
-            user_content_type = ContentType.objects.get_for_model(Teacher)
-            user_id = teacher.id
-        else:
-            conversations = Conversation.objects.filter(
-                participants_students=student
-            ).distinct()
-            user_content_type = ContentType.objects.get_for_model(Student)
-            user_id = student.id
-
-        # Count unread messages where sender is not the current user
-        total_unread = Message.objects.filter(
-            conversation__in=conversations,
-            is_read=False
-        ).exclude(
-            sender_content_type=user_content_type,
-            sender_object_id=user_id
-        ).count()
+        # Sum of the per-conversation unread counters
+        total_unread = count_unread_messages(teacher or student)
 
         return Response({
             'unread_total': total_unread
@@ -110,6 +129,19 @@ class ConversationDetailView(APIView):
     """
     GET /api/messages/conversation/<id>/
     Returns messages in a conversation with pagination.
+    Query params (id cursors, no OFFSET):
+    - (none): the newest page_size messages, newest first
+    - before_id: older history, the page_size messages before that id,
+      newest first
+    - after_id: the page_size messages after that id, oldest first
+    - since: delta sync, every message newer than the client's last seen
+      id (up to MAX_MESSAGE_DELTA), oldest first
+    - page_size: default 50, max 100
+    - include_conversation: '1'/'0' to add/skip the conversation header
+      (default: only on the first load, i.e. without a cursor)
+    - page: legacy OFFSET pagination, oldest first (header included)
+    Cursor responses carry 'has_more' plus 'before_id'/'after_id' for
+    the next request in the same direction.
     """
     permission_classes = []  # Will check in view
 
@@ -158,21 +190,67 @@ class ConversationDetailView(APIView):
                 sender_content_type=user_content_type,
                 sender_object_id=user_id
             ).update(is_read=True)
+            if mark_conversation_read(conversation, teacher or student):
+                publish_read(conversation, teacher or student)
+
+        messages = conversation.messages.select_related('sender_content_type').prefetch_related('sender')
+
+        if 'page' in request.query_params:
+            # Legacy: OFFSET pagination, sorted by created_at ascending - oldest first
+            page = _int_query_param(request, 'page', 1, 1, None)
+            page_size = _int_query_param(request, 'page_size', 50, 1, MAX_MESSAGE_PAGE_SIZE)
+            offset = (page - 1) * page_size
+
+            messages = messages.order_by('created_at', 'id')[offset:offset + page_size]
+
+            serializer = MessageSerializer(messages, many=True)
+            return Response({
+                'conversation': ConversationSerializer(conversation, context={'request': request}).data,
+                'messages': serializer.data,
+                'page': page,
+                'page_size': page_size
+            }, status=status.HTTP_200_OK)
+
+        page_size = _int_query_param(request, 'page_size', 50, 1, MAX_MESSAGE_PAGE_SIZE)
+        before_id = _int_query_param(request, 'before_id', None, 0, None)
+        after_id = _int_query_param(request, 'after_id', None, 0, None)
+        since = _int_query_param(request, 'since', None, 0, None)
+
+        # Message ids grow with created_at, so id ranges walk the
+        # (conversation, created_at) index order
+        if since is not None:
+            limit = MAX_MESSAGE_DELTA
+            rows = list(messages.filter(id__gt=since).order_by('id')[:limit + 1])
+        elif after_id is not None:
+            limit = page_size
+            rows = list(messages.filter(id__gt=after_id).order_by('id')[:limit + 1])
+        else:
+            limit = page_size
+            if before_id is not None:
+                messages = messages.filter(id__lt=before_id)
+            rows = list(messages.order_by('-id')[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        result = {
+            'messages': MessageSerializer(rows, many=True).data,
+            'has_more': has_more,
+        }
+        if since is not None or after_id is not None:
+            result['after_id'] = rows[-1].id if rows else (since if since is not None else after_id)
+        else:
+            result['before_id'] = rows[-1].id if rows and has_more else None
 
-        # Get messages with pagination (sorted by created_at ascending - oldest first)
-        page = int(request.query_params.get('page', 1))
-        page_size = int(request.query_params.get('page_size', 50))
-        offset = (page - 1) * page_size
-
-        messages = conversation.messages.all().order_by('created_at')[offset:offset + page_size]
+        first_load = since is None and after_id is None and before_id is None
+        include_conversation = request.query_params.get('include_conversation')
+        if include_conversation is None:
+            include_conversation = first_load
+        else:
+            include_conversation = include_conversation.lower() in ('1', 'true', 'yes')
+        if include_conversation:
+            result['conversation'] = ConversationSerializer(conversation, context={'request': request}).data
 
-        serializer = MessageSerializer(messages, many=True)
-        return Response({
-            'conversation': ConversationSerializer(conversation, context={'request': request}).data,
-            'messages': serializer.data,
-            'page': page,
-            'page_size': page_size
-        }, status=status.HTTP_200_OK)
+        return Response(result, status=status.HTTP_200_OK)
 
 
 class SendMessageView(APIView):
@@ -220,22 +298,23 @@ class SendMessageView(APIView):
         sender = teacher or student
         sender_content_type = ContentType.objects.get_for_model(type(sender))
 
-        message = Message.objects.create(
-            conversation=conversation,
-            sender_content_type=sender_content_type,
-            sender_object_id=sender.id,
-            content=content,
-            is_read=False  # New messages are unread by default
-        )
+        with transaction.atomic():
+            # Marked as read for the sender (they sent it, so they've seen it);
+            # recipients' unread state lives in their inbox counters
+            message = Message.objects.create(
+                conversation=conversation,
+                sender_content_type=sender_content_type,
+                sender_object_id=sender.id,
+                content=content,
+                is_read=True
+            )
 
-        # Mark message as read for the sender (they sent it, so they've seen it)
-        message.is_read = True
-        message.save()
+            # Last message, recipients' unread counters, conversation's updated_at
+            record_message(conversation, message, sender)
 
-        # Update conversation's updated_at
-        conversation.save()
+            serializer = MessageSerializer(message)
+            publish_message(conversation, serializer.data, sender)
 
-        serializer = MessageSerializer(message)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
@@ -341,26 +420,40 @@ class StartPrivateChatView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Check if conversation already exists
-        # Find conversations that have both this teacher and this student
-        all_private_conversations = Conversation.objects.filter(is_group=False)
-        
-        conversation = None
-        for conv in all_private_conversations:
-            has_teacher = conv.participants_teachers.filter(id=teacher_participant.id).exists()
-            has_student = conv.participants_students.filter(id=student_participant.id).exists()
-            if has_teacher and has_student:
-                conversation = conv
-                break
-
+        # Find or create the chat by its unique (teacher, student) pair key.
+        # The row, its participants and inbox states are written in one
+        # transaction, so a keyed chat never exists without participants.
+        # A concurrent create waits on the unique key and fails once the
+        # winner commits; the winner is then read outside any transaction
+        # (a fresh snapshot on MySQL repeatable read).
         created = False
-        if not conversation:
-            # Create new conversation
-            conversation = Conversation.objects.create(is_group=False)
-            conversation.participants_teachers.add(teacher_participant)
-            conversation.participants_students.add(student_participant)
-            conversation.save()
-            created = True
+        conversation = Conversation.objects.filter(
+            private_teacher=teacher_participant,
+            private_student=student_participant
+        ).first()
+        if conversation is None:
+            try:
+                with transaction.atomic():
+                    conversation = Conversation.objects.create(
+                        private_teacher=teacher_participant,
+                        private_student=student_participant,
+                        is_group=False
+                    )
+                    conversation.participants_teachers.add(teacher_participant)
+                    conversation.participants_students.add(student_participant)
+                    ensure_participant_states(
+                        conversation,
+                        teacher_ids=[teacher_participant.id],
+                        student_ids=[student_participant.id]
+                    )
+                created = True
+            except IntegrityError:
+                conversation = Conversation.objects.get(
+                    private_teacher=teacher_participant,
+                    private_student=student_participant
+                )
+
+        if created:
             logger.info(f"Created new conversation {conversation.id} between teacher {teacher_participant.id} and student {student_participant.id}")
         else:
             logger.info(f"Found existing conversation {conversation.id}")
@@ -378,6 +471,9 @@ class BroadcastMessageView(APIView):
     """
     POST /api/messages/broadcast/
     Teacher sends a broadcast message to all students in a course.
+    Returns the message and its 'broadcast_job': courses of at most
+    BROADCAST_INLINE_LIMIT students are fanned out before the response,
+    larger ones in the background (poll GET /api/messages/broadcast/<job_id>/).
     """
     permission_classes = [IsTeacher]
 
@@ -398,6 +494,9 @@ class BroadcastMessageView(APIView):
         except Course.DoesNotExist:
             raise NotFound("Course not found or you don't have permission")
 
+        # Restart earlier fan-outs of this teacher whose worker died
+        resume_stale_jobs(BroadcastJob.objects.filter(teacher=teacher))
+
         # Get or create group conversation for this course
         conversation, created = Conversation.objects.get_or_create(
             course=course,
@@ -408,46 +507,61 @@ class BroadcastMessageView(APIView):
         if created:
             # Add teacher as participant
             conversation.participants_teachers.add(teacher)
-            # Add all enrolled students
-            enrollments = Enrollment.objects.filter(course=course)
-            for enrollment in enrollments:
-                conversation.participants_students.add(enrollment.student)
-        else:
-            # Ensure all current enrolled students are participants
-            enrollments = Enrollment.objects.filter(course=course)
-            for enrollment in enrollments:
-                conversation.participants_students.add(enrollment.student)
+        ensure_participant_states(conversation, teacher_ids=[teacher.id])
 
-        # Create message
+        # Create message; enrolled students are added to the conversation
+        # and notified by the broadcast job (background for large courses)
         teacher_content_type = ContentType.objects.get_for_model(Teacher)
-        message = Message.objects.create(
-            conversation=conversation,
-            sender_content_type=teacher_content_type,
-            sender_object_id=teacher.id,
-            content=content,
-            is_read=False  # Mark as unread for all students
-        )
-
-        # Mark message as unread for all students in the course
-        # (Teacher's message is automatically read for teacher)
-        student_content_type = ContentType.objects.get_for_model(Student)
-        enrollments = Enrollment.objects.filter(course=course)
-        
-        # Create Notification for each enrolled student
-        for enrollment in enrollments:
-            Notification.objects.create(
-                student=enrollment.student,
+        with transaction.atomic():
+            message = Message.objects.create(
+                conversation=conversation,
+                sender_content_type=teacher_content_type,
+                sender_object_id=teacher.id,
+                content=content,
+                is_read=False  # Mark as unread for all students
+            )
+            record_message(conversation, message, teacher)
+            job = BroadcastJob.objects.create(
+                teacher=teacher,
                 course=course,
-                title=f"Thông báo từ khóa học {course.title}",
-                message=content,
-                is_read=False
+                conversation=conversation,
+                message=message,
+                total_recipients=Enrollment.objects.filter(course=course).count()
             )
-
-        # Update conversation
-        conversation.save()
+            start_broadcast_job(job)
 
         serializer = MessageSerializer(message)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        publish_message(conversation, serializer.data, teacher)
+
+        job.refresh_from_db()
+        data = dict(serializer.data)
+        data['broadcast_job'] = BroadcastJobSerializer(job).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class BroadcastJobStatusView(APIView):
+    """
+    GET /api/messages/broadcast/<job_id>/
+    Progress of a broadcast fan-out (participants and notifications) for
+    the teacher who sent it.
+    """
+    permission_classes = [IsTeacher]
+
+    def get(self, request, job_id):
+        teacher = get_current_teacher(request)
+        if not teacher:
+            raise PermissionDenied("Teacher not found")
+
+        try:
+            job = BroadcastJob.objects.get(id=job_id, teacher=teacher)
+        except BroadcastJob.DoesNotExist:
+            raise NotFound("Broadcast not found")
+
+        # Restart the fan-out if its worker died
+        if job.status in ('pending', 'running') and resume_stale_jobs(BroadcastJob.objects.filter(id=job.id)):
+            job.refresh_from_db()
+
+        return Response(BroadcastJobSerializer(job).data, status=status.HTTP_200_OK)
 
 
 class MarkMessagesReadView(APIView):
@@ -505,7 +619,7 @@ class MarkMessagesReadView(APIView):
             user_id = student.id
 
         # Mark all unread messages from other participants as read
-        unread_cleared = Message.objects.filter(
+        Message.objects.filter(
             conversation=conversation,
             is_read=False
         ).exclude(
@@ -513,18 +627,14 @@ class MarkMessagesReadView(APIView):
             sender_object_id=user_id
         ).update(is_read=True)
 
-        # Get updated unread count for this conversation (should be 0 after marking)
-        unread_count = Message.objects.filter(
-            conversation=conversation,
-            is_read=False
-        ).exclude(
-            sender_content_type=user_content_type,
-            sender_object_id=user_id
-        ).count()
+        # Reset the user's unread counter for this conversation
+        unread_cleared = mark_conversation_read(conversation, teacher or student)
+        if unread_cleared:
+            publish_read(conversation, teacher or student)
 
         return Response({
             'success': True,
             'unread_cleared': unread_cleared,
-            'unread_count': unread_count
+            'unread_count': 0
         }, status=status.HTTP_200_OK)
 
@@ -4,7 +4,7 @@ from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied, NotFound
 from lms.models import Notification, Student
 from lms.permissions import IsStudent
-from lms.views.student_views import get_current_student
+from lms.utils.principal import get_current_student
 from lms.serializers.notification_serializer import (
     NotificationSerializer, MarkNotificationReadSerializer
 )
@@ -3,33 +3,13 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.exceptions import NotFound, ValidationError, PermissionDenied
 from django.db import transaction
-from lms.models import Order, Course, Enrollment, Student
+from lms.models import Order, Course, Enrollment
 from lms.serializers.order_serializer import (
     OrderSerializer, CreateOrderSerializer, FakeConfirmSerializer
 )
 from lms.permissions import IsStudent
-
-
-def get_current_student(request):
-    """
-    Helper function to get the current student from the request.
-    """
-    if hasattr(request, 'auth') and request.auth:
-        student_id = request.auth.get('student_id')
-        if student_id:
-            try:
-                return Student.objects.get(id=student_id)
-            except Student.DoesNotExist:
-                pass
-        
-        email = request.auth.get('email')
-        if email:
-            try:
-                return Student.objects.get(email=email)
-            except Student.DoesNotExist:
-                pass
-    
-    return None
+from lms.utils.principal import get_current_student
+from lms.utils.analytics_rollup import record_paid_order
 
 
 class CreateOrderView(APIView):
@@ -130,7 +110,8 @@ class FakeConfirmPaymentView(APIView):
         order_id = serializer.validated_data['order_id']
 
         try:
-            order = Order.objects.get(id=order_id)
+            # Lock the row so concurrent confirms roll the order up only once
+            order = Order.objects.select_for_update().get(id=order_id)
         except Order.DoesNotExist:
             return Response(
                 {'error': 'Order not found'},
@@ -156,6 +137,7 @@ class FakeConfirmPaymentView(APIView):
         order.payment_status = 'paid'
         order.transaction_id = f"MOCK_{order.id}_{order.created_at.timestamp()}"
         order.save()
+        record_paid_order(order)
 
         # Create enrollment if not exists
         enrollment, created = Enrollment.objects.get_or_create(
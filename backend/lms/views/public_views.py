@@ -5,8 +5,11 @@ from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
 from django.db.models import Count, Q
 from lms.models import Category, Course, Teacher
-from lms.serializers import CategorySerializer, CourseSerializer
+from lms.serializers import CategorySerializer, CourseSerializer, CourseCardSerializer
 from lms.serializers.teacher_public_serializer import TeacherPublicSerializer
+from lms.utils.course_outline import serialize_course_with_outline
+from lms.utils.pagination import KeysetPagination, wants_cursor_pagination
+from lms.views.search_views import COURSE_SORT_ORDERINGS
 
 
 class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
@@ -24,21 +27,48 @@ class CourseViewSet(viewsets.ReadOnlyModelViewSet):
     """
     Public read-only viewset for courses.
     GET /api/courses/ - list all courses (basic info)
+        ?sort=newest|rating|popular|price_low|price_high
+        ?pagination=cursor for keyset pagination (see KeysetPagination)
     GET /api/courses/<id>/ - retrieve course with full nested structure
     GET /api/courses/<id>/content/ - get full nested content
     """
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
     permission_classes = [AllowAny]
+
+    def get_queryset(self):
+        """
+        List requests only need card data: join teacher and category once
+        and never load the curriculum.
+        """
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            sort_by = self.request.query_params.get('sort', 'newest')
+            queryset = CourseCardSerializer.setup_eager_loading(queryset).order_by(
+                *COURSE_SORT_ORDERINGS.get(sort_by, COURSE_SORT_ORDERINGS['newest'])
+            )
+        elif self.action in ('retrieve', 'content'):
+            queryset = queryset.select_related('teacher', 'category')
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return CourseCardSerializer
+        return super().get_serializer_class()
     
     def list(self, request, *args, **kwargs):
         """
         List courses with basic info (no heavy nesting).
         """
         queryset = self.filter_queryset(self.get_queryset())
+
+        if wants_cursor_pagination(request):
+            paginator = KeysetPagination()
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            serializer = self.get_serializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
         
-        # Use a simplified serializer for list view
-        # We'll use the full serializer but the nested fields are read-only anyway
+        # Card serializer: teacher/category only, no sections or quizzes
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -50,10 +80,10 @@ class CourseViewSet(viewsets.ReadOnlyModelViewSet):
     def retrieve(self, request, *args, **kwargs):
         """
         Retrieve a single course with full nested structure.
+        The curriculum tree comes from the cached course outline.
         """
         instance = self.get_object()
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        return Response(serialize_course_with_outline(instance, request))
     
     @action(detail=True, methods=['get'], url_path='content')
     def content(self, request, pk=None):
@@ -62,8 +92,7 @@ class CourseViewSet(viewsets.ReadOnlyModelViewSet):
         GET /api/courses/<id>/content/
         """
         course = self.get_object()
-        serializer = self.get_serializer(course)
-        return Response(serializer.data)
+        return Response(serialize_course_with_outline(course, request))
 
 
 class TeacherPublicViewSet(viewsets.ReadOnlyModelViewSet):
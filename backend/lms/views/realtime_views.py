@@ -0,0 +1,154 @@
+import json
+import time
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.exceptions import ValidationError
+from lms.models import Notification, Student
+from lms.utils.principal import get_current_teacher, get_current_student
+from lms.utils.custom_jwt_auth import CustomJWTAuthentication, QueryParamJWTAuthentication
+from lms.utils.event_bus import get_event_bus
+from lms.utils.inbox import count_unread_messages
+from lms.utils.realtime import user_channel
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets DRF content negotiation accept 'text/event-stream' (errors are JSON)"""
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode('utf-8') if data is not None else b''
+
+
+def _current_user(request):
+    return get_current_teacher(request) or get_current_student(request)
+
+
+def _parse_cursor(value):
+    if value in (None, ''):
+        return None
+    try:
+        cursor = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError({'cursor': 'Must be an integer'})
+    if cursor < 0:
+        raise ValidationError({'cursor': 'Must not be negative'})
+    return cursor
+
+
+def _snapshot(user, cursor):
+    """Event sent on a fresh connection: current unread totals"""
+    data = {'unread_messages': count_unread_messages(user)}
+    if isinstance(user, Student):
+        data['unread_notifications'] = Notification.objects.filter(student=user, is_read=False).count()
+    return {'id': cursor, 'type': 'snapshot', 'data': data}
+
+
+class MessageEventsPollView(APIView):
+    """
+    GET /api/messages/events/?cursor=<cursor>&timeout=<seconds>
+    Long-poll for new messages, read receipts and notifications of the
+    current user (teacher or student).
+    Without a cursor, answers at once with a 'snapshot' event (unread
+    totals) and the cursor to poll from. With a cursor, holds the request
+    until an event arrives or the timeout passes (at most
+    REALTIME_LONG_POLL_TIMEOUT seconds), then returns
+    { "events": [...], "cursor": <next cursor> }.
+    """
+    permission_classes = []  # Will check in view
+
+    def get(self, request):
+        user = _current_user(request)
+        if not user:
+            return Response(
+                {'error': 'Authentication required'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        bus = get_event_bus()
+        cursor = _parse_cursor(request.query_params.get('cursor'))
+        if cursor is None:
+            cursor = bus.head()
+            return Response({
+                'events': [_snapshot(user, cursor)],
+                'cursor': cursor
+            }, status=status.HTTP_200_OK)
+
+        max_timeout = getattr(settings, 'REALTIME_LONG_POLL_TIMEOUT', 25)
+        try:
+            timeout = float(request.query_params.get('timeout', max_timeout))
+        except (TypeError, ValueError):
+            raise ValidationError({'timeout': 'Must be a number'})
+        timeout = min(max(timeout, 0), max_timeout)
+
+        events, cursor = bus.wait([user_channel(user)], cursor, timeout)
+        return Response({
+            'events': events,
+            'cursor': cursor
+        }, status=status.HTTP_200_OK)
+
+
+class MessageEventStreamView(APIView):
+    """
+    GET /api/messages/stream/?token=<access token>
+    Server-sent events stream of the events of MessageEventsPollView.
+    Every event carries its cursor as the SSE id, so a reconnecting
+    EventSource resumes from Last-Event-ID (or ?cursor=). A fresh
+    connection starts with a 'snapshot' event. The server sends keep-alive
+    comments and closes the stream after REALTIME_STREAM_DURATION seconds;
+    EventSource reconnects on its own.
+    """
+    permission_classes = []  # Will check in view
+    authentication_classes = [CustomJWTAuthentication, QueryParamJWTAuthentication]
+    renderer_classes = [EventStreamRenderer, JSONRenderer]
+
+    def get(self, request):
+        user = _current_user(request)
+        if not user:
+            return Response(
+                {'error': 'Authentication required'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        bus = get_event_bus()
+        cursor = _parse_cursor(request.META.get('HTTP_LAST_EVENT_ID') or request.query_params.get('cursor'))
+        first_events = []
+        if cursor is None:
+            cursor = bus.head()
+            first_events.append(_snapshot(user, cursor))
+
+        response = StreamingHttpResponse(
+            self._stream([user_channel(user)], cursor, first_events),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+        return response
+
+    @staticmethod
+    def _format(event):
+        return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+    def _stream(self, channels, cursor, first_events):
+        bus = get_event_bus()
+        heartbeat = getattr(settings, 'REALTIME_HEARTBEAT_INTERVAL', 15)
+        deadline = time.monotonic() + getattr(settings, 'REALTIME_STREAM_DURATION', 300)
+
+        yield 'retry: 3000\n\n'
+        for event in first_events:
+            yield self._format(event)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            events, cursor = bus.wait(channels, cursor, min(heartbeat, remaining))
+            if events:
+                for event in events:
+                    yield self._format(event)
+            else:
+                yield ': keep-alive\n\n'
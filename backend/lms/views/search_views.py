@@ -1,10 +1,29 @@
+from collections import namedtuple
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
-from django.db.models import Q, Count
-from lms.models import Course, Category, Enrollment, Student
-from lms.serializers.course_serializer import CourseSerializer
+from django.conf import settings
+from django.db.models import Count, Sum
+from lms.models import Course, Category, Enrollment
+from lms.serializers.course_card_serializer import CourseCardSerializer
+from lms.utils.search_index import get_search_backend
+from lms.utils.pagination import KeysetPagination, wants_cursor_pagination
+from lms.utils.course_facets import compute_course_facets
+
+# Catalog sort options; each ends on id so keyset cursors are exact
+COURSE_SORT_ORDERINGS = {
+    'newest': ('-created_at', '-id'),
+    'rating': ('-average_rating', '-total_reviews', '-id'),
+    'popular': ('-total_enrollments', '-views', '-id'),
+    'price_low': ('price', 'id'),
+    'price_high': ('-price', '-id'),
+}
+
+# Search hits ranked in memory by the backend's scores (at most
+# COURSE_SEARCH_MAX_RESULTS of them)
+SearchHit = namedtuple('SearchHit', ['id', 'relevance'])
+RELEVANCE_ORDERING = [('relevance', True), ('id', True)]
 
 
 class CourseSearchPagination(PageNumberPagination):
@@ -18,32 +37,45 @@ class SearchCoursesView(APIView):
     Search courses with filters and sorting.
     GET /api/search/
     Query params:
-    - q: search keyword
+    - q: search keywords (full-text, prefix matching on title, description,
+      teacher name and category)
     - category: category ID
     - price: 'free' or 'paid'
     - level: 'Beginner', 'Intermediate', 'Advanced'
-    - sort: 'newest', 'rating', 'popular', 'price_low', 'price_high'
+    - sort: 'relevance', 'newest', 'rating', 'popular', 'price_low', 'price_high'
+      (defaults to 'relevance' when q is given, 'newest' otherwise)
     - page: page number
+    - pagination: 'cursor' for keyset pagination (then 'cursor', 'page_size',
+      and optional 'count=estimate|exact' apply instead of 'page')
+    - facets: '1' to include per category/level/price counts for the query;
+      each facet ignores its own filter but honours the others
     """
     pagination_class = CourseSearchPagination
 
     def get(self, request):
-        queryset = Course.objects.all().select_related('teacher', 'category').prefetch_related('enrollments')
+        queryset = CourseCardSerializer.setup_eager_loading(Course.objects.all())
 
         # Search keyword
         q = request.query_params.get('q', '').strip()
+        scores = None
         if q:
-            queryset = queryset.filter(
-                Q(title__icontains=q) | Q(description__icontains=q)
+            ranked = get_search_backend().search(
+                q, limit=getattr(settings, 'COURSE_SEARCH_MAX_RESULTS', 1000)
             )
+            scores = dict(ranked)
+            queryset = queryset.filter(id__in=list(scores))
+        matched = queryset
 
         # Category filter
         category_id = request.query_params.get('category')
         if category_id:
             try:
-                queryset = queryset.filter(category_id=int(category_id))
+                category_id = int(category_id)
+                queryset = queryset.filter(category_id=category_id)
             except ValueError:
-                pass
+                category_id = None
+        else:
+            category_id = None
 
         # Price filter
         price_filter = request.query_params.get('price')
@@ -56,74 +88,104 @@ class SearchCoursesView(APIView):
         level = request.query_params.get('level')
         if level and level in ['Beginner', 'Intermediate', 'Advanced']:
             queryset = queryset.filter(level=level)
+        else:
+            level = None
 
-        # Sorting
-        sort_by = request.query_params.get('sort', 'newest')
-        if sort_by == 'newest':
-            queryset = queryset.order_by('-created_at')
-        elif sort_by == 'rating':
-            queryset = queryset.order_by('-average_rating', '-total_reviews')
-        elif sort_by == 'popular':
-            queryset = queryset.order_by('-total_enrollments', '-views')
-        elif sort_by == 'price_low':
-            queryset = queryset.order_by('price')
-        elif sort_by == 'price_high':
-            queryset = queryset.order_by('-price')
-
-        # Pagination
-        paginator = self.pagination_class()
-        page = paginator.paginate_queryset(queryset, request)
+        # Sorting (every ordering ends on id so ties are stable across pages)
+        sort_by = request.query_params.get('sort', 'relevance' if scores is not None else 'newest')
+        if sort_by == 'relevance' and scores is not None:
+            paginator, page = self._paginate_by_relevance(request, queryset, scores)
+        else:
+            queryset = queryset.order_by(
+                *COURSE_SORT_ORDERINGS.get(sort_by, COURSE_SORT_ORDERINGS['newest'])
+            )
+            # Pagination
+            if wants_cursor_pagination(request):
+                paginator = KeysetPagination()
+            else:
+                paginator = self.pagination_class()
+            page = paginator.paginate_queryset(queryset, request)
         
         if page is not None:
-            serializer = CourseSerializer(page, many=True)
-            return paginator.get_paginated_response(serializer.data)
+            serializer = CourseCardSerializer(page, many=True)
+            response = paginator.get_paginated_response(serializer.data)
+        else:
+            serializer = CourseCardSerializer(queryset, many=True)
+            response = Response(serializer.data, status=status.HTTP_200_OK)
 
-        serializer = CourseSerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        if request.query_params.get('facets') in ('1', 'true') and isinstance(response.data, dict):
+            response.data['facets'] = compute_course_facets(
+                matched, q=q, category_id=category_id, level=level,
+                price=price_filter if price_filter in ('free', 'paid') else None
+            )
+        return response
+
+    def _paginate_by_relevance(self, request, queryset, scores):
+        """
+        Rank the filtered hits by the backend's scores in memory and load
+        only the courses of the requested page. Returns (paginator, courses).
+        """
+        hits = sorted(
+            (SearchHit(course_id, scores[course_id]) for course_id in queryset.values_list('id', flat=True)),
+            key=lambda hit: (-hit.relevance, -hit.id)
+        )
+        if wants_cursor_pagination(request):
+            paginator = KeysetPagination()
+            page = paginator.paginate_sorted_list(hits, RELEVANCE_ORDERING, Course, request)
+        else:
+            paginator = self.pagination_class()
+            page = paginator.paginate_queryset(hits, request)
+
+        courses = queryset.in_bulk([hit.id for hit in page])
+        return paginator, [courses[hit.id] for hit in page if hit.id in courses]
 
 
 class RecommendCoursesView(APIView):
     """
     Get recommended courses for the current user.
     GET /api/courses/recommend/
+    Students get the precomputed co-enrollment neighbours of their courses
+    (see build_course_similarity), topped up with popular courses; everyone
+    else gets popular courses.
     """
+    limit = 6
+
     def get(self, request):
-        student = None
-        
-        # Try to get current student if authenticated
+        student_id = None
         if hasattr(request, 'auth') and request.auth:
             student_id = request.auth.get('student_id')
-            if student_id:
-                try:
-                    student = Student.objects.get(id=student_id)
-                except Student.DoesNotExist:
-                    pass
-
-        if student:
-            # Get student's enrolled courses
-            enrolled_courses = Enrollment.objects.filter(student=student).values_list('course_id', flat=True)
-            
-            if enrolled_courses:
-                # Get categories of enrolled courses
-                enrolled_categories = Course.objects.filter(id__in=enrolled_courses).values_list('category_id', flat=True).distinct()
-                
-                # Recommend courses in same categories (exclude already enrolled)
-                recommended = Course.objects.filter(
-                    category_id__in=enrolled_categories
+
+        courses = CourseCardSerializer.setup_eager_loading(Course.objects.all())
+        popular_order = ('-total_enrollments', '-average_rating', '-views', '-id')
+
+        recommended = []
+        if student_id:
+            enrolled_courses = Enrollment.objects.filter(student_id=student_id).values('course_id')
+
+            # Neighbours of all enrolled courses, scores summed, in one joined query
+            recommended = list(
+                courses.filter(
+                    similar_to__course_id__in=enrolled_courses
                 ).exclude(
                     id__in=enrolled_courses
-                ).order_by('-average_rating', '-total_enrollments')[:6]
-            else:
-                # No enrollments yet, recommend popular courses
-                recommended = Course.objects.order_by('-total_enrollments', '-average_rating', '-views')[:6]
+                ).annotate(
+                    recommendation_score=Sum('similar_to__score')
+                ).order_by('-recommendation_score', *popular_order)[:self.limit]
+            )
+
+            if len(recommended) < self.limit:
+                # Cold start or few neighbours: fill with popular courses
+                recommended += list(
+                    courses.exclude(id__in=enrolled_courses).exclude(
+                        id__in=[course.id for course in recommended]
+                    ).order_by(*popular_order)[:self.limit - len(recommended)]
+                )
         else:
             # Not logged in or not a student, recommend popular courses
-            recommended = Course.objects.order_by('-total_enrollments', '-average_rating', '-views')[:6]
+            recommended = list(courses.order_by(*popular_order)[:self.limit])
 
-        serializer = CourseSerializer(recommended, many=True)
+        serializer = CourseCardSerializer(recommended, many=True)
         return Response({
             'results': serializer.data,
             'count': len(serializer.data)
         }, status=status.HTTP_200_OK)
-
-
@@ -5,48 +5,24 @@ from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied, NotFound
 from rest_framework.views import APIView
 from django.db.models import Q
+from django.utils.http import parse_etags
 from lms.models import (
-    Student, Course, Enrollment, Quiz, Question, Option, QuizAttempt,
-    Lesson, StudentProgress, StudentCourseProgress
+    Course, Enrollment, Quiz, QuizAttempt, Lesson
 )
 from lms.serializers import (
     EnrollmentSerializer, CourseSerializer, QuizSerializer,
     QuizAttemptSerializer, StudentProgressSerializer
 )
+from lms.serializers.student_progress_serializer import LessonProgressBatchSerializer
 from lms.permissions import IsStudent
-
-
-def get_current_student(request):
-    """
-    Helper function to get the current student from the request.
-    Assumes JWT token contains student_id or email.
-    """
-    if hasattr(request, 'auth') and request.auth:
-        # Try to get student_id from token
-        student_id = request.auth.get('student_id')
-        if student_id:
-            try:
-                return Student.objects.get(id=student_id)
-            except Student.DoesNotExist:
-                pass
-        
-        # Try to get email from token
-        email = request.auth.get('email')
-        if email:
-            try:
-                return Student.objects.get(email=email)
-            except Student.DoesNotExist:
-                pass
-    
-    # Fallback: try to get from user if available
-    if hasattr(request, 'user') and request.user and request.user.is_authenticated:
-        if hasattr(request.user, 'email'):
-            try:
-                return Student.objects.get(email=request.user.email)
-            except Student.DoesNotExist:
-                pass
-    
-    return None
+from lms.utils.principal import get_current_student
+from lms.utils.course_outline import serialize_course_with_outline
+from lms.utils.course_progress import overlay_student_progress, apply_lesson_progress
+from lms.utils.progress_buffer import progress_buffer
+from lms.utils.quiz_analysis import pack_option_ids
+from lms.utils.quiz_cache import (
+    get_quiz_answer_key, grade_quiz_answers, get_student_quiz_payload, quiz_etag
+)
 
 
 class EnrollmentView(APIView):
@@ -117,7 +93,8 @@ class StudentCourseContentView(APIView):
     """
     Get course content (only if student is enrolled).
     GET /api/student/courses/<course_id>/content/
-    Returns course with progress info for each lesson.
+    Returns course with progress info for each lesson, and completion
+    rollups per section and for the whole course.
     """
     permission_classes = [IsStudent]  # IsStudent already checks authentication
     
@@ -130,7 +107,7 @@ class StudentCourseContentView(APIView):
             raise PermissionDenied("Student not found")
         
         try:
-            course = Course.objects.get(id=course_id)
+            course = Course.objects.select_related('teacher', 'category').get(id=course_id)
         except Course.DoesNotExist:
             return Response(
                 {'error': 'Course not found'},
@@ -145,28 +122,11 @@ class StudentCourseContentView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Get course data with sections and lessons
-        course_data = CourseSerializer(course).data
-        
-        # Add progress info to each lesson
-        for section_data in course_data.get('sections', []):
-            for lesson_data in section_data.get('lessons', []):
-                lesson_id = lesson_data['id']
-                progress = StudentProgress.objects.filter(
-                    student=student,
-                    lesson_id=lesson_id
-                ).first()
-                
-                if progress:
-                    lesson_data['progress'] = {
-                        'watched_seconds': progress.watched_seconds,
-                        'completed': progress.completed
-                    }
-                else:
-                    lesson_data['progress'] = {
-                        'watched_seconds': 0,
-                        'completed': False
-                    }
+        # Get course data with sections and lessons (from the cached outline)
+        course_data = serialize_course_with_outline(course)
+        
+        # Add progress info to each lesson, plus section and course rollups
+        overlay_student_progress(course_data, student)
         
         # Add enrollment completion status
         course_data['enrollment_completed'] = enrollment.completed
@@ -178,6 +138,7 @@ class StudentQuizDetailView(APIView):
     """
     Get quiz details for a student (without is_correct flags).
     GET /api/student/quiz/<quiz_id>/
+    Sends an ETag; If-None-Match with the current one returns 304.
     """
     permission_classes = [IsStudent]  # IsStudent already checks authentication
     
@@ -198,44 +159,22 @@ class StudentQuizDetailView(APIView):
             )
         
         # Check if student is enrolled in the course
-        if not Enrollment.objects.filter(student=student, course=quiz.course).exists():
+        if not Enrollment.objects.filter(student=student, course_id=quiz.course_id).exists():
             return Response(
                 {'error': 'You are not enrolled in this course'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Get quiz data
-        quiz_data = {
-            'id': quiz.id,
-            'title': quiz.title,
-            'description': quiz.description,
-            'pass_mark': quiz.pass_mark,
-            'created_at': quiz.created_at,
-            'questions': []
-        }
-        
-        # Get questions with options (without is_correct)
-        questions = Question.objects.filter(quiz=quiz).order_by('order', 'id')
-        for question in questions:
-            question_data = {
-                'id': question.id,
-                'question_text': question.question_text,
-                'order': question.order,
-                'options': []
-            }
-            
-            options = Option.objects.filter(question=question).order_by('id')
-            for option in options:
-                option_data = {
-                    'id': option.id,
-                    'option_text': option.option_text,
-                    # is_correct is intentionally excluded
-                }
-                question_data['options'].append(option_data)
-            
-            quiz_data['questions'].append(question_data)
-        
-        return Response(quiz_data, status=status.HTTP_200_OK)
+        # Clients holding the current version get a 304
+        etag = quiz_etag(quiz)
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and (if_none_match.strip() == '*' or etag in parse_etags(if_none_match)):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            # Redacted payload (no is_correct), cached per quiz version
+            response = Response(get_student_quiz_payload(quiz), status=status.HTTP_200_OK)
+        response['ETag'] = etag
+        return response
 
 
 class StudentQuizSubmitView(APIView):
@@ -263,22 +202,22 @@ class StudentQuizSubmitView(APIView):
             )
         
         # Check if student is enrolled in the course
-        if not Enrollment.objects.filter(student=student, course=quiz.course).exists():
+        if not Enrollment.objects.filter(student=student, course_id=quiz.course_id).exists():
             return Response(
                 {'error': 'You are not enrolled in this course'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
         answers = request.data.get('answers', {})
-        if not answers:
+        if not answers or not isinstance(answers, dict):
             return Response(
                 {'error': 'Answers are required'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Get all questions for this quiz
-        questions = Question.objects.filter(quiz=quiz)
-        total_questions = questions.count()
+        # Compiled answer key (cached per quiz content version)
+        answer_key = get_quiz_answer_key(quiz)
+        total_questions = len(answer_key['question_ids'])
         
         if total_questions == 0:
             return Response(
@@ -286,22 +225,8 @@ class StudentQuizSubmitView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Calculate score
-        correct_count = 0
-        for question in questions:
-            question_id = str(question.id)
-            if question_id in answers:
-                selected_option_id = answers[question_id]
-                try:
-                    selected_option = Option.objects.get(
-                        id=selected_option_id,
-                        question=question
-                    )
-                    if selected_option.is_correct:
-                        correct_count += 1
-                except Option.DoesNotExist:
-                    # Invalid option ID, count as wrong
-                    pass
+        # Calculate score in memory
+        correct_count, selected_option_ids = grade_quiz_answers(answer_key, answers)
         
         # Calculate score percentage
         score = (correct_count / total_questions) * 100
@@ -312,7 +237,8 @@ class StudentQuizSubmitView(APIView):
             student=student,
             quiz=quiz,
             score=score,
-            passed=passed
+            passed=passed,
+            selected_options=pack_option_ids(selected_option_ids)
         )
         
         return Response({
@@ -373,7 +299,7 @@ class StudentLessonProgressView(APIView):
             )
         
         try:
-            lesson = Lesson.objects.get(id=lesson_id)
+            lesson = Lesson.objects.select_related('section__course').get(id=lesson_id)
         except Lesson.DoesNotExist:
             return Response(
                 {'error': 'Lesson not found'},
@@ -381,7 +307,9 @@ class StudentLessonProgressView(APIView):
             )
         
         # Check if student is enrolled in the course
-        if not Enrollment.objects.filter(student=student, course=lesson.section.course).exists():
+        course = lesson.section.course
+        enrollment = Enrollment.objects.filter(student=student, course=course).first()
+        if not enrollment:
             return Response(
                 {'error': 'You are not enrolled in this course'},
                 status=status.HTTP_403_FORBIDDEN
@@ -391,78 +319,85 @@ class StudentLessonProgressView(APIView):
         if lesson.duration_seconds and watched_seconds >= lesson.duration_seconds:
             completed = True
         
-        # Get or create progress
-        progress, created = StudentProgress.objects.get_or_create(
-            student=student,
-            lesson=lesson,
-            defaults={
-                'watched_seconds': watched_seconds,
-                'completed': completed
-            }
+        # Upsert lesson progress and apply only its delta to the course totals
+        progress = apply_lesson_progress(
+            student, lesson, course, enrollment, watched_seconds, completed
         )
         
-        if not created:
-            progress.watched_seconds = watched_seconds
-            progress.completed = completed
-            progress.save()
-        
-        # Recalculate overall course progress
-        course = lesson.section.course
-        all_lessons = Lesson.objects.filter(section__course=course)
-        total_lessons = all_lessons.count()
-        
-        if total_lessons > 0:
-            # Calculate progress for each lesson
-            lesson_progresses = []
-            for lesson_item in all_lessons:
-                try:
-                    lesson_progress = StudentProgress.objects.get(
-                        student=student,
-                        lesson=lesson_item
-                    )
-                    if lesson_item.duration_seconds and lesson_item.duration_seconds > 0:
-                        progress_percent = min(100, (lesson_progress.watched_seconds / lesson_item.duration_seconds) * 100)
-                    else:
-                        progress_percent = 100 if lesson_progress.completed else 0
-                except StudentProgress.DoesNotExist:
-                    progress_percent = 0
-                lesson_progresses.append(progress_percent)
-            
-            # Calculate overall progress as average of all lessons
-            overall_progress = sum(lesson_progresses) / len(lesson_progresses) if lesson_progresses else 0
-            
-            # Update or create StudentCourseProgress
-            course_progress, _ = StudentCourseProgress.objects.get_or_create(
-                student=student,
-                course=course,
-                defaults={'overall_progress': overall_progress}
-            )
-            course_progress.overall_progress = overall_progress
-            course_progress.last_access = timezone.now()
-            course_progress.save()
-            
-            # Check if all lessons are completed
-            completed_lessons = StudentProgress.objects.filter(
-                student=student,
-                lesson__section__course=course,
-                completed=True
-            ).count()
-            
-            # Update enrollment completion status
-            enrollment = Enrollment.objects.get(student=student, course=course)
-            was_completed = enrollment.completed
-            if completed_lessons >= total_lessons:
-                enrollment.completed = True
-                # Issue certificate if course is completed for the first time
-                if not was_completed:
-                    from lms.utils.certificate_utils import issue_certificate
-                    issue_certificate(student, course)
-            else:
-                enrollment.completed = False
-            enrollment.save()
-        
         serializer = StudentProgressSerializer(progress)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-
+class StudentLessonProgressBatchView(APIView):
+    """
+    Ingest many lesson heartbeats in one request.
+    POST /api/student/lesson-progress/batch/
+    Body: { "ticks": [ { "lesson_id": <id>, "watched_seconds": <int>, "completed": <bool> }, ... ] }
+    """
+    permission_classes = [IsStudent]  # IsStudent already checks authentication
+    
+    def post(self, request):
+        """
+        Coalesce ticks per lesson (highest watched position wins) and hand them
+        to the write-behind buffer. Ticks that may complete a lesson are flushed
+        immediately so completion and certificates are not delayed; plain
+        position updates are written in bulk when the buffer is due.
+        """
+        student = get_current_student(request)
+        if not student:
+            raise PermissionDenied("Student not found")
+        
+        serializer = LessonProgressBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        ticks = serializer.validated_data['ticks']
+        coalesced = {}
+        for tick in ticks:
+            lesson_id = tick['lesson_id']
+            watched_seconds, completed = coalesced.get(lesson_id, (0, False))
+            coalesced[lesson_id] = (
+                max(watched_seconds, tick['watched_seconds']),
+                completed or tick['completed']
+            )
+        
+        lessons = {
+            lesson['id']: lesson
+            for lesson in Lesson.objects.filter(id__in=coalesced).values(
+                'id', 'duration_seconds', 'section__course_id'
+            )
+        }
+        missing = set(coalesced) - set(lessons)
+        if missing:
+            return Response(
+                {'error': 'Lesson not found', 'lesson_ids': sorted(missing)},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        # Check if student is enrolled in every course touched by the batch
+        course_ids = {lesson['section__course_id'] for lesson in lessons.values()}
+        enrolled_course_ids = set(Enrollment.objects.filter(
+            student=student,
+            course_id__in=course_ids
+        ).values_list('course_id', flat=True))
+        if course_ids - enrolled_course_ids:
+            return Response(
+                {'error': 'You are not enrolled in this course'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        completing_keys = []
+        for lesson_id, (watched_seconds, completed) in coalesced.items():
+            duration = lessons[lesson_id]['duration_seconds']
+            progress_buffer.add(student.id, lesson_id, watched_seconds, completed)
+            if completed or (duration and watched_seconds >= duration):
+                completing_keys.append((student.id, lesson_id))
+        
+        written = progress_buffer.flush(keys=completing_keys) if completing_keys else 0
+        written += progress_buffer.flush_if_due()
+        
+        return Response({
+            'accepted': len(ticks),
+            'lessons': len(coalesced),
+            'written': written
+        }, status=status.HTTP_202_ACCEPTED)
@@ -3,12 +3,10 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied, NotFound
 from django.db.models import Q, Count
-from django.contrib.contenttypes.models import ContentType
-from lms.models import (
-    Conversation, Message, Teacher, Student, Course, Enrollment
-)
+from lms.models import Course, Enrollment
 from lms.permissions import IsTeacher
-from lms.views.teacher_views import get_current_teacher
+from lms.utils.principal import get_current_teacher
+from lms.utils.inbox import count_unread_messages
 from lms.serializers.message_serializer import ConversationSerializer
 
 
@@ -24,21 +22,8 @@ class TeacherUnreadCountView(APIView):
         if not teacher:
             raise PermissionDenied("Teacher not found")
 
-        # Get all conversations where teacher is a participant
-        conversations = Conversation.objects.filter(
-            participants_teachers=teacher
-        ).distinct()
-
-        # Count unread messages in these conversations
-        # Unread = messages where sender is not the teacher and is_read=False
-        teacher_content_type = ContentType.objects.get_for_model(Teacher)
-        total_unread = Message.objects.filter(
-            conversation__in=conversations,
-            is_read=False
-        ).exclude(
-            sender_content_type=teacher_content_type,
-            sender_object_id=teacher.id
-        ).count()
+        # Sum of the per-conversation unread counters
+        total_unread = count_unread_messages(teacher)
 
         return Response({
             'unread_total': total_unread
@@ -1,7 +1,7 @@
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied, NotFound
+from rest_framework.exceptions import PermissionDenied, NotFound, ValidationError
 from django.db.models import Avg, Count, Q, F
 from django.utils import timezone
 from datetime import timedelta
@@ -9,7 +9,9 @@ from lms.models import (
     Course, Student, StudentProgress, StudentCourseProgress, Lesson, Enrollment
 )
 from lms.permissions import IsTeacher
-from lms.views.teacher_views import get_current_teacher
+from lms.utils.principal import get_current_teacher
+from lms.utils.course_progress import ensure_course_progress_rows
+from lms.utils.pagination import KeysetPagination, wants_cursor_pagination
 from lms.serializers.teacher_progress_serializer import (
     TeacherStudentProgressSerializer,
     StudentDetailProgressSerializer,
@@ -18,10 +20,31 @@ from lms.serializers.teacher_progress_serializer import (
 )
 
 
+# Roster sort options; each ends on id so keyset cursors are exact
+COURSE_ROSTER_ORDERINGS = {
+    'enrolled': ('-enrolled_at', '-id'),
+    'progress': ('-overall_progress', '-id'),
+    'progress_asc': ('overall_progress', 'id'),
+    'last_access': ('-last_access', '-id'),
+    'name': ('student_name', 'id'),
+}
+
+
+class CourseRosterPagination(KeysetPagination):
+    page_size = 50
+    max_page_size = 200
+
+
 class CourseStudentsListView(APIView):
     """
     GET /api/teacher/courses/<course_id>/students/
     Returns list of students enrolled in the course with their overall progress.
+    Query params:
+    - search: matches student name or email
+    - sort: 'enrolled' (default, newest first), 'progress', 'progress_asc',
+      'last_access', 'name'
+    - pagination: 'cursor' for keyset pagination (then 'cursor', 'page_size'
+      and 'count=estimate|exact' apply); otherwise the full list is returned
     """
     permission_classes = [IsTeacher]
 
@@ -35,70 +58,38 @@ class CourseStudentsListView(APIView):
         except Course.DoesNotExist:
             raise NotFound("Course not found")
 
-        # Get all enrollments for this course
-        enrollments = Enrollment.objects.filter(course=course).select_related('student')
-
-        # Get or create StudentCourseProgress for each enrolled student
-        students_data = []
-        for enrollment in enrollments:
-            student = enrollment.student
-            
-            # Get or create course progress
-            course_progress, _ = StudentCourseProgress.objects.get_or_create(
-                student=student,
-                course=course,
-                defaults={'overall_progress': 0.0}
-            )
-            
-            # Recalculate if needed (if progress is 0 and student has watched lessons)
-            if course_progress.overall_progress == 0:
-                self._recalculate_progress(student, course, course_progress)
-            
-            students_data.append(course_progress)
-
-        # Serialize
-        serializer = TeacherStudentProgressSerializer(students_data, many=True)
-        
-        # Add search/filter support
+        # Enrolled students without a progress row yet get one
+        ensure_course_progress_rows(course)
+
+        # Enrollment x progress join, filtered and sorted in the database
+        queryset = StudentCourseProgress.objects.filter(
+            course=course,
+            student__enrollments__course=course
+        ).select_related('student').annotate(
+            enrolled_at=F('student__enrollments__enrolled_at'),
+            student_name=F('student__full_name')
+        )
+
         search_query = request.query_params.get('search', '').strip()
         if search_query:
-            filtered_data = [
-                s for s in serializer.data
-                if search_query.lower() in s['student_name'].lower() or
-                   search_query.lower() in s['student_email'].lower()
-            ]
-            return Response(filtered_data, status=status.HTTP_200_OK)
-
-        return Response(serializer.data, status=status.HTTP_200_OK)
+            queryset = queryset.filter(
+                Q(student__full_name__icontains=search_query) |
+                Q(student__email__icontains=search_query)
+            )
 
-    def _recalculate_progress(self, student, course, course_progress):
-        """Recalculate overall progress for a student in a course"""
-        all_lessons = Lesson.objects.filter(section__course=course)
-        total_lessons = all_lessons.count()
-        
-        if total_lessons == 0:
-            course_progress.overall_progress = 0
-            course_progress.save()
-            return
+        sort = request.query_params.get('sort', 'enrolled')
+        queryset = queryset.order_by(
+            *COURSE_ROSTER_ORDERINGS.get(sort, COURSE_ROSTER_ORDERINGS['enrolled'])
+        )
 
-        lesson_progresses = []
-        for lesson in all_lessons:
-            try:
-                lesson_progress = StudentProgress.objects.get(
-                    student=student,
-                    lesson=lesson
-                )
-                if lesson.duration_seconds and lesson.duration_seconds > 0:
-                    progress_percent = min(100, (lesson_progress.watched_seconds / lesson.duration_seconds) * 100)
-                else:
-                    progress_percent = 100 if lesson_progress.completed else 0
-            except StudentProgress.DoesNotExist:
-                progress_percent = 0
-            lesson_progresses.append(progress_percent)
+        if wants_cursor_pagination(request):
+            paginator = CourseRosterPagination()
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            serializer = TeacherStudentProgressSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
 
-        overall_progress = sum(lesson_progresses) / len(lesson_progresses) if lesson_progresses else 0
-        course_progress.overall_progress = overall_progress
-        course_progress.save()
+        serializer = TeacherStudentProgressSerializer(queryset, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 class StudentDetailProgressView(APIView):
@@ -203,10 +194,40 @@ class StudentDetailProgressView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+# Progress histogram bucket width (percentage points), ?bucket_width=
+DEFAULT_PROGRESS_BUCKET_WIDTH = 25
+MIN_PROGRESS_BUCKET_WIDTH = 5
+# Size of the ranked student preview embedded in the analytics summary, ?top=
+DEFAULT_ANALYTICS_TOP_STUDENTS = 10
+MAX_ANALYTICS_TOP_STUDENTS = 50
+
+
+def _int_param(request, name, default, minimum, maximum):
+    try:
+        value = int(request.query_params.get(name, default))
+    except (TypeError, ValueError):
+        raise ValidationError({name: 'Must be an integer'})
+    return min(max(value, minimum), maximum)
+
+
+def _progress_buckets(width):
+    """[(label, lower, upper)] covering 0-100; the last bucket includes 100"""
+    buckets = []
+    for lower in range(0, 100, width):
+        upper = min(lower + width, 100)
+        buckets.append((f'{lower}-{upper}', lower, upper))
+    return buckets
+
+
 class CourseAnalyticsView(APIView):
     """
     GET /api/teacher/courses/<course_id>/analytics/
     Returns analytics summary for a course.
+    Query params:
+    - bucket_width: progress distribution bucket width in percent (default 25)
+    - top: size of the students_by_progress preview (default 10, max 50);
+      the full ranking is paginated at .../analytics/students/
+    Distribution, average and activity counts come from one aggregate query.
     """
     permission_classes = [IsTeacher]
 
@@ -220,48 +241,91 @@ class CourseAnalyticsView(APIView):
         except Course.DoesNotExist:
             raise NotFound("Course not found")
 
-        # Get all enrollments
-        enrollments = Enrollment.objects.filter(course=course)
-        total_students = enrollments.count()
+        bucket_width = _int_param(
+            request, 'bucket_width', DEFAULT_PROGRESS_BUCKET_WIDTH, MIN_PROGRESS_BUCKET_WIDTH, 100
+        )
+        top = _int_param(request, 'top', DEFAULT_ANALYTICS_TOP_STUDENTS, 0, MAX_ANALYTICS_TOP_STUDENTS)
+        buckets = _progress_buckets(bucket_width)
 
-        # Get all course progress records
-        course_progresses = StudentCourseProgress.objects.filter(course=course)
-        
-        # Calculate average progress
-        avg_progress = course_progresses.aggregate(
-            avg=Avg('overall_progress')
-        )['avg'] or 0.0
+        # Enrollment count is kept on the course by the enrollment signal
+        total_students = course.total_enrollments
 
-        # Calculate active/inactive students (last 7 days)
+        # One pass over the course's progress rows
         seven_days_ago = timezone.now() - timedelta(days=7)
-        active_students = course_progresses.filter(
-            last_access__gte=seven_days_ago
-        ).count()
-        inactive_students = total_students - active_students
-
-        # Get students sorted by progress (descending)
-        students_by_progress = course_progresses.select_related('student').order_by('-overall_progress')
-        students_serializer = TeacherStudentProgressSerializer(students_by_progress, many=True)
+        aggregates = {
+            'avg_progress': Avg('overall_progress'),
+            'active': Count('id', filter=Q(last_access__gte=seven_days_ago)),
+        }
+        for index, (_, lower, upper) in enumerate(buckets):
+            in_bucket = Q(overall_progress__gte=lower)
+            if upper < 100:
+                in_bucket &= Q(overall_progress__lt=upper)
+            else:
+                in_bucket &= Q(overall_progress__lte=upper)
+            aggregates[f'bucket_{index}'] = Count('id', filter=in_bucket)
+        course_progresses = StudentCourseProgress.objects.filter(course=course)
+        stats = course_progresses.aggregate(**aggregates)
 
-        # Calculate progress distribution
+        active_students = stats['active']
+        inactive_students = max(0, total_students - active_students)
         distribution = {
-            '0-25': course_progresses.filter(overall_progress__gte=0, overall_progress__lt=25).count(),
-            '25-50': course_progresses.filter(overall_progress__gte=25, overall_progress__lt=50).count(),
-            '50-75': course_progresses.filter(overall_progress__gte=50, overall_progress__lt=75).count(),
-            '75-100': course_progresses.filter(overall_progress__gte=75, overall_progress__lte=100).count(),
+            label: stats[f'bucket_{index}'] for index, (label, _, _) in enumerate(buckets)
         }
 
+        # Bounded preview of the ranking (index on course, overall_progress)
+        students_by_progress = course_progresses.select_related('student').order_by(
+            '-overall_progress', '-id'
+        )[:top]
+        students_serializer = TeacherStudentProgressSerializer(students_by_progress, many=True)
+
         result = {
             'course_id': course.id,
             'course_title': course.title,
             'total_students': total_students,
-            'avg_course_progress': round(avg_progress, 2),
+            'avg_course_progress': round(stats['avg_progress'] or 0.0, 2),
             'active_students_count': active_students,
             'inactive_students_count': inactive_students,
             'students_by_progress': students_serializer.data,
-            'progress_distribution': distribution
+            'progress_distribution': distribution,
+            'bucket_width': bucket_width
         }
 
         serializer = CourseAnalyticsSerializer(result)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+
+class CourseProgressRankingPagination(KeysetPagination):
+    page_size = 50
+    max_page_size = 200
+
+
+class CourseProgressRankingView(APIView):
+    """
+    GET /api/teacher/courses/<course_id>/analytics/students/
+    Students of a course ranked by overall progress, cursor-paginated.
+    Query params:
+    - order: 'desc' (default, most advanced first) or 'asc'
+    - cursor, page_size, count=estimate|exact (see KeysetPagination)
+    """
+    permission_classes = [IsTeacher]
+
+    def get(self, request, course_id):
+        teacher = get_current_teacher(request)
+        if not teacher:
+            raise PermissionDenied("Teacher not found")
+
+        if not Course.objects.filter(id=course_id, teacher=teacher).exists():
+            raise NotFound("Course not found")
+
+        if request.query_params.get('order') == 'asc':
+            ordering = ('overall_progress', 'id')
+        else:
+            ordering = ('-overall_progress', '-id')
+        queryset = StudentCourseProgress.objects.filter(
+            course_id=course_id
+        ).select_related('student').order_by(*ordering)
+
+        paginator = CourseProgressRankingPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = TeacherStudentProgressSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
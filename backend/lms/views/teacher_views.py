@@ -4,50 +4,31 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied, NotFound, ValidationError
 from django.contrib.auth.hashers import check_password, make_password
+from django.db import transaction
+from django.db.models import F
+from django.http import StreamingHttpResponse
 from lms.models import (
-    Teacher, Course, Section, Lesson, Quiz, Question, Option
+    Course, Section, Lesson, Quiz, Question, Option
 )
 from lms.serializers import (
     CourseSerializer, SectionSerializer, LessonSerializer,
-    QuizSerializer, QuestionSerializer, OptionSerializer
+    QuizSerializer, QuestionSerializer, OptionSerializer, QuizTreeSerializer,
+    SectionReorderSerializer, LessonReorderSerializer
 )
 from lms.serializers.teacher_profile_serializer import (
     TeacherProfileSerializer, TeacherChangePasswordSerializer
 )
 from lms.permissions import IsTeacher
-
-
-def get_current_teacher(request):
-    """
-    Helper function to get the current teacher from the request.
-    Assumes JWT token contains teacher_id or email.
-    """
-    if hasattr(request, 'auth') and request.auth:
-        # Try to get teacher_id from token
-        teacher_id = request.auth.get('teacher_id')
-        if teacher_id:
-            try:
-                return Teacher.objects.get(id=teacher_id)
-            except Teacher.DoesNotExist:
-                pass
-        
-        # Try to get email from token
-        email = request.auth.get('email')
-        if email:
-            try:
-                return Teacher.objects.get(email=email)
-            except Teacher.DoesNotExist:
-                pass
-    
-    # Fallback: try to get from user if available
-    if hasattr(request, 'user') and request.user and request.user.is_authenticated:
-        if hasattr(request.user, 'email'):
-            try:
-                return Teacher.objects.get(email=request.user.email)
-            except Teacher.DoesNotExist:
-                pass
-    
-    return None
+from lms.utils.principal import get_current_teacher
+from lms.utils.course_outline import bump_course_outline_version
+from lms.utils.quiz_cache import bump_quiz_content_version
+from lms.utils.quiz_analysis import get_item_analysis
+from lms.utils.quiz_tree import write_quiz_tree
+from lms.utils.bulk_utils import bulk_reorder
+from lms.utils.curriculum_io import (
+    CURRICULUM_CONTENT_TYPE, export_curriculum, import_curriculum, clone_curriculum
+)
+from lms.utils.course_progress import rescale_course_progress, resync_course_progress
 
 
 class TeacherCourseViewSet(viewsets.ModelViewSet):
@@ -86,6 +67,7 @@ class TeacherCourseViewSet(viewsets.ModelViewSet):
         if not teacher or course.teacher != teacher:
             raise PermissionDenied("You do not have permission to update this course")
         serializer.save()
+        bump_course_outline_version(course.id)
     
     def perform_destroy(self, instance):
         """
@@ -95,6 +77,60 @@ class TeacherCourseViewSet(viewsets.ModelViewSet):
         if not teacher or instance.teacher != teacher:
             raise PermissionDenied("You do not have permission to delete this course")
         instance.delete()
+    
+    @action(detail=True, methods=['get'], url_path='curriculum/export')
+    def curriculum_export(self, request, pk=None):
+        """
+        Stream the course curriculum (sections, lessons, quizzes, questions,
+        options) as JSON Lines.
+        GET /api/teacher/courses/<id>/curriculum/export/
+        """
+        course = self.get_object()
+        response = StreamingHttpResponse(export_curriculum(course), content_type=CURRICULUM_CONTENT_TYPE)
+        response['Content-Disposition'] = f'attachment; filename="course-{course.id}-curriculum.jsonl"'
+        return response
+    
+    @action(detail=True, methods=['post'], url_path='curriculum/import')
+    def curriculum_import(self, request, pk=None):
+        """
+        Import a JSON Lines curriculum (format of curriculum/export) into the
+        course, in one transaction with batched inserts.
+        POST /api/teacher/courses/<id>/curriculum/import/
+        Body: the JSONL document (Content-Type: application/x-ndjson),
+              or a multipart upload in the 'file' field
+        ?mode=replace drops the existing curriculum first; default appends.
+        """
+        course = self.get_object()
+        if request.content_type.startswith('multipart/'):
+            upload = request.FILES.get('file')
+            if upload is None:
+                raise ValidationError({'file': 'This field is required.'})
+            lines = upload
+        else:
+            lines = request.stream or []
+        counts = import_curriculum(course, lines, replace=request.query_params.get('mode') == 'replace')
+        return Response({'created': counts}, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['post'], url_path='curriculum/clone')
+    def curriculum_clone(self, request, pk=None):
+        """
+        Copy the curriculum of another course owned by the teacher into this one.
+        POST /api/teacher/courses/<id>/curriculum/clone/
+        Body: { "source_course": <course_id> }
+        ?mode=replace drops the existing curriculum first; default appends.
+        """
+        course = self.get_object()
+        source_course_id = request.data.get('source_course')
+        if not source_course_id:
+            raise ValidationError({'source_course': 'This field is required.'})
+        try:
+            source_course = self.get_queryset().get(id=source_course_id)
+        except (Course.DoesNotExist, ValueError, TypeError):
+            raise NotFound("Source course not found")
+        if source_course.id == course.id:
+            raise ValidationError({'source_course': 'Source and target course must differ.'})
+        counts = clone_curriculum(source_course, course, replace=request.query_params.get('mode') == 'replace')
+        return Response({'created': counts}, status=status.HTTP_201_CREATED)
 
 
 class SectionViewSet(viewsets.ModelViewSet):
@@ -147,6 +183,7 @@ class SectionViewSet(viewsets.ModelViewSet):
             raise PermissionDenied("You do not have permission to create sections for this course")
         
         serializer.save(course=course)
+        bump_course_outline_version(course.id)
     
     def perform_update(self, serializer):
         """
@@ -157,6 +194,7 @@ class SectionViewSet(viewsets.ModelViewSet):
         if not teacher or section.course.teacher != teacher:
             raise PermissionDenied("You do not have permission to update this section")
         serializer.save()
+        bump_course_outline_version(section.course_id)
     
     def perform_destroy(self, instance):
         """
@@ -165,7 +203,40 @@ class SectionViewSet(viewsets.ModelViewSet):
         teacher = get_current_teacher(self.request)
         if not teacher or instance.course.teacher != teacher:
             raise PermissionDenied("You do not have permission to delete this section")
+        course_id = instance.course_id
         instance.delete()
+        bump_course_outline_version(course_id)
+        # Its lessons (and their progress) are gone: rebuild course totals
+        resync_course_progress(course_id)
+    
+    @action(detail=False, methods=['post'], url_path='reorder')
+    def reorder(self, request):
+        """
+        Reorder all sections of a course in one request.
+        POST /api/teacher/sections/reorder/
+        Body: { "course": <course_id>, "sections": [<section_id>, ...] }
+        The list must contain every section of the course exactly once.
+        """
+        serializer = SectionReorderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        course_id = serializer.validated_data['course']
+        ordered_ids = serializer.validated_data['sections']
+        
+        with transaction.atomic():
+            # Ownership and membership in one query
+            sections = {
+                section.id: section
+                for section in self.get_queryset().filter(course_id=course_id).select_for_update().only('id', 'order')
+            }
+            if not sections:
+                raise NotFound("Course not found")
+            if set(sections) != set(ordered_ids):
+                raise ValidationError({'sections': 'Must list every section of the course exactly once'})
+            updated = bulk_reorder(Section, sections, ordered_ids)
+            if updated:
+                bump_course_outline_version(course_id)
+        
+        return Response({'updated': updated}, status=status.HTTP_200_OK)
 
 
 class LessonViewSet(viewsets.ModelViewSet):
@@ -234,6 +305,10 @@ class LessonViewSet(viewsets.ModelViewSet):
                 video_url = request.build_absolute_uri(video_url)
             lesson.video_url = video_url
             lesson.save(update_fields=['video_url'])
+        
+        bump_course_outline_version(section.course_id)
+        # One more lesson in the course: overall progress of every student changes
+        rescale_course_progress(section.course_id)
     
     def perform_update(self, serializer):
         """
@@ -245,6 +320,8 @@ class LessonViewSet(viewsets.ModelViewSet):
         if not teacher or lesson.section.course.teacher != teacher:
             raise PermissionDenied("You do not have permission to update this lesson")
         
+        old_duration = lesson.duration_seconds
+        
         # Handle video file upload
         updated_lesson = serializer.save()
         
@@ -260,6 +337,11 @@ class LessonViewSet(viewsets.ModelViewSet):
                 video_url = request.build_absolute_uri(video_url)
             updated_lesson.video_url = video_url
             updated_lesson.save(update_fields=['video_url'])
+        
+        bump_course_outline_version(lesson.section.course_id)
+        if updated_lesson.duration_seconds != old_duration:
+            # Lesson weights changed: rebuild course totals
+            resync_course_progress(lesson.section.course_id)
     
     def perform_destroy(self, instance):
         """
@@ -268,7 +350,41 @@ class LessonViewSet(viewsets.ModelViewSet):
         teacher = get_current_teacher(self.request)
         if not teacher or instance.section.course.teacher != teacher:
             raise PermissionDenied("You do not have permission to delete this lesson")
+        course_id = instance.section.course_id
         instance.delete()
+        bump_course_outline_version(course_id)
+        resync_course_progress(course_id)
+    
+    @action(detail=False, methods=['post'], url_path='reorder')
+    def reorder(self, request):
+        """
+        Reorder all lessons of a section in one request.
+        POST /api/teacher/lessons/reorder/
+        Body: { "section": <section_id>, "lessons": [<lesson_id>, ...] }
+        The list must contain every lesson of the section exactly once.
+        """
+        serializer = LessonReorderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        section_id = serializer.validated_data['section']
+        ordered_ids = serializer.validated_data['lessons']
+        
+        with transaction.atomic():
+            # Ownership and membership in one query
+            lessons = {
+                lesson.id: lesson
+                for lesson in self.get_queryset().filter(section_id=section_id).select_related(None).select_for_update().only(
+                    'id', 'order'
+                ).annotate(course_id=F('section__course_id'))
+            }
+            if not lessons:
+                raise NotFound("Section not found")
+            if set(lessons) != set(ordered_ids):
+                raise ValidationError({'lessons': 'Must list every lesson of the section exactly once'})
+            updated = bulk_reorder(Lesson, lessons, ordered_ids)
+            if updated:
+                bump_course_outline_version(next(iter(lessons.values())).course_id)
+        
+        return Response({'updated': updated}, status=status.HTTP_200_OK)
 
 
 class QuizViewSet(viewsets.ModelViewSet):
@@ -321,6 +437,7 @@ class QuizViewSet(viewsets.ModelViewSet):
             raise PermissionDenied("You do not have permission to create quizzes for this course")
         
         serializer.save(course=course)
+        bump_course_outline_version(course.id)
     
     def perform_update(self, serializer):
         """
@@ -331,6 +448,8 @@ class QuizViewSet(viewsets.ModelViewSet):
         if not teacher or quiz.course.teacher != teacher:
             raise PermissionDenied("You do not have permission to update this quiz")
         serializer.save()
+        bump_course_outline_version(quiz.course_id)
+        bump_quiz_content_version(quiz.id)
     
     def perform_destroy(self, instance):
         """
@@ -339,7 +458,87 @@ class QuizViewSet(viewsets.ModelViewSet):
         teacher = get_current_teacher(self.request)
         if not teacher or instance.course.teacher != teacher:
             raise PermissionDenied("You do not have permission to delete this quiz")
+        course_id = instance.course_id
         instance.delete()
+        bump_course_outline_version(course_id)
+    
+    def _tree_response(self, quiz_id):
+        quiz = Quiz.objects.prefetch_related('questions__options').get(id=quiz_id)
+        return QuizSerializer(quiz).data
+    
+    @action(detail=False, methods=['post'], url_path='tree')
+    def create_tree(self, request):
+        """
+        Create a quiz with all its questions and options in one transaction.
+        POST /api/teacher/quizzes/tree/
+        Body: {
+            "course": <course_id>, "title": "...", "description": "...", "pass_mark": 50,
+            "questions": [
+                {"question_text": "...", "order": 0,
+                 "options": [{"option_text": "...", "is_correct": true}, ...]},
+                ...
+            ]
+        }
+        """
+        teacher = get_current_teacher(request)
+        if not teacher:
+            raise PermissionDenied("Teacher not found")
+        
+        serializer = QuizTreeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        if 'course' not in data:
+            raise PermissionDenied("Course ID is required")
+        if 'title' not in data:
+            raise ValidationError({'title': 'This field is required.'})
+        
+        try:
+            course = Course.objects.get(id=data['course'])
+        except Course.DoesNotExist:
+            raise NotFound("Course not found")
+        
+        if course.teacher_id != teacher.id:
+            raise PermissionDenied("You do not have permission to create quizzes for this course")
+        
+        with transaction.atomic():
+            quiz = Quiz.objects.create(
+                course=course,
+                title=data['title'],
+                description=data.get('description'),
+                pass_mark=data.get('pass_mark', 0)
+            )
+            write_quiz_tree(quiz, data)
+        return Response(self._tree_response(quiz.id), status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['get', 'put'], url_path='tree')
+    def tree(self, request, pk=None):
+        """
+        Read or write a quiz's whole question/option tree.
+        GET /api/teacher/quizzes/<id>/tree/
+        PUT /api/teacher/quizzes/<id>/tree/ - body as for POST .../tree/ (course ignored)
+            Questions/options with an id are updated, those without are
+            created and missing ones are deleted.
+            ?mode=replace deletes every question and recreates the payload.
+        """
+        quiz = self.get_object()
+        if request.method == 'PUT':
+            serializer = QuizTreeSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            write_quiz_tree(
+                quiz, serializer.validated_data,
+                replace=request.query_params.get('mode') == 'replace'
+            )
+        return Response(self._tree_response(quiz.id), status=status.HTTP_200_OK)
+    
+    @action(detail=True, methods=['get'], url_path='item-analysis')
+    def item_analysis(self, request, pk=None):
+        """
+        Per-question difficulty, discrimination index and option
+        (distractor) frequencies across all attempts of the quiz.
+        GET /api/teacher/quizzes/<id>/item-analysis/
+        """
+        quiz = self.get_object()
+        return Response(get_item_analysis(quiz), status=status.HTTP_200_OK)
 
 
 class QuestionViewSet(viewsets.ModelViewSet):
@@ -380,6 +579,8 @@ class QuestionViewSet(viewsets.ModelViewSet):
             raise PermissionDenied("You do not have permission to create questions for this quiz")
         
         serializer.save(quiz=quiz)
+        bump_course_outline_version(quiz.course_id)
+        bump_quiz_content_version(quiz.id)
     
     def perform_update(self, serializer):
         """
@@ -389,7 +590,10 @@ class QuestionViewSet(viewsets.ModelViewSet):
         teacher = get_current_teacher(self.request)
         if not teacher or question.quiz.course.teacher != teacher:
             raise PermissionDenied("You do not have permission to update this question")
-        serializer.save()
+        previous_quiz_id = question.quiz_id
+        question = serializer.save()
+        bump_course_outline_version(question.quiz.course_id)
+        bump_quiz_content_version(previous_quiz_id, question.quiz_id)
     
     def perform_destroy(self, instance):
         """
@@ -398,7 +602,11 @@ class QuestionViewSet(viewsets.ModelViewSet):
         teacher = get_current_teacher(self.request)
         if not teacher or instance.quiz.course.teacher != teacher:
             raise PermissionDenied("You do not have permission to delete this question")
+        course_id = instance.quiz.course_id
+        quiz_id = instance.quiz_id
         instance.delete()
+        bump_course_outline_version(course_id)
+        bump_quiz_content_version(quiz_id)
 
 
 class OptionViewSet(viewsets.ModelViewSet):
@@ -439,6 +647,8 @@ class OptionViewSet(viewsets.ModelViewSet):
             raise PermissionDenied("You do not have permission to create options for this question")
         
         serializer.save(question=question)
+        bump_course_outline_version(question.quiz.course_id)
+        bump_quiz_content_version(question.quiz_id)
     
     def perform_update(self, serializer):
         """
@@ -448,7 +658,10 @@ class OptionViewSet(viewsets.ModelViewSet):
         teacher = get_current_teacher(self.request)
         if not teacher or option.question.quiz.course.teacher != teacher:
             raise PermissionDenied("You do not have permission to update this option")
-        serializer.save()
+        previous_quiz_id = option.question.quiz_id
+        option = serializer.save()
+        bump_course_outline_version(option.question.quiz.course_id)
+        bump_quiz_content_version(previous_quiz_id, option.question.quiz_id)
     
     def perform_destroy(self, instance):
         """
@@ -457,7 +670,11 @@ class OptionViewSet(viewsets.ModelViewSet):
         teacher = get_current_teacher(self.request)
         if not teacher or instance.question.quiz.course.teacher != teacher:
             raise PermissionDenied("You do not have permission to delete this option")
+        course_id = instance.question.quiz.course_id
+        quiz_id = instance.question.quiz_id
         instance.delete()
+        bump_course_outline_version(course_id)
+        bump_quiz_content_version(quiz_id)
 
 
 # Teacher Profile and Password Change Views
@@ -469,7 +686,8 @@ def TeacherProfileView(request):
     GET /api/teacher/profile/
     PUT/PATCH /api/teacher/profile/
     """
-    teacher = get_current_teacher(request)
+    # Writes start from the database row, not the identity cache
+    teacher = get_current_teacher(request, fresh=request.method != 'GET')
     if not teacher:
         return Response(
             {'error': 'Teacher not found'},
@@ -500,7 +718,8 @@ def TeacherChangePasswordView(request):
         "confirm_password": "..."
     }
     """
-    teacher = get_current_teacher(request)
+    # Password checks always use the database row
+    teacher = get_current_teacher(request, fresh=True)
     if not teacher:
         return Response(
             {'error': 'Teacher not found'},